@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('campsites', '0002_campsitedailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'status', 'check_out_date'], name='bookings_bo_user_id_f71222_idx'),
+        ),
+    ]
@@ -24,5 +24,11 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Reviewable and upcoming bookings of a user
+            models.Index(fields=['user', 'status', 'check_out_date']),
+        ]
+    
     def __str__(self):
         return f"{self.user.username} - {self.campsite.name} ({self.check_in_date} to {self.check_out_date})"
@@ -1,16 +1,19 @@
 from rest_framework import serializers
 from .models import Booking
+from happy_camper_project.performance import TimedSerializerMixin
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username')
     campsite_name = serializers.ReadOnlyField(source='campsite.name')
+    # Annotated by BookingViewSet; new bookings have no review yet
+    has_review = serializers.BooleanField(read_only=True, default=False)
     
     class Meta:
         model = Booking
         fields = [
             'id', 'user', 'campsite', 'campsite_name', 'check_in_date',
             'check_out_date', 'number_of_guests', 'status', 'total_price',
-            'created_at', 'updated_at'
+            'has_review', 'created_at', 'updated_at'
         ]
         read_only_fields = ['user', 'total_price', 'created_at', 'updated_at']
 
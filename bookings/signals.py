@@ -0,0 +1,43 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from campsites import rollups, tasks
+from jobs.queue import enqueue
+from .models import Booking
+
+
+@receiver(pre_save, sender=Booking)
+def remember_previous_booking(sender, instance, raw=False, **kwargs):
+    """Keep the stored version of the booking so post_save can apply a delta."""
+    instance._previous = None
+    if not raw and instance.pk:
+        instance._previous = Booking.objects.filter(pk=instance.pk).first()
+
+
+def record_trending_change(old, new):
+    """Queue a trending recompute of the campsites a booking change affects."""
+    # Every booking counts towards trending unless it is cancelled
+    before = old.campsite_id if old is not None and old.status != 'cancelled' else None
+    after = new.campsite_id if new is not None and new.status != 'cancelled' else None
+    if before == after:
+        return
+    # One queued recompute per campsite however many bookings arrive meanwhile
+    for campsite_id in {before, after} - {None}:
+        enqueue(
+            tasks.update_trending_score, campsite_id=campsite_id,
+            key=f'update_trending_score:{campsite_id}',
+        )
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    rollups.record_booking_change(previous, instance)
+    record_trending_change(previous, instance)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    rollups.record_booking_change(instance, None)
+    record_trending_change(instance, None)
@@ -1,3 +1,92 @@
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from campsites.permissions import CanReviewBooking
+from campsites.tests import create_campsite
+from reviews.models import Review
+from .models import Booking
+from .utils import can_review_booking, get_reviewable_bookings
+
+
+class ReviewableBookingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user('camper', password='pass')
+        self.other = User.objects.create_user('hiker', password='pass')
+        self.campsite = create_campsite()
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def book(self, user=None, status='completed', days_ago=3):
+        check_out = self.today - timedelta(days=days_ago)
+        return Booking.objects.create(
+            user=user or self.user, campsite=self.campsite, status=status,
+            check_in_date=check_out - timedelta(days=2), check_out_date=check_out,
+            number_of_guests=2, total_price=Decimal('40.00'),
+        )
+
+    def review(self, booking):
+        return Review.objects.create(
+            user=booking.user, booking=booking, review_type='booking', rating=4, comment='Nice stay'
+        )
+
+    def test_only_past_unreviewed_stays_of_the_user(self):
+        completed = self.book()
+        confirmed = self.book(status='confirmed', days_ago=10)
+        self.book(status='cancelled')
+        self.book(status='confirmed', days_ago=-5)  # Upcoming
+        self.book(status='confirmed', days_ago=0)  # Checking out today
+        self.review(self.book())
+        self.book(user=self.other)
+
+        self.assertEqual(
+            sorted(get_reviewable_bookings(self.user).values_list('pk', flat=True)),
+            sorted([completed.pk, confirmed.pk]),
+        )
+        self.assertTrue(can_review_booking(completed))
+
+    def test_reviewable_endpoint_lists_in_constant_queries(self):
+        for _ in range(3):
+            self.book()
+        self.review(self.book())
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookings/reviewable/')
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual({booking['has_review'] for booking in response.json()}, {False})
+
+    def test_booking_list_flags_reviewed_stays(self):
+        reviewed = self.book()
+        self.review(reviewed)
+        self.book()
+        self.book(user=self.other)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookings/')
+        flags = {booking['id']: booking['has_review'] for booking in response.json()}
+        self.assertEqual(len(flags), 2)
+        self.assertTrue(flags.pop(reviewed.pk))
+        self.assertEqual(list(flags.values()), [False])
+
+    def test_can_review_booking_permission(self):
+        permission = CanReviewBooking()
+        factory = APIRequestFactory()
+
+        def allowed(booking, method='post'):
+            request = getattr(factory, method)('/')
+            request.user = self.user
+            return permission.has_permission(request, SimpleNamespace(kwargs={'booking_pk': booking.pk}))
 
-# Create your tests here.
+        booking = self.book()
+        self.assertTrue(allowed(booking))
+        self.assertFalse(allowed(self.book(user=self.other)))
+        self.assertFalse(allowed(self.book(status='confirmed', days_ago=-5)))
+        self.review(booking)
+        self.assertFalse(allowed(booking))
+        # Only creating a review is restricted
+        self.assertTrue(allowed(booking, method='get'))
@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta
-from django.db.models import Q
+from datetime import date, datetime, timedelta
+from django.db.models import Exists, OuterRef, Q
 from .models import Booking
 
-def check_availability(campsite, check_in_date, check_out_date):
+# Statuses of a stay that can be reviewed once it has ended
+REVIEWABLE_STATUSES = ('confirmed', 'completed')
+
+def check_availability(campsite, check_in_date, check_out_date, exclude_booking=None):
     """
-    Check if a campsite is available for the given date range.
+    Check if a campsite is available for the given date range, ignoring
+    exclude_booking (the booking being changed).
     Returns True if available, False if not.
     """
     overlapping_bookings = Booking.objects.filter(
@@ -12,24 +16,85 @@ def check_availability(campsite, check_in_date, check_out_date):
         status='confirmed',
         check_in_date__lt=check_out_date,
         check_out_date__gt=check_in_date
-    ).count()
+    )
+    if exclude_booking is not None:
+        overlapping_bookings = overlapping_bookings.exclude(pk=exclude_booking.pk)
+    overlapping_bookings = overlapping_bookings.count()
     
     return overlapping_bookings < campsite.total_spots
 
+def overlapping_stays(campsite_id, start_date, end_date):
+    """
+    (check_in_date, check_out_date) pairs of the confirmed bookings of a
+    campsite that occupy any night between start_date and end_date.
+    """
+    return Booking.objects.filter(
+        campsite_id=campsite_id,
+        status='confirmed',
+        check_in_date__lte=end_date,
+        check_out_date__gt=start_date
+    ).values_list('check_in_date', 'check_out_date')
+
+def build_calendar(stays, total_spots, start_date, end_date):
+    """
+    Turn (check_in_date, check_out_date) pairs into a per-night calendar of
+    booked and available spots from start_date to end_date inclusive.
+    """
+    days = (end_date - start_date).days + 1
+    booked = [0] * max(days, 0)
+    for check_in, check_out in stays:
+        first = max((check_in - start_date).days, 0)
+        last = min((check_out - start_date).days, days)
+        for night in range(first, last):
+            booked[night] += 1
+    
+    return [
+        {
+            'date': start_date + timedelta(days=offset),
+            'booked': count,
+            'available': max(total_spots - count, 0),
+        }
+        for offset, count in enumerate(booked)
+    ]
+
+def get_calendar_range(params, default_days=30, max_days=366):
+    """
+    Resolve ?start= and ?end= (YYYY-MM-DD) into an inclusive date range,
+    defaulting to the next default_days days. Raises ValueError for
+    malformed or reversed dates and clamps the range to max_days.
+    """
+    start = params.get('start')
+    end = params.get('end')
+    start_date = date.fromisoformat(start) if start else datetime.now().date()
+    end_date = date.fromisoformat(end) if end else start_date + timedelta(days=default_days - 1)
+    if end_date < start_date:
+        raise ValueError('end must not be before start')
+    return start_date, min(end_date, start_date + timedelta(days=max_days - 1))
+
+def get_availability_calendar(campsite, start_date, end_date):
+    """
+    Get the per-night availability of a campsite with a single query.
+    """
+    stays = overlapping_stays(campsite.pk, start_date, end_date)
+    return build_calendar(stays, campsite.total_spots, start_date, end_date)
+
+async def aget_availability_calendar(campsite, start_date, end_date):
+    """
+    Async version of get_availability_calendar for async views.
+    """
+    stays = [stay async for stay in overlapping_stays(campsite.pk, start_date, end_date)]
+    return build_calendar(stays, campsite.total_spots, start_date, end_date)
+
 def get_available_dates(campsite, start_date, end_date):
     """
     Get a list of dates when the campsite is available within a given range.
     Returns a list of dates.
     """
-    current_date = start_date
-    available_dates = []
-    
-    while current_date <= end_date:
-        if check_availability(campsite, current_date, current_date + timedelta(days=1)):
-            available_dates.append(current_date)
-        current_date += timedelta(days=1)
-    
-    return available_dates
+    return [
+        night['date']
+        for night in get_availability_calendar(campsite, start_date, end_date)
+        if night['available']
+    ]
 
 def calculate_price(campsite, check_in_date, check_out_date):
     """
@@ -60,14 +125,30 @@ def get_booking_conflicts(campsite, check_in_date, check_out_date):
         check_out_date__gt=check_in_date
     )
 
-def can_review_booking(booking):
+def booking_review_exists():
     """
-    Check if a booking can be reviewed.
-    Returns True if the booking is completed and hasn't been reviewed yet.
+    Subquery matching an existing booking review of the outer booking,
+    for use in Exists() filters and annotations.
+    """
+    from reviews.models import Review
+    return Review.objects.filter(booking=OuterRef('pk'), review_type='booking')
+
+def get_reviewable_bookings(user):
+    """
+    Get all bookings of a user that can still be reviewed: past confirmed or
+    completed stays without a booking review, in a single anti-join query.
     """
     today = datetime.now().date()
-    return (
-        booking.status == 'confirmed' and
-        booking.check_out_date < today and
-        not hasattr(booking, 'review')
+    return Booking.objects.filter(
+        ~Exists(booking_review_exists()),
+        user=user,
+        status__in=REVIEWABLE_STATUSES,
+        check_out_date__lt=today
     )
+
+def can_review_booking(booking):
+    """
+    Check if a booking can be reviewed.
+    Returns True if the stay is over and hasn't been reviewed yet.
+    """
+    return get_reviewable_bookings(booking.user_id).filter(pk=booking.pk).exists()
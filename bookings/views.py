@@ -7,8 +7,11 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import Booking
 from .serializers import BookingSerializer
-from .utils import check_availability, calculate_price
+from django.db.models import Exists
+from .utils import check_availability, calculate_price, booking_review_exists, get_reviewable_bookings
 from campsites.permissions import IsBookingUserOrCampsiteOwner
+from happy_camper_project import metrics
+from happy_camper_project.db import retry_on_locked
 
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
@@ -19,13 +22,18 @@ class BookingViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         if self.request.user.is_staff:
-            return Booking.objects.all()
-        return Booking.objects.filter(
-            user=self.request.user
-        ) | Booking.objects.filter(
-            campsite__owner=self.request.user
+            queryset = Booking.objects.all()
+        else:
+            queryset = Booking.objects.filter(
+                user=self.request.user
+            ) | Booking.objects.filter(
+                campsite__owner=self.request.user
+            )
+        return queryset.select_related('user', 'campsite').annotate(
+            has_review=Exists(booking_review_exists())
         )
     
+    @retry_on_locked
     def perform_create(self, serializer):
         campsite = serializer.validated_data['campsite']
         check_in = serializer.validated_data['check_in_date']
@@ -51,6 +59,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         
         # Check availability
         if not check_availability(campsite, check_in, check_out):
+            metrics.inc('booking_conflicts_total', {'action': 'create'})
             raise serializers.ValidationError({
                 'non_field_errors': ['This campsite is not available for the selected dates.']
             })
@@ -64,6 +73,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             status='pending'
         )
     
+    @retry_on_locked
     def perform_update(self, serializer):
         instance = self.get_object()
         
@@ -84,6 +94,7 @@ class BookingViewSet(viewsets.ModelViewSet):
             check_out = serializer.validated_data.get('check_out_date', instance.check_out_date)
             
             if not check_availability(instance.campsite, check_in, check_out, exclude_booking=instance):
+                metrics.inc('booking_conflicts_total', {'action': 'update'})
                 raise serializers.ValidationError({
                     'non_field_errors': ['Selected dates are not available.']
                 })
@@ -93,6 +104,7 @@ class BookingViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
     
+    @retry_on_locked
     def perform_destroy(self, instance):
         if instance.status not in ['pending', 'confirmed']:
             raise serializers.ValidationError({
@@ -109,5 +121,18 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         booking.status = 'cancelled'
-        booking.save()
+        retry_on_locked(booking.save)()
         return Response({'detail': 'Booking cancelled successfully'})
+    
+    @action(detail=False, methods=['get'])
+    def reviewable(self, request):
+        """List the current user's past stays that can still be reviewed"""
+        bookings = get_reviewable_bookings(request.user).select_related(
+            'user', 'campsite'
+        ).order_by('-check_out_date')
+        page = self.paginate_queryset(bookings)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(bookings, many=True)
+        return Response(serializer.data)
@@ -1,49 +1,96 @@
+from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
-from django.db.models import Count, Avg, Sum
-from django.utils import timezone
-from datetime import timedelta
-from .models import Campsite
+from django.db.models import Count, F, Q, Sum
+from .models import Campsite, CampsiteDailyStats
+from .signals import CACHE_NAMESPACE
+from . import rollups
 from bookings.models import Booking
+from happy_camper_project import cache
+from happy_camper_project.routers import read_from_replica
 
 @staff_member_required
+@read_from_replica
 def dashboard(request):
-    # Get campsite owner's campsites
-    campsites = Campsite.objects.filter(owner=request.user)
-    
-    # Get statistics for the last 30 days
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    
-    # Bookings statistics
-    recent_bookings = Booking.objects.filter(
-        campsite__in=campsites,
-        created_at__gte=thirty_days_ago
+    # Staff see every campsite; ?mine=1 narrows it to the ones they own
+    mine = request.GET.get('mine') == '1'
+    start, end = rollups.get_period(request)
+
+    # The figures are shared by everyone looking at the same campsites and
+    # period, and recomputed at most every DASHBOARD_CACHE_TIMEOUT seconds
+    key = cache.make_key(CACHE_NAMESPACE, 'dashboard', request.user.pk if mine else 'all', start, end)
+    context = cache.get_or_set(
+        key,
+        lambda: dashboard_context(request.user if mine else None, start, end),
+        timeout=settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+    return render(request, 'admin/dashboard.html', {**context, 'mine': mine})
+
+
+def dashboard_context(owner, start, end):
+    """
+    Dashboard figures for the campsites of owner (all campsites if None) in
+    four queries whatever the data volume: campsite totals, the period's
+    daily rollups summed per campsite, the names of the most booked
+    campsites and the latest bookings.
+    """
+    campsites = Campsite.objects.all()
+    rollup_rows = CampsiteDailyStats.objects.filter(date__gte=start, date__lte=end)
+    bookings = Booking.objects.all()
+    if owner is not None:
+        campsites = campsites.filter(owner=owner)
+        rollup_rows = rollup_rows.filter(campsite__owner=owner)
+        bookings = bookings.filter(campsite__owner=owner)
+
+    campsite_totals = campsites.aggregate(
+        total_campsites=Count('id'),
+        active_campsites=Count('id', filter=Q(is_active=True)),
+        total_spots=Sum('total_spots'),
+    )
+    # One pass over the period's rollups, per campsite: summed up for the
+    # totals and ranked for the most popular campsites
+    per_campsite = list(rollup_rows.values('campsite_id').annotate(
+        **{field: Sum(field) for field in rollups.COUNTER_FIELDS}
+    ).order_by())
+    days = (end - start).days + 1
+    totals = rollups.period_totals(
+        {field: sum(row[field] for row in per_campsite) for field in rollups.COUNTER_FIELDS},
+        campsite_totals['total_spots'] or 0,
+        days,
     )
-    
     stats = {
-        'total_campsites': campsites.count(),
-        'total_spots': campsites.aggregate(Sum('total_spots'))['total_spots__sum'] or 0,
-        'recent_bookings': recent_bookings.count(),
-        'pending_bookings': recent_bookings.filter(status='pending').count(),
-        'confirmed_bookings': recent_bookings.filter(status='confirmed').count(),
-        'cancelled_bookings': recent_bookings.filter(status='cancelled').count(),
-        'average_rating': recent_bookings.filter(review__isnull=False).aggregate(
-            Avg('review__rating')
-        )['review__rating__avg'] or 0,
-        'total_revenue': recent_bookings.filter(status='confirmed').aggregate(
-            Sum('total_price')
-        )['total_price__sum'] or 0,
+        'total_campsites': campsite_totals['total_campsites'],
+        'active_campsites': campsite_totals['active_campsites'],
+        'total_spots': totals['total_spots'],
+        'recent_bookings': totals['bookings_created'],
+        'pending_bookings': totals['pending_bookings'],
+        'confirmed_bookings': totals['confirmed_bookings'],
+        'cancelled_bookings': totals['cancelled_bookings'],
+        'average_rating': totals['average_rating'],
+        'total_revenue': totals['revenue'],
+        'occupancy': totals['occupancy'],
     }
-    
+
     # Most popular campsites
-    popular_campsites = campsites.annotate(
-        booking_count=Count('booking')
-    ).order_by('-booking_count')[:5]
-    
-    context = {
+    top = sorted(per_campsite, key=lambda row: row['bookings_created'], reverse=True)[:5]
+    names = dict(Campsite.objects.filter(pk__in=[row['campsite_id'] for row in top]).values_list('id', 'name'))
+    popular_campsites = [
+        {'campsite_id': row['campsite_id'], 'name': names.get(row['campsite_id']), 'booking_count': row['bookings_created']}
+        for row in top
+    ]
+
+    # Newest first by primary key, which needs no index on created_at
+    recent_bookings = list(bookings.order_by('-pk').values(
+        'check_in_date', 'check_out_date', 'status',
+        username=F('user__username'),
+        campsite_name=F('campsite__name'),
+    )[:10])
+
+    return {
         'stats': stats,
+        'start': start,
+        'end': end,
+        'period_days': days,
         'popular_campsites': popular_campsites,
-        'recent_bookings': recent_bookings.order_by('-created_at')[:10],
+        'recent_bookings': recent_bookings,
     }
-    
-    return render(request, 'admin/dashboard.html', context)
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.campsite_list, name='async-campsite-list'),
+    path('featured/', async_views.featured_campsites, name='async-campsite-featured'),
+    path('<int:pk>/', async_views.campsite_detail, name='async-campsite-detail'),
+    path('<int:pk>/availability/', async_views.campsite_availability, name='async-campsite-availability'),
+    path('<int:pk>/reviews/', async_views.campsite_reviews, name='async-campsite-reviews'),
+]
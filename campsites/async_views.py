@@ -0,0 +1,127 @@
+"""
+Async implementations of the hot public read endpoints.
+
+These are plain Django async views (DRF views are sync-only) using the
+async ORM, so under an ASGI server they run on the event loop instead of
+tying up a worker thread. Every relation the serializers touch is
+prefetched up front: lazy loading from async code raises
+SynchronousOnlyOperation rather than silently querying.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from bookings.utils import aget_availability_calendar, get_calendar_range
+from happy_camper_project import cache
+from happy_camper_project.routers import read_from_replica
+from reviews.models import Review
+from reviews.serializers import ReviewSerializer
+from .models import Campsite
+from .serializers import CampsiteDetailSerializer, CampsiteSerializer
+from .signals import CACHE_NAMESPACE
+
+MAX_LIMIT = 100
+
+
+def public_campsites():
+    return Campsite.objects.select_related('owner').prefetch_related('images', 'rating_distributions')
+
+
+def get_limit(request, default):
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        limit = default
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def get_offset(request):
+    try:
+        return max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return 0
+
+
+def not_found():
+    return JsonResponse({'detail': 'Not found.'}, status=404)
+
+
+@require_GET
+@read_from_replica
+async def campsite_list(request):
+    """Active campsites, best rated first, with limit/offset pagination"""
+    limit = get_limit(request, settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10)
+    offset = get_offset(request)
+    queryset = public_campsites().filter(is_active=True).order_by('-bayesian_rating', 'pk')
+
+    campsites = [campsite async for campsite in queryset[offset:offset + limit]]
+    serializer = CampsiteSerializer(campsites, many=True, context={'request': request})
+    return JsonResponse({
+        'count': await queryset.acount(),
+        'results': serializer.data,
+    })
+
+
+@require_GET
+@read_from_replica
+async def campsite_detail(request, pk):
+    campsite = await public_campsites().filter(pk=pk).afirst()
+    if campsite is None:
+        return not_found()
+    serializer = CampsiteDetailSerializer(campsite, context={'request': request})
+    return JsonResponse(serializer.data)
+
+
+@require_GET
+@read_from_replica
+async def featured_campsites(request):
+    """Featured campsites, sharing the cached payload of the sync endpoint"""
+    def compute():
+        featured = public_campsites().filter(is_featured=True)[:6]
+        return CampsiteSerializer(featured, many=True, context={'request': request}).data
+
+    get_or_set = sync_to_async(cache.get_or_set)
+    key = await sync_to_async(cache.make_key)(CACHE_NAMESPACE, 'featured', request.get_host(), '')
+    data = await get_or_set(key, compute, timeout=settings.FEATURED_CACHE_TIMEOUT)
+    return JsonResponse(data, safe=False)
+
+
+@require_GET
+@read_from_replica
+async def campsite_availability(request, pk):
+    campsite = await Campsite.objects.only('pk', 'total_spots').filter(pk=pk).afirst()
+    if campsite is None:
+        return not_found()
+    try:
+        start, end = get_calendar_range(request.GET)
+    except ValueError:
+        return JsonResponse(
+            {'detail': 'start and end must be dates (YYYY-MM-DD) with start <= end'},
+            status=400,
+        )
+    return JsonResponse(await aget_availability_calendar(campsite, start, end), safe=False)
+
+
+@require_GET
+@read_from_replica
+async def campsite_reviews(request, pk):
+    """
+    Public reviews of a campsite, newest first. Pass the created_at of the
+    last review as ?before= to fetch the next page.
+    """
+    reviews = Review.objects.filter(campsite_id=pk, is_public=True).select_related('user')
+    before = request.GET.get('before')
+    if before:
+        before = parse_datetime(before)
+        if before is None:
+            return JsonResponse({'detail': 'before must be an ISO 8601 datetime'}, status=400)
+        reviews = reviews.filter(created_at__lt=before)
+    reviews = reviews.order_by('-created_at')[:get_limit(request, 20)]
+
+    results = [review async for review in reviews]
+    serializer = ReviewSerializer(results, many=True, context={'request': request})
+    return JsonResponse({
+        'results': serializer.data,
+        'before': serializer.data[-1]['created_at'] if results else None,
+    })
@@ -0,0 +1,343 @@
+"""
+Synthetic data generator for local load and benchmark databases.
+
+Campsites are clustered around popular camping regions, bookings follow a
+seasonal curve with weekend peaks and booking lead times, and completed
+stays are reviewed at a configurable rate with ratings that depend on the
+campsite. Rows are written with bulk_create in batches, so signals don't
+run; generate() rebuilds the rollups, rating histograms and rankings at the
+end instead.
+
+Bookings are generated in fixed-size chunks, each with its own random
+stream derived from the seed, so the same seed produces the same rows
+whatever the number of workers. Workers are forked processes writing
+separate chunks; on SQLite they take turns on the write lock.
+"""
+import math
+import multiprocessing
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from bookings.models import Booking
+from happy_camper_project import cache
+from happy_camper_project.db import retry_on_locked
+from reviews.models import Review
+from .models import Campsite
+from .signals import CACHE_NAMESPACE
+
+User = get_user_model()
+
+# Bookings per chunk; a chunk is the unit of work of a worker
+CHUNK_SIZE = 50_000
+
+OWNER_PASSWORD = 'owner123'
+CAMPER_PASSWORD = 'user123'
+
+# (region, latitude, longitude, relative popularity)
+REGIONS = [
+    ('Yosemite', 37.85, -119.55, 10),
+    ('Yellowstone', 44.43, -110.59, 9),
+    ('Great Smoky Mountains', 35.61, -83.49, 9),
+    ('Grand Canyon', 36.11, -112.11, 8),
+    ('Rocky Mountain', 40.34, -105.68, 7),
+    ('Zion', 37.30, -113.03, 6),
+    ('Olympic', 47.80, -123.60, 5),
+    ('Acadia', 44.34, -68.27, 5),
+    ('Glacier', 48.70, -113.72, 5),
+    ('Lake Tahoe', 39.10, -120.03, 6),
+    ('Outer Banks', 35.56, -75.47, 4),
+    ('Ozarks', 36.08, -92.57, 3),
+    ('Everglades', 25.29, -80.90, 2),
+    ('Big Bend', 29.25, -103.25, 2),
+]
+
+NAME_FIRST = ['Pine', 'Cedar', 'Aspen', 'Eagle', 'Bear', 'Willow', 'Maple', 'Elk', 'Fox', 'Juniper']
+NAME_SECOND = ['Hollow', 'Creek', 'Ridge', 'Lake', 'Meadow', 'Point', 'Falls', 'Grove', 'Bend', 'Valley']
+NAME_KIND = ['Campground', 'Camp', 'RV Park', 'Tent Sites', 'Retreat']
+
+# Nights per stay and guests per booking
+NIGHT_WEIGHTS = [25, 30, 18, 10, 6, 4, 7]
+GUEST_WEIGHTS = [15, 40, 15, 20, 6, 4]
+
+COMMENTS = {
+    1: ['Would not come back.', 'Dirty facilities and noisy neighbours.'],
+    2: ['Disappointing for the price.', 'The sites were cramped.'],
+    3: ['Decent spot, nothing special.', 'Fine for a night or two.'],
+    4: ['Lovely campsite, friendly staff.', 'Great location, clean toilets.'],
+    5: ['Perfect weekend, we will be back!', 'One of the best campsites we have stayed at.'],
+}
+
+
+@dataclass
+class DatasetSpec:
+    owners: int = 10
+    users: int = 500
+    campsites: int = 50
+    bookings: int = 5_000
+    # Share of completed stays that get a campsite review
+    review_rate: float = 0.35
+    # Check-in dates run from history_days ago to future_days ahead
+    history_days: int = 730
+    future_days: int = 180
+    seed: int = 1
+    batch_size: int = 5_000
+
+    @classmethod
+    def for_bookings(cls, bookings, **kwargs):
+        """Scale users and campsites with the number of bookings."""
+        campsites = max(20, bookings // 200)
+        defaults = {
+            'owners': max(3, campsites // 10),
+            'users': max(50, bookings // 10),
+            'campsites': campsites,
+            'bookings': bookings,
+        }
+        defaults.update(kwargs)
+        return cls(**defaults)
+
+
+@dataclass
+class CampsiteProfile:
+    """What the booking and review generators need to know about a campsite."""
+    id: int
+    price: Decimal
+    popularity: float
+    quality: float
+
+
+def generate(spec, workers=1, log=print):
+    """
+    Generate a dataset into an empty database and rebuild the derived
+    tables. Returns the number of rows written per model.
+    """
+    rng = random.Random(f'{spec.seed}:base')
+    owner_ids, camper_ids = _create_users(spec)
+    log(f'Created {len(owner_ids)} owners and {len(camper_ids)} campers')
+    profiles = _create_campsites(spec, rng, owner_ids)
+    log(f'Created {len(profiles)} campsites')
+
+    chunks = [
+        (index, min(CHUNK_SIZE, spec.bookings - start))
+        for index, start in enumerate(range(0, spec.bookings, CHUNK_SIZE))
+    ]
+    bookings = 0
+    if workers > 1 and len(chunks) > 1:
+        # Forked workers open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(workers) as pool:
+            results = pool.imap_unordered(
+                _generate_chunk, [(spec, index, size, profiles, camper_ids) for index, size in chunks]
+            )
+            for written in results:
+                bookings += written
+                log(f'Wrote {bookings} of {spec.bookings} bookings')
+    else:
+        for index, size in chunks:
+            bookings += _generate_chunk((spec, index, size, profiles, camper_ids))
+            log(f'Wrote {bookings} of {spec.bookings} bookings')
+
+    log('Rebuilding daily stats, rating distributions and rankings...')
+    call_command('backfill_daily_stats', verbosity=0)
+    call_command('rebuild_rating_distributions', verbosity=0)
+    call_command('refresh_rankings', rebuild_trending=True, verbosity=0)
+    cache.invalidate(CACHE_NAMESPACE)
+
+    return {
+        'users': len(owner_ids) + len(camper_ids),
+        'campsites': len(profiles),
+        'bookings': bookings,
+        'reviews': Review.objects.count(),
+    }
+
+
+def _create_users(spec):
+    # Hash once; every generated user of a kind shares the password
+    owner_password = make_password(OWNER_PASSWORD)
+    camper_password = make_password(CAMPER_PASSWORD)
+    owners = (
+        User(
+            username=f'owner{i}', email=f'owner{i}@example.com', password=owner_password,
+            user_type='owner', business_name=f'Camping Business {i}',
+        )
+        for i in range(1, spec.owners + 1)
+    )
+    campers = (
+        User(username=f'user{i}', email=f'user{i}@example.com', password=camper_password)
+        for i in range(1, spec.users + 1)
+    )
+    User.objects.bulk_create(owners, batch_size=spec.batch_size)
+    User.objects.bulk_create(campers, batch_size=spec.batch_size)
+
+    generated = User.objects.filter(username__regex=r'^(owner|user)\d+$')
+    owner_ids = list(generated.filter(user_type='owner').order_by('pk').values_list('pk', flat=True))
+    camper_ids = list(generated.filter(user_type='camper').order_by('pk').values_list('pk', flat=True))
+    return owner_ids, camper_ids
+
+
+def _create_campsites(spec, rng, owner_ids):
+    region_weights = list(accumulate(region[3] for region in REGIONS))
+    campsites = []
+    profiles = []
+    for i in range(spec.campsites):
+        region, latitude, longitude, _ = rng.choices(REGIONS, cum_weights=region_weights)[0]
+        # Popularity is heavy tailed, quality shifts ratings up or down
+        popularity = rng.lognormvariate(0, 0.5)
+        quality = rng.gauss(0, 0.6)
+        amenities = {
+            'has_electricity': rng.random() < 0.65,
+            'has_water': rng.random() < 0.85,
+            'has_toilets': rng.random() < 0.75,
+            'has_internet': rng.random() < 0.3,
+            'has_store': rng.random() < 0.2,
+        }
+        price = 18 + 6 * sum(amenities.values()) + 10 * max(quality, 0) + rng.uniform(0, 25)
+        name = f'{rng.choice(NAME_FIRST)} {rng.choice(NAME_SECOND)} {rng.choice(NAME_KIND)}'
+        campsites.append(Campsite(
+            owner_id=owner_ids[i % len(owner_ids)] if owner_ids else None,
+            name=name,
+            description=f'{name} near {region} with {rng.randint(2, 40)} acres of woodland.',
+            location=region,
+            # Sites scatter around the region's centre
+            latitude=Decimal(f'{latitude + rng.gauss(0, 0.35):.6f}'),
+            longitude=Decimal(f'{longitude + rng.gauss(0, 0.35):.6f}'),
+            price_per_night=Decimal(f'{price:.2f}'),
+            total_spots=max(5, round(popularity * 12) + rng.randint(0, 15)),
+            is_featured=rng.random() < 0.05,
+            **amenities,
+        ))
+        profiles.append((popularity, quality))
+
+    created = Campsite.objects.bulk_create(campsites, batch_size=spec.batch_size)
+    return [
+        CampsiteProfile(campsite.pk, campsite.price_per_night, popularity, quality)
+        for campsite, (popularity, quality) in zip(created, profiles)
+    ]
+
+
+def _season_weights(start, days):
+    """Relative demand per check-in day: peaks in mid July and on weekends."""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        season = 1 + 0.8 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 196) / 365)
+        weekend = 1.6 if day.weekday() in (4, 5) else 1
+        weights.append(season * weekend)
+    return list(accumulate(weights))
+
+
+def _generate_chunk(args):
+    spec, index, size, profiles, camper_ids = args
+    rng = random.Random(f'{spec.seed}:bookings:{index}')
+    now = timezone.now()
+    today = timezone.localdate(now)
+    start = today - timedelta(days=spec.history_days)
+    days = spec.history_days + spec.future_days
+
+    check_ins = rng.choices(range(days), cum_weights=_season_weights(start, days), k=size)
+    sites = rng.choices(profiles, cum_weights=list(accumulate(p.popularity for p in profiles)), k=size)
+    reviewed = set()
+    bookings = []
+    reviews = []
+    written = 0
+
+    def flush():
+        nonlocal written
+        retry_on_locked(Booking.objects.bulk_create)(bookings)
+        retry_on_locked(Review.objects.bulk_create)(reviews, ignore_conflicts=True)
+        written += len(bookings)
+        bookings.clear()
+        reviews.clear()
+
+    with _explicit_timestamps(Booking, Review):
+        for offset, site in zip(check_ins, sites):
+            check_in = start + timedelta(days=offset)
+            nights = rng.choices(range(1, 8), weights=NIGHT_WEIGHTS)[0]
+            check_out = check_in + timedelta(days=nights)
+            user_id = rng.choice(camper_ids)
+            created_at = min(
+                _aware(check_in) - timedelta(days=rng.expovariate(1 / 30)),
+                now - timedelta(minutes=rng.randint(1, 600)),
+            )
+            if check_out <= today:
+                status = 'completed' if rng.random() < 0.9 else 'cancelled'
+            else:
+                status = rng.choices(['confirmed', 'pending', 'cancelled'], weights=[70, 20, 10])[0]
+            bookings.append(Booking(
+                user_id=user_id,
+                campsite_id=site.id,
+                check_in_date=check_in,
+                check_out_date=check_out,
+                number_of_guests=rng.choices(range(1, 7), weights=GUEST_WEIGHTS)[0],
+                status=status,
+                total_price=site.price * nights,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+
+            # One campsite review per user and campsite; duplicates across
+            # chunks are dropped by the unique constraint
+            if status == 'completed' and rng.random() < spec.review_rate and (user_id, site.id) not in reviewed:
+                reviewed.add((user_id, site.id))
+                reviews.append(_review(rng, user_id, site, check_out, now))
+
+            if len(bookings) >= spec.batch_size:
+                flush()
+        flush()
+
+    connections.close_all()
+    return written
+
+
+def _review(rng, user_id, site, check_out, now):
+    def score(bias=0.0):
+        return min(5, max(1, round(rng.gauss(3.9 + site.quality + bias, 0.9))))
+
+    rating = score()
+    created_at = min(_aware(check_out) + timedelta(days=rng.expovariate(1 / 4)), now)
+    detailed = rng.random() < 0.7
+    return Review(
+        user_id=user_id,
+        campsite_id=site.id,
+        review_type='campsite',
+        rating=rating,
+        comment=rng.choice(COMMENTS[rating]),
+        cleanliness_rating=score(-0.2) if detailed else None,
+        location_rating=score(0.3) if detailed else None,
+        value_rating=score() if detailed else None,
+        is_public=rng.random() < 0.97,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create write the given created_at/updated_at values."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
@@ -1,5 +1,6 @@
 import django_filters
 from django.db.models import Avg
+from rest_framework import filters
 from .models import Campsite
 from django.db.models import Q
 
@@ -24,7 +25,7 @@ class CampsiteFilter(django_filters.FilterSet):
         """Filter campsites by minimum average rating"""
         if value is not None:
             return queryset.annotate(
-                avg_rating=Avg('reviews__rating')
+                avg_rating=Avg('unified_reviews__rating', filter=Q(unified_reviews__is_public=True))
             ).filter(avg_rating__gte=value)
         return queryset
     
@@ -37,3 +38,27 @@ class CampsiteFilter(django_filters.FilterSet):
                 Q(location__icontains=value)
             )
         return queryset
+
+
+class CampsiteOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that keeps accepting ?ordering=average_rating. That is a
+    model property rather than a column, so it sorts by the same value, the
+    average of the public reviews, annotated only when it is asked for.
+    """
+    aliases = {'average_rating': 'public_rating'}
+    
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        fields = [
+            ('-' if term.startswith('-') else '') + self.aliases.get(term.lstrip('-'), term.lstrip('-'))
+            for term in fields
+        ]
+        return super().remove_invalid_fields(queryset, fields, view, request)
+    
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view) or []
+        if any(term.lstrip('-') == 'public_rating' for term in ordering):
+            queryset = queryset.annotate(
+                public_rating=Avg('unified_reviews__rating', filter=Q(unified_reviews__is_public=True))
+            )
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from campsites import rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-campsite daily rollup table from bookings and reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campsite', type=int, action='append', dest='campsites',
+            help='Only rebuild the given campsite id (can be repeated)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rollups.rebuild(
+            campsite_ids=options['campsites'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} daily stats rows'))
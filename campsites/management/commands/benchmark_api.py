@@ -0,0 +1,285 @@
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from bookings.models import Booking
+from campsites import datagen
+from campsites.models import Campsite
+
+User = get_user_model()
+
+# Dataset presets by number of bookings
+SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+BENCHMARK_USERNAME = 'benchmark-api-user'
+
+# Parsed from the Server-Timing header written by PerformanceMiddleware
+DB_TIMING_RE = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+class BenchmarkClient(Client):
+    """
+    Test client sending each request from a different address, so the
+    per-IP throttles don't kick in part way through a scenario.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requests = 0
+
+    def request(self, **request):
+        self._requests += 1
+        count = self._requests
+        request.setdefault('REMOTE_ADDR', f'10.{count >> 16 & 255}.{count >> 8 & 255}.{count & 255}')
+        return super().request(**request)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database with a synthetic dataset and measure latency '
+        'percentiles and query counts of the main API endpoints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=SIZES, default='1k', help='Dataset size in bookings')
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the dataset and requests')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Only run the given scenario (can be repeated)'
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Keep the seeded database in benchmark_<size>.sqlite3 and reuse it on the next run'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = self._scenarios()
+        selected = options['scenarios'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f'Unknown scenario(s): {", ".join(sorted(unknown))}')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+
+        bookings = SIZES[options['size']]
+        if options['keepdb']:
+            connections['default'].settings_dict['TEST']['NAME'] = f'benchmark_{options["size"]}.sqlite3'
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options['keepdb'],
+            aliases={'default'}, serialized_aliases=set(),
+        )
+        try:
+            if Booking.objects.count() < bookings:
+                self._seed(bookings, options['seed'])
+            # A private cache so cached users or pages of another database
+            # can't leak in; no rate limiting and no slow-request logging
+            with override_settings(
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                RATE_LIMIT_ENABLED=False,
+                SERVER_TIMING_ENABLED=True,
+                SLOW_REQUEST_THRESHOLD_MS=10 ** 9,
+            ):
+                results = self._run(scenarios, selected, options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'size': options['size'],
+                'bookings': bookings,
+                'requests': options['requests'],
+                'seed': options['seed'],
+                'python': platform.python_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+            },
+            'results': results,
+        }
+        self._print(report, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
+
+    # Dataset
+
+    def _seed(self, bookings, seed):
+        spec = datagen.DatasetSpec.for_bookings(bookings, seed=seed)
+        self.stdout.write(
+            f'Seeding {spec.campsites} campsites, {spec.users} users and {spec.bookings} bookings...'
+        )
+        # The test database may be in memory, which forked workers can't see
+        datagen.generate(spec, log=lambda message: None)
+
+    # Requests
+
+    def _scenarios(self):
+        """name -> function(client, rng, context) making one request"""
+        def booking_create(client, rng, context):
+            check_in = date.today() + timedelta(days=rng.randint(200, 900))
+            return client.post(
+                '/api/bookings/',
+                {
+                    'campsite': rng.choice(context['campsite_ids']),
+                    'check_in_date': check_in.isoformat(),
+                    'check_out_date': (check_in + timedelta(days=rng.randint(1, 4))).isoformat(),
+                    'number_of_guests': 2,
+                },
+                content_type='application/json',
+                HTTP_AUTHORIZATION=f'Bearer {context["token"]}',
+            )
+
+        def detail_url(path):
+            return lambda client, rng, context: client.get(
+                f'/api/campsites/{rng.choice(context["campsite_ids"])}/{path}'
+            )
+
+        return {
+            'campsite_list': lambda client, rng, context: client.get('/api/campsites/'),
+            'campsite_search': lambda client, rng, context: client.get(
+                '/api/campsites/', {'search': rng.choice(['Lake', 'Creek', 'Pine', 'Yosemite'])}
+            ),
+            'campsite_filter': lambda client, rng, context: client.get('/api/campsites/', {
+                'has_water': 'true',
+                'min_price': rng.randint(20, 50),
+                'max_price': rng.randint(60, 100),
+                'ordering': '-bayesian_rating',
+            }),
+            'campsite_detail': detail_url(''),
+            'campsite_featured': lambda client, rng, context: client.get('/api/campsites/featured/'),
+            'campsite_availability': detail_url('availability/'),
+            'campsite_reviews': detail_url('reviews/'),
+            'booking_create': booking_create,
+        }
+
+    def _run(self, scenarios, selected, options):
+        user, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME, defaults={'email': f'{BENCHMARK_USERNAME}@example.com'}
+        )
+        # Campsites with reviews, so detail and review scenarios hit real data
+        campsite_ids = list(
+            Campsite.objects.filter(unified_reviews__isnull=False)
+            .values_list('pk', flat=True).distinct()[:200]
+        ) or list(Campsite.objects.values_list('pk', flat=True)[:200])
+        context = {'token': str(AccessToken.for_user(user)), 'campsite_ids': campsite_ids}
+
+        client = BenchmarkClient()
+        results = {}
+        for name in selected:
+            make_request = scenarios[name]
+            rng = random.Random(f'{options["seed"]}:{name}')
+            for _ in range(options['warmup']):
+                make_request(client, rng, context)
+            samples = [self._timed(make_request, client, rng, context) for _ in range(options['requests'])]
+            results[name] = _summarize(samples)
+            self.stdout.write(f'  {name}: p50 {results[name]["p50_ms"]}ms')
+        return results
+
+    def _timed(self, make_request, client, rng, context):
+        started = time.perf_counter()
+        response = make_request(client, rng, context)
+        elapsed = time.perf_counter() - started
+        match = DB_TIMING_RE.search(response.get('Server-Timing', ''))
+        return {
+            'elapsed': elapsed,
+            'status': response.status_code,
+            'queries': int(match.group(2)) if match else 0,
+            'db_time': float(match.group(1)) / 1000 if match else 0.0,
+        }
+
+    # Output
+
+    def _print(self, report, baseline):
+        meta = report['meta']
+        self.stdout.write(
+            f'\n{meta["size"]} dataset ({meta["bookings"]} bookings), '
+            f'{meta["requests"]} requests per scenario, commit {meta["commit"] or "unknown"}'
+        )
+        header = f'{"scenario":<24}{"p50":>9}{"p95":>9}{"p99":>9}{"queries":>9}{"errors":>8}'
+        if baseline:
+            header += f'{"p95 vs base":>14}{"queries vs base":>17}'
+        self.stdout.write(header)
+        for name, result in report['results'].items():
+            line = (
+                f'{name:<24}{result["p50_ms"]:>9}{result["p95_ms"]:>9}{result["p99_ms"]:>9}'
+                f'{result["queries_mean"]:>9}{result["errors"]:>8}'
+            )
+            previous = (baseline or {}).get('results', {}).get(name)
+            if previous:
+                change = _percent_change(previous['p95_ms'], result['p95_ms'])
+                queries = result['queries_mean'] - previous['queries_mean']
+                line += f'{change:>14}{queries:>+17.1f}'
+            self.stdout.write(line)
+
+
+def _percentile(values, percent):
+    index = min(int(round(percent / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def _summarize(samples):
+    elapsed = sorted(sample['elapsed'] * 1000 for sample in samples)
+    queries = [sample['queries'] for sample in samples]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample['status'])] = statuses.get(str(sample['status']), 0) + 1
+    return {
+        'requests': len(samples),
+        'mean_ms': round(statistics.mean(elapsed), 2),
+        'p50_ms': round(_percentile(elapsed, 50), 2),
+        'p95_ms': round(_percentile(elapsed, 95), 2),
+        'p99_ms': round(_percentile(elapsed, 99), 2),
+        'max_ms': round(elapsed[-1], 2),
+        'queries_mean': round(statistics.mean(queries), 1),
+        'queries_max': max(queries),
+        'db_ms_mean': round(statistics.mean(sample['db_time'] for sample in samples) * 1000, 2),
+        'errors': sum(1 for sample in samples if sample['status'] >= 500),
+        'statuses': statuses,
+    }
+
+
+def _percent_change(before, after):
+    if not before:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -1,110 +1,58 @@
-from django.core.management.base import BaseCommand
+import time
+
 from django.contrib.auth import get_user_model
-from django.utils import timezone
-from campsites.models import Campsite
-from bookings.models import Booking, Review
-import random
-from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from campsites import datagen
 
 User = get_user_model()
 
+
 class Command(BaseCommand):
-    help = 'Generate test data for Happy Camper application'
+    help = 'Generate a synthetic dataset (users, campsites, bookings and reviews) for local and load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=5000, help='Number of bookings')
+        parser.add_argument('--campsites', type=int, help='Number of campsites (default: bookings / 200)')
+        parser.add_argument('--users', type=int, help='Number of campers (default: bookings / 10)')
+        parser.add_argument('--owners', type=int, help='Number of campsite owners (default: campsites / 10)')
+        parser.add_argument('--review-rate', type=float, default=0.35, help='Share of completed stays reviewed')
+        parser.add_argument('--history-days', type=int, default=730, help='Days of past bookings')
+        parser.add_argument('--future-days', type=int, default=180, help='Days of upcoming bookings')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--workers', type=int, default=1, help='Parallel processes writing bookings')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__in=['owner1', 'user1']).exists():
+            raise CommandError(
+                'The database already contains generated data; run this against a freshly migrated database'
+            )
+
+        overrides = {
+            name: options[name]
+            for name in ('campsites', 'users', 'owners')
+            if options[name] is not None
+        }
+        spec = datagen.DatasetSpec.for_bookings(
+            options['bookings'],
+            review_rate=options['review_rate'],
+            history_days=options['history_days'],
+            future_days=options['future_days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            **overrides,
+        )
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write('Creating test users...')
-        
-        # Create superuser if it doesn't exist
         if not User.objects.filter(username='admin').exists():
             User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
             self.stdout.write('Created superuser: admin/admin123')
-        
-        # Create campsite owners
-        owners = []
-        for i in range(3):
-            username = f'owner{i+1}'
-            if not User.objects.filter(username=username).exists():
-                owner = User.objects.create_user(
-                    username=username,
-                    email=f'owner{i+1}@example.com',
-                    password='owner123',
-                    user_type='owner',
-                    business_name=f'Camping Business {i+1}'
-                )
-                owners.append(owner)
-                self.stdout.write(f'Created campsite owner: {username}/owner123')
-            else:
-                owners.append(User.objects.get(username=username))
-        
-        # Create regular users
-        users = []
-        for i in range(5):
-            username = f'user{i+1}'
-            if not User.objects.filter(username=username).exists():
-                user = User.objects.create_user(
-                    username=username,
-                    email=f'user{i+1}@example.com',
-                    password='user123',
-                    user_type='camper'
-                )
-                users.append(user)
-                self.stdout.write(f'Created user: {username}/user123')
-            else:
-                users.append(User.objects.get(username=username))
-        
-        # Create campsites
-        self.stdout.write('Creating campsites...')
-        locations = [
-            'Mountain View', 'Lakeside', 'Forest Grove',
-            'Beach Front', 'Desert Oasis', 'River Bend'
-        ]
-        
-        for i in range(10):
-            name = f'Camp {locations[i % len(locations)]}'
-            if not Campsite.objects.filter(name=name).exists():
-                campsite = Campsite.objects.create(
-                    owner=random.choice(owners),
-                    name=name,
-                    description=f'A beautiful campsite at {name}',
-                    location=locations[i % len(locations)],
-                    latitude=random.uniform(25.0, 48.0),
-                    longitude=random.uniform(-125.0, -70.0),
-                    price_per_night=random.randint(20, 100),
-                    has_electricity=random.choice([True, False]),
-                    has_water=random.choice([True, False]),
-                    has_toilets=random.choice([True, False]),
-                    has_internet=random.choice([True, False]),
-                    has_store=random.choice([True, False]),
-                    total_spots=random.randint(5, 20),
-                    is_active=True
-                )
-                self.stdout.write(f'Created campsite: {name}')
-        
-        # Create bookings and reviews
-        self.stdout.write('Creating bookings and reviews...')
-        campsites = Campsite.objects.all()
-        
-        for _ in range(20):
-            user = random.choice(users)
-            campsite = random.choice(campsites)
-            start_date = timezone.now().date() + timedelta(days=random.randint(-30, 60))
-            
-            booking = Booking.objects.create(
-                user=user,
-                campsite=campsite,
-                check_in_date=start_date,
-                check_out_date=start_date + timedelta(days=random.randint(1, 7)),
-                number_of_guests=random.randint(1, 4),
-                status=random.choice(['pending', 'confirmed', 'cancelled', 'completed']),
-                total_price=random.randint(50, 500)
-            )
-            
-            # Add reviews for completed bookings
-            if booking.status == 'completed':
-                Review.objects.create(
-                    booking=booking,
-                    rating=random.randint(1, 5),
-                    comment=f'This was a {"great" if random.random() > 0.2 else "okay"} camping experience!'
-                )
-        
-        self.stdout.write(self.style.SUCCESS('Successfully generated test data'))
+
+        started = time.perf_counter()
+        counts = datagen.generate(spec, workers=options['workers'], log=self.stdout.write)
+        self.stdout.write(
+            f'Owners log in as owner<N>/{datagen.OWNER_PASSWORD}, campers as user<N>/{datagen.CAMPER_PASSWORD}'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Generated {users} users, {campsites} campsites, {bookings} bookings and {reviews} reviews'.format(**counts)
+            + f' in {time.perf_counter() - started:.0f}s'
+        ))
@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Profile process start-up (import, models and ready() time per app) in fresh interpreters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--module', action='append', dest='modules',
+            help='Settings module to profile (can be repeated to compare; default: the current one)'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per settings module; medians are reported')
+        parser.add_argument('--wsgi', action='store_true', help='Also load the WSGI application and warm-up')
+        parser.add_argument('--top', type=int, default=15, help='Number of apps to list')
+        parser.add_argument('--json', action='store_true', help='Print the reports as JSON')
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or [settings.SETTINGS_MODULE]
+        reports = [self._profile(module, options) for module in modules]
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+
+        for report in reports:
+            self._print(report, options['top'])
+        if len(reports) > 1:
+            self.stdout.write('\nSummary (median wall time per process start)')
+            for report in reports:
+                self.stdout.write(f'  {report["settings_module"]:<48}{report["wall"] * 1000:>9.1f}ms')
+
+    def _profile(self, module, options):
+        command = [sys.executable, '-m', 'happy_camper_project.startup_profile']
+        if options['wsgi']:
+            command.append('--wsgi')
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': module}
+
+        runs = []
+        walls = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            result = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+            walls.append(time.perf_counter() - started)
+            if result.returncode:
+                raise CommandError(f'Profiling {module} failed:\n{result.stderr}')
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        phases = {name: statistics.median(run['phases'][name] for run in runs) for name in runs[0]['phases']}
+        apps = {}
+        for label, app in runs[0]['apps'].items():
+            apps[label] = {'name': app['name']}
+            for field in ('import', 'models', 'ready'):
+                apps[label][field] = statistics.median(run['apps'][label][field] for run in runs)
+            apps[label]['total'] = apps[label]['import'] + apps[label]['models'] + apps[label]['ready']
+        return {
+            'settings_module': module,
+            'wall': statistics.median(walls),
+            'phases': phases,
+            'apps': apps,
+        }
+
+    def _print(self, report, top):
+        self.stdout.write(f'\n{report["settings_module"]} ({len(report["apps"])} apps)')
+        self.stdout.write(f'{"app":<40}{"import":>10}{"models":>10}{"ready":>10}{"total":>10}')
+        ranked = sorted(report['apps'].values(), key=lambda app: app['total'], reverse=True)
+        for app in ranked[:top]:
+            self.stdout.write(
+                f'{app["name"]:<40}{app["import"] * 1000:>10.1f}{app["models"] * 1000:>10.1f}'
+                f'{app["ready"] * 1000:>10.1f}{app["total"] * 1000:>10.1f}'
+            )
+        phases = ', '.join(f'{name} {seconds * 1000:.1f}ms' for name, seconds in report['phases'].items())
+        self.stdout.write(f'Phases: {phases}')
+        self.stdout.write(self.style.SUCCESS(f'Process start (wall, incl. interpreter): {report["wall"] * 1000:.1f}ms'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from campsites import rankings
+
+
+class Command(BaseCommand):
+    help = 'Refresh the rating prior and Bayesian ratings (run periodically, e.g. daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-trending', action='store_true',
+            help='Also recompute trending scores from recent bookings'
+        )
+        parser.add_argument('--window-days', type=int, default=rankings.TRENDING_WINDOW_DAYS)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        updated = rankings.refresh(
+            rebuild_trending=options['rebuild_trending'],
+            window_days=options['window_days'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Refreshed rankings of {updated} campsites'))
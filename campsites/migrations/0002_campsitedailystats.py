@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campsites', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampsiteDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings_created', models.IntegerField(default=0)),
+                ('pending_bookings', models.IntegerField(default=0)),
+                ('confirmed_bookings', models.IntegerField(default=0)),
+                ('cancelled_bookings', models.IntegerField(default=0)),
+                ('completed_bookings', models.IntegerField(default=0)),
+                ('nights_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('new_reviews', models.IntegerField(default=0)),
+                ('rating_total', models.IntegerField(default=0)),
+                ('campsite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='campsites.campsite')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date'], name='campsites_c_date_2b972d_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campsite', 'date'), name='unique_campsite_daily_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campsites', '0002_campsitedailystats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campsite',
+            name='bayesian_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='campsite',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='campsite',
+            index=models.Index(fields=['-bayesian_rating'], name='campsite_bayesian_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campsite',
+            index=models.Index(fields=['-trending_score'], name='campsite_trending_score_idx'),
+        ),
+    ]
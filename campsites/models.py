@@ -29,12 +29,24 @@ class Campsite(models.Model):
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
     
+    # Ranking scores, maintained by campsites.rankings
+    bayesian_rating = models.FloatField(default=0)
+    trending_score = models.FloatField(default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-bayesian_rating'], name='campsite_bayesian_rating_idx'),
+            models.Index(fields=['-trending_score'], name='campsite_trending_score_idx'),
+        ]
+    
     @property
     def average_rating(self):
-        reviews = self.unified_reviews.all()
-        if not reviews:
-            return None
-        return sum(review.rating for review in reviews) / len(reviews)
+        # Average of the public campsite reviews, read from the precomputed
+        # histogram (prefetch rating_distributions when listing campsites)
+        for distribution in self.rating_distributions.all():
+            if distribution.dimension == 'overall':
+                return distribution.average
+        return None
     
     def __str__(self):
         return self.name
@@ -48,3 +60,41 @@ class CampsiteImage(models.Model):
     
     def __str__(self):
         return f"Image for {self.campsite.name}"
+
+class CampsiteDailyStats(models.Model):
+    """
+    Per-campsite daily rollup used by the owner dashboard and stats API.
+    Booking counters and revenue are keyed by the day a booking was created,
+    nights_sold by the night that is occupied and review counters by the day
+    the review was written. Review counters only include campsite reviews,
+    not booking reviews.
+    """
+    campsite = models.ForeignKey(Campsite, related_name='daily_stats', on_delete=models.CASCADE)
+    date = models.DateField()
+    
+    # Bookings by status
+    bookings_created = models.IntegerField(default=0)
+    pending_bookings = models.IntegerField(default=0)
+    confirmed_bookings = models.IntegerField(default=0)
+    cancelled_bookings = models.IntegerField(default=0)
+    completed_bookings = models.IntegerField(default=0)
+    
+    # Occupancy and revenue
+    nights_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Reviews
+    new_reviews = models.IntegerField(default=0)
+    rating_total = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['campsite', 'date'], name='unique_campsite_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.campsite_id} on {self.date}"
@@ -33,11 +33,6 @@ class CanReviewBooking(permissions.BasePermission):
         if not booking_id:
             return False
             
-        from bookings.models import Booking
-        from bookings.utils import can_review_booking
+        from bookings.utils import get_reviewable_bookings
         
-        try:
-            booking = Booking.objects.get(pk=booking_id, user=request.user)
-            return can_review_booking(booking)
-        except Booking.DoesNotExist:
-            return False
+        return get_reviewable_bookings(request.user).filter(pk=booking_id).exists()
@@ -0,0 +1,157 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Campsite
+
+PRIOR_CACHE_KEY = 'rankings:prior_mean'
+
+# A booking adds 2 ** ((created_at - TRENDING_EPOCH) / half-life) to its
+# campsite and trending_score stores the log2 of the sum. Newer bookings
+# weigh exponentially more, which orders campsites exactly like decaying
+# older bookings would, so scores never need a periodic refresh; the log
+# keeps them small. 0 means no bookings.
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+# Bookings older than this have all but decayed away and are left out when
+# a score is recomputed
+TRENDING_WINDOW_DAYS = 60
+
+
+def _prior_weight():
+    return getattr(settings, 'RANKING_PRIOR_WEIGHT', 10)
+
+
+def _half_life():
+    return timedelta(days=getattr(settings, 'TRENDING_HALF_LIFE_DAYS', 7))
+
+
+def compute_prior_mean():
+    """Mean overall rating of all public campsite reviews."""
+    from reviews.models import RatingDistribution
+
+    totals = RatingDistribution.objects.filter(dimension='overall').aggregate(
+        **{f'stars_{stars}': Sum(f'stars_{stars}') for stars in range(1, 6)}
+    )
+    counts = [totals[f'stars_{stars}'] or 0 for stars in range(1, 6)]
+    if not sum(counts):
+        return getattr(settings, 'RANKING_DEFAULT_MEAN', 3.0)
+    return sum(stars * count for stars, count in enumerate(counts, start=1)) / sum(counts)
+
+
+def get_prior_mean():
+    """Prior mean used by the Bayesian rating, refreshed by refresh_rankings."""
+    prior = cache.get(PRIOR_CACHE_KEY)
+    if prior is None:
+        prior = compute_prior_mean()
+        cache.set(PRIOR_CACHE_KEY, prior, 60 * 60 * 24)
+    return prior
+
+
+def bayesian_rating(distribution, prior_mean):
+    """
+    Weighted rating that pulls campsites with few reviews towards the prior
+    mean. Campsites without reviews score 0 so they sort after rated ones.
+    """
+    if distribution is None or not distribution.total:
+        return 0
+    total = sum(stars * count for stars, count in enumerate(distribution.counts, start=1))
+    weight = _prior_weight()
+    return (weight * prior_mean + total) / (weight + distribution.total)
+
+
+def update_rating_scores(campsite_ids):
+    """Recompute the Bayesian rating of the given campsites from their histograms."""
+    from reviews.models import RatingDistribution
+
+    campsite_ids = {campsite_id for campsite_id in campsite_ids if campsite_id}
+    if not campsite_ids:
+        return
+    distributions = {
+        distribution.campsite_id: distribution
+        for distribution in RatingDistribution.objects.filter(
+            campsite_id__in=campsite_ids, dimension='overall'
+        )
+    }
+    prior = get_prior_mean()
+    for campsite_id in campsite_ids:
+        Campsite.objects.filter(pk=campsite_id).update(
+            bayesian_rating=bayesian_rating(distributions.get(campsite_id), prior)
+        )
+
+
+def trending_weight(at):
+    """Log2 weight of a booking made at `at` on the trending scale."""
+    return (at - TRENDING_EPOCH) / _half_life()
+
+
+def trending_score(weights):
+    """Trending score of bookings with the given log2 weights."""
+    weights = list(weights)
+    if not weights:
+        return 0
+    top = max(weights)
+    return top + math.log2(sum(math.pow(2, weight - top) for weight in weights))
+
+
+def update_trending_score(campsite_id, window_days=None):
+    """
+    Recompute the trending score of a campsite from its bookings of the last
+    window_days, as refresh(rebuild_trending=True) does for all of them.
+    Running it twice gives the same score, so a job that runs again after
+    its lease ran out can't count a booking twice.
+    """
+    from bookings.models import Booking
+
+    since = timezone.now() - timedelta(days=window_days or TRENDING_WINDOW_DAYS)
+    created = (
+        Booking.objects.filter(campsite_id=campsite_id, created_at__gte=since)
+        .exclude(status='cancelled').values_list('created_at', flat=True)
+    )
+    Campsite.objects.filter(pk=campsite_id).update(
+        trending_score=trending_score(trending_weight(at) for at in created)
+    )
+
+
+def refresh(rebuild_trending=False, window_days=None, batch_size=500):
+    """
+    Periodic job: refresh the prior mean and recompute every Bayesian rating.
+    With rebuild_trending the trending scores are also recomputed from the
+    bookings of the last window_days, needed after changing
+    TRENDING_HALF_LIFE_DAYS. Returns the number of campsites updated.
+    """
+    from bookings.models import Booking
+    from reviews.models import RatingDistribution
+
+    prior = compute_prior_mean()
+    cache.set(PRIOR_CACHE_KEY, prior, 60 * 60 * 24)
+
+    distributions = {
+        distribution.campsite_id: distribution
+        for distribution in RatingDistribution.objects.filter(dimension='overall')
+    }
+
+    recent = defaultdict(list)
+    if rebuild_trending:
+        since = timezone.now() - timedelta(days=window_days or TRENDING_WINDOW_DAYS)
+        bookings = Booking.objects.filter(created_at__gte=since).exclude(status='cancelled')
+        for campsite_id, created_at in bookings.values_list('campsite_id', 'created_at').iterator():
+            recent[campsite_id].append(trending_weight(created_at))
+
+    campsites = list(Campsite.objects.only('id', 'bayesian_rating', 'trending_score'))
+    for campsite in campsites:
+        campsite.bayesian_rating = bayesian_rating(distributions.get(campsite.id), prior)
+        if rebuild_trending:
+            campsite.trending_score = trending_score(recent.get(campsite.id, ()))
+
+    Campsite.objects.bulk_update(
+        campsites,
+        ['bayesian_rating', 'trending_score'] if rebuild_trending else ['bayesian_rating'],
+        batch_size=batch_size,
+    )
+    return len(campsites)
@@ -0,0 +1,253 @@
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import CampsiteDailyStats
+
+# Statuses that count as sold nights and revenue
+BOOKED_STATUSES = ('confirmed', 'completed')
+
+COUNTER_FIELDS = [
+    'bookings_created', 'pending_bookings', 'confirmed_bookings',
+    'cancelled_bookings', 'completed_bookings', 'nights_sold',
+    'revenue', 'new_reviews', 'rating_total',
+]
+
+
+def booking_contribution(booking):
+    """
+    Return what a single booking adds to the rollup table as a mapping of
+    (campsite_id, date) -> {field: value}.
+    """
+    contribution = defaultdict(Counter)
+    if booking is None:
+        return contribution
+
+    created = timezone.localdate(booking.created_at)
+    key = (booking.campsite_id, created)
+    contribution[key]['bookings_created'] += 1
+    contribution[key][f'{booking.status}_bookings'] += 1
+
+    if booking.status in BOOKED_STATUSES:
+        contribution[key]['revenue'] += booking.total_price
+        night = booking.check_in_date
+        while night < booking.check_out_date:
+            contribution[(booking.campsite_id, night)]['nights_sold'] += 1
+            night += timedelta(days=1)
+
+    return contribution
+
+
+def review_contribution(review):
+    """
+    Return what a single review adds to the rollup table. Only campsite
+    reviews are attributed to a campsite, matching Campsite.unified_reviews;
+    booking reviews (of the stay) are not counted in the rollups.
+    """
+    contribution = defaultdict(Counter)
+    if review is None or not review.campsite_id:
+        return contribution
+
+    key = (review.campsite_id, timezone.localdate(review.created_at))
+    contribution[key]['new_reviews'] += 1
+    contribution[key]['rating_total'] += review.rating
+    return contribution
+
+
+def apply_changes(old, new):
+    """
+    Apply the difference between two contributions to the rollup table using
+    atomic F() updates, creating missing rows on demand.
+    """
+    for key in set(old) | set(new):
+        deltas = {
+            field: new.get(key, {}).get(field, 0) - old.get(key, {}).get(field, 0)
+            for field in COUNTER_FIELDS
+        }
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            campsite_id, date = key
+            increment(CampsiteDailyStats, {'campsite_id': campsite_id, 'date': date}, deltas)
+
+
+def increment(model, lookup, deltas):
+    """
+    Add deltas to the counter fields of the row matching lookup with a single
+    F() update, creating the row if it doesn't exist yet. Counters never go
+    below zero on a new row: a missing row means it was deleted along with its
+    campsite, so a pure decrement creates nothing and the negative part of a
+    mixed one is dropped.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    rows = model.objects.filter(**lookup)
+
+    if rows.update(**changes) or all(delta < 0 for delta in deltas.values()):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: max(delta, 0) for field, delta in deltas.items()})
+    except IntegrityError:
+        # Another request created the row first
+        rows.update(**changes)
+
+
+def record_booking_change(old, new):
+    """Update the rollups for a booking that was created, changed or deleted."""
+    apply_changes(booking_contribution(old), booking_contribution(new))
+
+
+def record_review_change(old, new):
+    """Update the rollups for a review that was created, changed or deleted."""
+    apply_changes(review_contribution(old), review_contribution(new))
+
+
+def rebuild(campsite_ids=None, batch_size=1000):
+    """
+    Recompute the rollup table from the raw booking and review tables.
+    Returns the number of rows written.
+    """
+    from bookings.models import Booking
+    from reviews.models import Review
+
+    bookings = Booking.objects.all()
+    reviews = Review.objects.filter(campsite__isnull=False)
+    stats = CampsiteDailyStats.objects.all()
+    if campsite_ids is not None:
+        bookings = bookings.filter(campsite_id__in=campsite_ids)
+        reviews = reviews.filter(campsite_id__in=campsite_ids)
+        stats = stats.filter(campsite_id__in=campsite_ids)
+
+    rows = defaultdict(Counter)
+
+    created = bookings.annotate(day=TruncDate('created_at')).values('campsite_id', 'day').annotate(
+        bookings_created=Count('id'),
+        pending_bookings=Count('id', filter=Q(status='pending')),
+        confirmed_bookings=Count('id', filter=Q(status='confirmed')),
+        cancelled_bookings=Count('id', filter=Q(status='cancelled')),
+        completed_bookings=Count('id', filter=Q(status='completed')),
+        revenue=Sum('total_price', filter=Q(status__in=BOOKED_STATUSES)),
+    )
+    for row in created:
+        key = (row.pop('campsite_id'), row.pop('day'))
+        row['revenue'] = row['revenue'] or Decimal('0')
+        rows[key].update(row)
+
+    stays = bookings.filter(status__in=BOOKED_STATUSES).values_list(
+        'campsite_id', 'check_in_date', 'check_out_date'
+    )
+    for campsite_id, night, check_out in stays.iterator(chunk_size=batch_size):
+        while night < check_out:
+            rows[(campsite_id, night)]['nights_sold'] += 1
+            night += timedelta(days=1)
+
+    written = reviews.annotate(day=TruncDate('created_at')).values('campsite_id', 'day').annotate(
+        new_reviews=Count('id'),
+        rating_total=Sum('rating'),
+    )
+    for row in written:
+        key = (row.pop('campsite_id'), row.pop('day'))
+        rows[key].update(row)
+
+    with transaction.atomic():
+        stats.delete()
+        CampsiteDailyStats.objects.bulk_create(
+            (
+                CampsiteDailyStats(campsite_id=campsite_id, date=date, **values)
+                for (campsite_id, date), values in rows.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+def summarize(campsites, start, end):
+    """
+    Summarize the rollups of the given campsites between start and end
+    (inclusive). Returns the period totals and a per-day series.
+    """
+    total_spots = campsites.aggregate(total=Sum('total_spots'))['total'] or 0
+    daily = CampsiteDailyStats.objects.filter(
+        campsite__in=campsites,
+        date__gte=start,
+        date__lte=end,
+    ).values('date').annotate(
+        **{field: Sum(field) for field in COUNTER_FIELDS}
+    ).order_by('date')
+
+    totals = Counter()
+    by_date = {}
+    for row in daily:
+        by_date[row['date']] = row
+        totals.update({field: row[field] for field in COUNTER_FIELDS})
+
+    days = (end - start).days + 1
+    series = {'dates': [], 'bookings': [], 'revenue': [], 'occupancy': []}
+    for offset in range(days):
+        date = start + timedelta(days=offset)
+        row = by_date.get(date, {})
+        series['dates'].append(date.isoformat())
+        series['bookings'].append(row.get('bookings_created') or 0)
+        series['revenue'].append(float(row.get('revenue') or 0))
+        series['occupancy'].append(
+            round((row.get('nights_sold') or 0) / total_spots, 4) if total_spots else 0
+        )
+
+    totals = period_totals(totals, total_spots, days)
+    totals['revenue'] = float(totals['revenue'])
+    return totals, series
+
+
+def period_totals(counters, total_spots, days):
+    """
+    The period's summed counters, plus total_spots, the average rating of
+    its new reviews and its occupancy: the share of the total_spots * days
+    spot-nights that were sold.
+    """
+    totals = {field: counters.get(field) or 0 for field in COUNTER_FIELDS}
+    totals['total_spots'] = total_spots
+    totals['average_rating'] = (
+        totals['rating_total'] / totals['new_reviews'] if totals['new_reviews'] else 0
+    )
+    totals['occupancy'] = (
+        round(totals['nights_sold'] / (total_spots * days), 4) if total_spots else 0
+    )
+    return totals
+
+
+def get_period(request, default_days=30, max_days=366):
+    """
+    Resolve ?start= and ?end= (YYYY-MM-DD), or ?days= ending today, into an
+    inclusive (start, end) range of at most max_days. Malformed values fall
+    back to the defaults.
+    """
+    start = _parse_date(request.GET.get('start'))
+    end = _parse_date(request.GET.get('end')) or timezone.localdate()
+    if start is None:
+        try:
+            days = int(request.GET.get('days', default_days))
+        except (TypeError, ValueError):
+            days = default_days
+        start = _days_before(end, min(max(days, 1), max_days) - 1)
+    if start > end:
+        start, end = end, start
+    return max(start, _days_before(end, max_days - 1)), end
+
+
+def _days_before(day, days):
+    """day minus days, or date.min when that is out of range."""
+    try:
+        return day - timedelta(days=days)
+    except OverflowError:
+        return date.min
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
@@ -1,16 +1,20 @@
 from rest_framework import serializers
 from .models import Campsite, CampsiteImage
+from reviews.utils import serialize_distribution
+from happy_camper_project.performance import TimedSerializerMixin
 
-class CampsiteImageSerializer(serializers.ModelSerializer):
+class CampsiteImageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CampsiteImage
         fields = ['id', 'image', 'caption', 'is_primary', 'uploaded_at']
         read_only_fields = ['uploaded_at']
 
-class CampsiteSerializer(serializers.ModelSerializer):
+class CampsiteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
     images = CampsiteImageSerializer(many=True, read_only=True)
-    average_rating = serializers.FloatField(read_only=True)
+    average_rating = serializers.FloatField(
+        read_only=True, help_text='Average star rating of the public campsite reviews'
+    )
     
     class Meta:
         model = Campsite
@@ -18,6 +22,17 @@ class CampsiteSerializer(serializers.ModelSerializer):
             'id', 'owner', 'name', 'description', 'location', 'latitude', 'longitude',
             'price_per_night', 'has_electricity', 'has_water', 'has_toilets',
             'has_internet', 'has_store', 'total_spots', 'is_active', 'is_featured',
-            'created_at', 'updated_at', 'images', 'average_rating'
+            'created_at', 'updated_at', 'images', 'average_rating',
+            'bayesian_rating', 'trending_score'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'is_featured']
+        read_only_fields = ['created_at', 'updated_at', 'is_featured', 'bayesian_rating', 'trending_score']
+
+class CampsiteDetailSerializer(CampsiteSerializer):
+    """Detailed serializer for the campsite detail endpoint"""
+    rating_distribution = serializers.SerializerMethodField()
+    
+    class Meta(CampsiteSerializer.Meta):
+        fields = CampsiteSerializer.Meta.fields + ['rating_distribution']
+    
+    def get_rating_distribution(self, obj):
+        return serialize_distribution(obj.rating_distributions.all())
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from happy_camper_project import cache
+from .models import Campsite, CampsiteImage
+
+# Namespace of cached campsite listings such as the featured endpoint. Ratings
+# and ranking scores change through queryset.update(), which sends no signal,
+# so the cached listings pick them up within FEATURED_CACHE_TIMEOUT
+CACHE_NAMESPACE = 'campsites'
+
+
+@receiver([post_save, post_delete], sender=Campsite)
+@receiver([post_save, post_delete], sender=CampsiteImage)
+def invalidate_campsite_cache(sender, raw=False, **kwargs):
+    if not raw:
+        # After the commit, or a recompute could cache the old rows again
+        transaction.on_commit(lambda: cache.invalidate(CACHE_NAMESPACE))
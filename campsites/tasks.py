@@ -0,0 +1,12 @@
+from jobs.queue import job
+from . import rankings
+
+
+@job(priority=5)
+def update_rating_scores(campsite_ids):
+    rankings.update_rating_scores(campsite_ids)
+
+
+@job(priority=5)
+def update_trending_score(campsite_id):
+    rankings.update_trending_score(campsite_id)
@@ -1,3 +1,366 @@
-from django.test import TestCase
+import json
+import math
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from bookings.models import Booking
+from reviews.models import RatingDistribution, Review
+from . import datagen, rankings, rollups
+from .admin_views import dashboard_context
+from .models import Campsite, CampsiteDailyStats
+
+
+def create_campsite(owner=None, **fields):
+    values = {
+        'owner': owner,
+        'name': 'Lakeside',
+        'description': 'By the lake',
+        'location': 'Bled',
+        'latitude': Decimal('46.363000'),
+        'longitude': Decimal('14.093000'),
+        'price_per_night': Decimal('20.00'),
+        'total_spots': 10,
+    }
+    values.update(fields)
+    return Campsite.objects.create(**values)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('camper', password='pass')
+        self.campsite = create_campsite()
+        self.today = timezone.localdate()
+
+    def book(self, status='pending', nights=2):
+        return Booking.objects.create(
+            user=self.user,
+            campsite=self.campsite,
+            check_in_date=self.today,
+            check_out_date=self.today + timedelta(days=nights),
+            number_of_guests=2,
+            status=status,
+            total_price=Decimal('40.00'),
+        )
+
+    def stats(self, date=None):
+        return CampsiteDailyStats.objects.get(campsite=self.campsite, date=date or self.today)
+
+    def snapshot(self):
+        return {
+            (row.pop('campsite'), row.pop('date')): row
+            for row in CampsiteDailyStats.objects.values('campsite', 'date', *rollups.COUNTER_FIELDS)
+        }
+
+    def test_booking_lifecycle_moves_counters(self):
+        booking = self.book()
+        stats = self.stats()
+        self.assertEqual((stats.bookings_created, stats.pending_bookings, stats.nights_sold), (1, 1, 0))
+
+        booking.status = 'confirmed'
+        booking.save()
+        stats = self.stats()
+        self.assertEqual((stats.pending_bookings, stats.confirmed_bookings), (0, 1))
+        self.assertEqual(stats.revenue, Decimal('40.00'))
+        self.assertEqual(self.stats(self.today + timedelta(days=1)).nights_sold, 1)
+
+        booking.status = 'cancelled'
+        booking.save()
+        stats = self.stats()
+        self.assertEqual((stats.confirmed_bookings, stats.cancelled_bookings), (0, 1))
+        self.assertEqual((stats.revenue, stats.nights_sold), (0, 0))
+
+        booking.delete()
+        self.assertFalse(any(any(row.values()) for row in self.snapshot().values()))
+
+    def test_incremental_rollups_match_rebuild(self):
+        self.book(status='confirmed', nights=3)
+        self.book(status='cancelled')
+        Review.objects.create(user=self.user, campsite=self.campsite, rating=4, comment='Nice')
+        incremental = self.snapshot()
+
+        rollups.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_pure_decrement_creates_no_row(self):
+        lookup = {'campsite_id': self.campsite.pk, 'date': self.today}
+        rollups.increment(CampsiteDailyStats, lookup, {'bookings_created': -1})
+        self.assertFalse(CampsiteDailyStats.objects.exists())
+
+    def test_new_row_never_starts_negative(self):
+        lookup = {'campsite_id': self.campsite.pk, 'date': self.today}
+        rollups.increment(CampsiteDailyStats, lookup, {'pending_bookings': -1, 'confirmed_bookings': 1})
+        stats = self.stats()
+        self.assertEqual((stats.pending_bookings, stats.confirmed_bookings), (0, 1))
+
+    def test_booking_reviews_are_not_counted(self):
+        booking = self.book(status='completed')
+        Review.objects.create(user=self.user, booking=booking, review_type='booking', rating=5, comment='Great')
+        self.assertEqual(self.stats().new_reviews, 0)
+
+
+class CampsiteRatingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'camper{n}', password='pass') for n in range(2)]
+
+    def review(self, campsite, user, rating, **fields):
+        return Review.objects.create(user=user, campsite=campsite, rating=rating, comment='Stayed here', **fields)
+
+    def test_average_rating_counts_public_reviews_only(self):
+        campsite = create_campsite()
+        self.review(campsite, self.users[0], 5)
+        self.review(campsite, self.users[1], 1, is_public=False)
+        response = self.client.get(f'/api/campsites/{campsite.pk}/')
+        self.assertEqual(response.json()['average_rating'], 5.0)
+
+    def test_average_rating_ordering_is_still_accepted(self):
+        low, high = create_campsite(name='Low'), create_campsite(name='High')
+        self.review(low, self.users[0], 2)
+        self.review(high, self.users[0], 4)
+        self.review(high, self.users[1], 1, is_public=False)
+        response = self.client.get('/api/campsites/', {'ordering': '-average_rating'})
+        self.assertEqual([campsite['name'] for campsite in response.json()], ['High', 'Low'])
+        self.assertEqual([campsite['average_rating'] for campsite in response.json()], [4.0, 2.0])
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'camper{n}', password='pass') for n in range(3)]
+        self.campsite = create_campsite()
+        self.today = timezone.localdate()
+
+    def book(self, campsite, status='pending'):
+        return Booking.objects.create(
+            user=self.users[0], campsite=campsite, status=status,
+            check_in_date=self.today, check_out_date=self.today + timedelta(days=1),
+            number_of_guests=1, total_price=Decimal('20.00'),
+        )
+
+    def trending(self, campsite):
+        campsite.refresh_from_db()
+        return campsite.trending_score
+
+    def test_bayesian_rating_pulls_few_reviews_towards_the_prior(self):
+        cache.delete(rankings.PRIOR_CACHE_KEY)
+        Review.objects.create(user=self.users[2], campsite=create_campsite(name='Riverside'), rating=1, comment='Wet')
+        Review.objects.create(user=self.users[0], campsite=self.campsite, rating=5, comment='Great')
+        self.campsite.refresh_from_db()
+        self.assertGreater(self.campsite.bayesian_rating, 0)
+        self.assertLess(self.campsite.bayesian_rating, 5)
+
+        previous = self.campsite.bayesian_rating
+        Review.objects.create(user=self.users[1], campsite=self.campsite, rating=5, comment='Great')
+        self.campsite.refresh_from_db()
+        self.assertGreater(self.campsite.bayesian_rating, previous)
+
+    def test_trending_follows_bookings_and_cancellations(self):
+        other = create_campsite(name='Riverside')
+        self.book(other)
+        self.book(self.campsite)
+        booking = self.book(self.campsite)
+        self.assertGreater(self.trending(self.campsite), self.trending(other))
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertAlmostEqual(self.trending(self.campsite), self.trending(other))
+
+        Booking.objects.filter(campsite=self.campsite).delete()
+        self.assertEqual(self.trending(self.campsite), 0)
+
+    def test_newer_bookings_weigh_more(self):
+        now = timezone.now()
+        older = create_campsite(name='Riverside')
+        for _ in range(3):
+            self.book(older)
+        self.book(self.campsite)
+        Booking.objects.filter(campsite=older).update(created_at=now - timedelta(days=21))
+        Booking.objects.filter(campsite=self.campsite).update(created_at=now)
+        rankings.update_trending_score(older.pk)
+        rankings.update_trending_score(self.campsite.pk)
+        # Three bookings three half-lives ago count for 3/8 of one today
+        self.assertGreater(self.trending(self.campsite), self.trending(older))
+        self.assertAlmostEqual(
+            self.trending(self.campsite) - self.trending(older), -math.log2(3 / 8), places=6
+        )
+
+    def test_recomputing_trending_is_idempotent(self):
+        self.book(self.campsite)
+        score = self.trending(self.campsite)
+        rankings.update_trending_score(self.campsite.pk)
+        rankings.update_trending_score(self.campsite.pk)
+        self.assertEqual(self.trending(self.campsite), score)
+
+    def test_incremental_trending_matches_rebuild(self):
+        for _ in range(3):
+            self.book(self.campsite)
+        self.book(self.campsite, status='cancelled')
+        incremental = self.trending(self.campsite)
+
+        Campsite.objects.update(trending_score=0)
+        rankings.refresh(rebuild_trending=True)
+        self.assertAlmostEqual(self.trending(self.campsite), incremental, places=6)
+
+
+class FeaturedCampsitesTests(TestCase):
+    def test_unrelated_query_params_share_the_cached_response(self):
+        create_campsite(is_featured=True)
+        self.client.get('/api/campsites/featured/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/campsites/featured/', {'_': '12345'})
+        self.assertEqual(len(response.json()), 1)
+        # A parameter the queryset reads is a different response
+        response = self.client.get('/api/campsites/featured/', {'has_water': 'true'})
+        self.assertEqual(response.json(), [])
+
+    def test_saving_a_campsite_invalidates_after_commit(self):
+        campsite = create_campsite(is_featured=True)
+        self.client.get('/api/campsites/featured/')
+        with self.captureOnCommitCallbacks() as callbacks:
+            campsite.name = 'Renamed'
+            campsite.save()
+            self.assertNotEqual(self.client.get('/api/campsites/featured/').json()[0]['name'], 'Renamed')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get('/api/campsites/featured/').json()[0]['name'], 'Renamed')
+
+
+class BenchmarkApiCommandTests(TestCase):
+    def test_runs_scenarios_and_writes_results(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'results.json')
+        command = 'campsites.management.commands.benchmark_api'
+        # The test runner already provides the throwaway database
+        with mock.patch(f'{command}.setup_test_environment'), \
+                mock.patch(f'{command}.teardown_test_environment'), \
+                mock.patch(f'{command}.setup_databases', return_value=[]), \
+                mock.patch(f'{command}.teardown_databases'):
+            call_command(
+                'benchmark_api', size='1k', requests=2, warmup=0, output=output,
+                scenarios=['campsite_list', 'campsite_reviews'], stdout=StringIO(),
+            )
+            stdout = StringIO()
+            call_command(
+                'benchmark_api', size='1k', requests=2, warmup=0, compare=output,
+                scenarios=['campsite_list'], stdout=stdout,
+            )
+
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report['meta']['bookings'], 1000)
+        self.assertEqual(set(report['results']), {'campsite_list', 'campsite_reviews'})
+        for result in report['results'].values():
+            self.assertEqual((result['requests'], result['errors']), (2, 0))
+            self.assertGreater(result['queries_mean'], 0)
+        self.assertIn('p95 vs base', stdout.getvalue())
+        # The second run reused the seeded rows
+        self.assertEqual(Booking.objects.count(), 1000)
+
+
+class DatasetGeneratorTests(TestCase):
+    spec = datagen.DatasetSpec(owners=2, users=40, campsites=6, bookings=200, batch_size=64, seed=7)
+
+    def generate(self):
+        return datagen.generate(self.spec, log=lambda message: None)
+
+    def rows(self):
+        # Timestamps are relative to now, everything else comes from the seed
+        return (
+            sorted(Campsite.objects.values_list('name', 'latitude', 'longitude', 'price_per_night', 'owner__username')),
+            sorted(Booking.objects.values_list(
+                'user__username', 'campsite__name', 'check_in_date', 'check_out_date', 'status', 'total_price',
+            )),
+            sorted(Review.objects.values_list('user__username', 'campsite__name', 'rating', 'comment', 'is_public')),
+        )
+
+    def derived(self):
+        return (
+            sorted(CampsiteDailyStats.objects.values_list('campsite', 'date', *rollups.COUNTER_FIELDS)),
+            sorted(RatingDistribution.objects.values_list(
+                'campsite', 'dimension', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5',
+            )),
+            sorted(Campsite.objects.values_list('pk', 'bayesian_rating', 'trending_score')),
+        )
+
+    def test_same_seed_gives_the_same_rows(self):
+        with transaction.atomic():
+            counts = self.generate()
+            first = self.rows()
+            transaction.set_rollback(True)
+
+        self.assertEqual(self.generate(), counts)
+        self.assertEqual(self.rows(), first)
+        self.assertEqual((counts['campsites'], counts['bookings']), (6, 200))
+        self.assertGreater(counts['reviews'], 0)
+
+    def test_derived_tables_match_what_the_signals_produce(self):
+        self.generate()
+        rebuilt = self.derived()
+
+        CampsiteDailyStats.objects.all().delete()
+        RatingDistribution.objects.all().delete()
+        Campsite.objects.update(bayesian_rating=0, trending_score=0)
+        for booking in Booking.objects.all():
+            post_save.send(Booking, instance=booking, created=True)
+        for review in Review.objects.all():
+            post_save.send(Review, instance=review, created=True)
+        stats, distributions, scores = self.derived()
+        self.assertEqual((stats, distributions), rebuilt[:2])
+        for (pk, bayesian, trending), (_, rebuilt_bayesian, rebuilt_trending) in zip(scores, rebuilt[2]):
+            self.assertAlmostEqual(bayesian, rebuilt_bayesian)
+            self.assertAlmostEqual(trending, rebuilt_trending)
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = get_user_model().objects.create_user('ranger', password='pass', is_staff=True)
+        self.today = timezone.localdate()
+        self.start = self.today - timedelta(days=29)
+
+    def add_campsite(self, name):
+        campsite = create_campsite(owner=self.staff, name=name)
+        Booking.objects.create(
+            user=self.staff, campsite=campsite, status='confirmed',
+            check_in_date=self.today, check_out_date=self.today + timedelta(days=2),
+            number_of_guests=2, total_price=Decimal('40.00'),
+        )
+        Review.objects.create(user=self.staff, campsite=campsite, rating=4, comment='Nice')
+
+    def test_query_count_does_not_grow_with_the_data(self):
+        self.add_campsite('Lakeside')
+        with self.assertNumQueries(4):
+            dashboard_context(None, self.start, self.today)
+        for n in range(5):
+            self.add_campsite(f'Riverside {n}')
+        with self.assertNumQueries(4):
+            context = dashboard_context(self.staff, self.start, self.today)
+        self.assertEqual(len(context['popular_campsites']), 5)
+        self.assertEqual(len(context['recent_bookings']), 6)
+
+    def test_figures_match_the_stats_api(self):
+        self.add_campsite('Lakeside')
+        stats = dashboard_context(None, self.start, self.today)['stats']
+        totals, _ = rollups.summarize(Campsite.objects.all(), self.start, self.today)
+        self.assertEqual(stats['occupancy'], totals['occupancy'])
+        self.assertEqual(stats['average_rating'], totals['average_rating'])
+        self.assertEqual(stats['recent_bookings'], 1)
+
+    def test_period_at_the_start_of_the_calendar(self):
+        request = RequestFactory().get('/', {'end': '0001-01-05'})
+        self.assertEqual(rollups.get_period(request), (date.min, date(1, 1, 5)))
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/admin/dashboard/', {'end': '0001-01-05'}).status_code, 200)
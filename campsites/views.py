@@ -1,27 +1,48 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
 from .models import Campsite, CampsiteImage
-from .serializers import CampsiteSerializer, CampsiteImageSerializer
+from .serializers import CampsiteSerializer, CampsiteDetailSerializer, CampsiteImageSerializer
 from .permissions import IsCampsiteOwnerOrReadOnly
-from .filters import CampsiteFilter
+from .filters import CampsiteFilter, CampsiteOrderingFilter
+from . import rollups
+from .signals import CACHE_NAMESPACE
+from happy_camper_project import cache
+from happy_camper_project.routers import ReplicaReadMixin
+from bookings.utils import get_availability_calendar, get_calendar_range
+from reviews.models import Review
+from reviews.pagination import ReviewCursorPagination
+from reviews.serializers import ReviewSerializer, with_public_authors
+from reviews.utils import get_distribution
+
+AMENITIES = ['has_electricity', 'has_water', 'has_toilets', 'has_internet', 'has_store']
+
+# Query parameters read by CampsiteViewSet.get_queryset
+QUERYSET_PARAMS = ['min_price', 'max_price', *AMENITIES]
 
-class CampsiteViewSet(viewsets.ModelViewSet):
+class CampsiteViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Campsite.objects.all()
     serializer_class = CampsiteSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, CampsiteOrderingFilter]
     filterset_class = CampsiteFilter
     search_fields = ['name', 'description', 'location']
-    ordering_fields = ['price_per_night', 'created_at', 'total_spots', 'average_rating']
+    ordering_fields = ['price_per_night', 'created_at', 'total_spots', 'public_rating', 'bayesian_rating', 'trending_score']
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsCampsiteOwnerOrReadOnly]
+    lookup_value_regex = r'\d+'
+    
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return CampsiteDetailSerializer
+        return CampsiteSerializer
     
     def get_queryset(self):
-        queryset = Campsite.objects.annotate(
-            average_rating=Avg('reviews__rating')
-        )
+        queryset = Campsite.objects.select_related('owner').prefetch_related('images', 'rating_distributions')
         
         # Filter by price range
         min_price = self.request.query_params.get('min_price', None)
@@ -32,8 +53,7 @@ class CampsiteViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(price_per_night__lte=max_price)
             
         # Filter by amenities
-        amenities = ['has_electricity', 'has_water', 'has_toilets', 'has_internet', 'has_store']
-        for amenity in amenities:
+        for amenity in AMENITIES:
             value = self.request.query_params.get(amenity, None)
             if value is not None:
                 queryset = queryset.filter(**{amenity: value.lower() == 'true'})
@@ -56,10 +76,51 @@ class CampsiteViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
-        """Get a list of featured campsites"""
-        featured_campsites = self.get_queryset().filter(is_featured=True)[:6]
-        serializer = self.get_serializer(featured_campsites, many=True)
-        return Response(serializer.data)
+        """Get a list of featured campsites (cached until a campsite changes)"""
+        def compute():
+            featured_campsites = self.get_queryset().filter(is_featured=True)[:6]
+            return self.get_serializer(featured_campsites, many=True).data
+        
+        # Image URLs are absolute, so the host is part of the key. Only the
+        # parameters get_queryset reads are, so cache-busting ones can't add keys
+        params = urlencode([
+            (name, request.query_params[name]) for name in QUERYSET_PARAMS if name in request.query_params
+        ])
+        key = cache.make_key(CACHE_NAMESPACE, 'featured', request.get_host(), params)
+        return Response(cache.get_or_set(key, compute, timeout=settings.FEATURED_CACHE_TIMEOUT))
+    
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """Per-night availability between ?start= and ?end= (YYYY-MM-DD)"""
+        campsite = self.get_object()
+        try:
+            start, end = get_calendar_range(request.query_params)
+        except ValueError:
+            return Response(
+                {'detail': 'start and end must be dates (YYYY-MM-DD) with start <= end'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(get_availability_calendar(campsite, start, end))
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def stats(self, request):
+        """Booking, revenue and occupancy statistics read from the daily rollups"""
+        campsites = Campsite.objects.all()
+        if not request.user.is_staff:
+            campsites = campsites.filter(owner=request.user)
+        
+        campsite_id = request.query_params.get('campsite')
+        if campsite_id and campsite_id.isdigit():
+            campsites = campsites.filter(pk=campsite_id)
+        
+        start, end = rollups.get_period(request)
+        totals, series = rollups.summarize(campsites, start, end)
+        return Response({
+            'start': start,
+            'end': end,
+            'totals': totals,
+            **series,
+        })
     
     @action(detail=True, methods=['get'])
     def images(self, request, pk=None):
@@ -68,6 +129,26 @@ class CampsiteViewSet(viewsets.ModelViewSet):
         serializer = CampsiteImageSerializer(images, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def reviews(self, request, pk=None):
+        """Public reviews of a campsite, newest first, with cursor pagination"""
+        if not Campsite.objects.filter(pk=pk).exists():
+            raise Http404
+        queryset = with_public_authors(Review.objects.filter(
+            campsite_id=pk,
+            is_public=True
+        ))
+        
+        paginator = ReviewCursorPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = ReviewSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def rating_distribution(self, request, pk=None):
+        """Star distribution of the public reviews for each rating dimension"""
+        return Response(get_distribution(pk))
+    
     @action(detail=True, methods=['post'])
     def toggle_featured(self, request, pk=None):
         """Toggle featured status of a campsite (staff only)"""
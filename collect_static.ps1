@@ -10,11 +10,7 @@ Set-Location frontend
 npm run build
 Set-Location ..
 
-# Copy frontend build to static directory
-Write-Host "Copying frontend build files..."
-Copy-Item -Path "frontend/dist/*" -Destination "static/" -Recurse -Force
-
-# Collect static files
+# Collect static files (including frontend/dist/assets, see FRONTEND_STATICFILES_DIRS)
 Write-Host "Collecting static files..."
 python manage.py collectstatic --noinput
 
@@ -21,6 +21,18 @@ const bookingsApi = {
     }
   },
 
+  // Get the current user's past stays that still need a review
+  getReviewableBookings: async () => {
+    try {
+      const response = await axios.get(`${API_URL}/bookings/reviewable/`, {
+        withCredentials: true,
+      });
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || error.message;
+    }
+  },
+
   // Get a single booking by ID
   getBooking: async (id) => {
     try {
@@ -3,7 +3,7 @@ import react from '@vitejs/plugin-react'
 import { resolve } from 'path'
 
 // https://vitejs.dev/config/
-export default defineConfig({
+export default defineConfig(({ command }) => ({
   plugins: [
     react({
       jsxRuntime: 'automatic',
@@ -16,7 +16,9 @@ export default defineConfig({
     })
   ],
   root: '.',
-  base: '',
+  // Built assets are collected by Django into STATIC_ROOT/assets/ and served
+  // from STATIC_URL by WhiteNoise
+  base: command === 'build' ? '/static/' : '/',
   publicDir: 'public',
   build: {
     outDir: 'dist',
@@ -30,9 +32,9 @@ export default defineConfig({
       },
       output: {
         manualChunks: undefined,
-        assetFileNames: 'static/[name].[hash].[ext]',
-        chunkFileNames: 'static/[name].[hash].js',
-        entryFileNames: 'static/[name].[hash].js',
+        assetFileNames: 'assets/[name].[hash].[ext]',
+        chunkFileNames: 'assets/[name].[hash].js',
+        entryFileNames: 'assets/[name].[hash].js',
       },
     }
   },
@@ -56,4 +58,4 @@ export default defineConfig({
       '@contexts': resolve(__dirname, 'src/contexts')
     }
   }
-})
+}))
@@ -11,16 +11,41 @@ backlog = 2048
 
 # Worker processes
 workers = os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
-worker_class = 'gevent'
+# 'gevent' serves happy_camper_project.wsgi:application, the whole site. The
+# async read endpoints under /api/public/ can get their own server running
+# happy_camper_project.asgi:application with
+# GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker and DJANGO_ENV=asgi;
+# it serves nothing else (see settings/asgi.py), so route only /api/public/
+# to it at the proxy
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
 worker_connections = 1000
 timeout = 30
 keepalive = 2
 
+# Import and warm up the application once in the master (see
+# happy_camper_project.warmup) and fork workers from it, so they share its
+# memory copy-on-write and serve their first request warm
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+
+# Recycle workers after a number of requests to contain slow leaks; the
+# jitter keeps them from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+if preload_app and worker_class == 'gevent':
+    # The gevent workers patch the standard library when they start, which
+    # with preloading is after the app has created its locks and threads;
+    # patch the master first so everything is created cooperative
+    from gevent import monkey
+    monkey.patch_all()
+
 # Process naming
 proc_name = 'happy_camper'
 
-# Logging
-accesslog = '-'
+# Logging. Django logs every request (happy_camper.performance) with its
+# timings and request ID, so gunicorn's own access log is off unless
+# GUNICORN_ACCESS_LOG names a file or "-"
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
 errorlog = '-'
 loglevel = 'info'
 
@@ -32,3 +57,33 @@ certfile = os.getenv('SSL_CERTFILE', None)
 limit_request_line = 4096
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+
+def on_starting(server):
+    """Start every master with empty per-process metric files."""
+    metrics_dir = os.getenv('METRICS_DIR')
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for filename in os.listdir(metrics_dir):
+            if filename.endswith(('.json', '.tmp')):
+                os.remove(os.path.join(metrics_dir, filename))
+
+
+def child_exit(server, worker):
+    """Keep the counts of an exited worker in the metrics archive."""
+    metrics_dir = os.getenv('METRICS_DIR')
+    if metrics_dir:
+        from happy_camper_project.metrics import mark_process_dead
+
+        mark_process_dead(worker.pid, metrics_dir)
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the preloaded master."""
+    if not preload_app:
+        return
+    from django.db import connections
+
+    # warm_up() closes its connections before the fork; this covers anything
+    # opened since. Redis connection pools reset themselves in a new process.
+    connections.close_all()
@@ -0,0 +1,19 @@
+"""
+URLs of the API: used on their own by the API-only profile (settings.api)
+and included by urls.py for the full site.
+"""
+from django.urls import path, include
+from .views import metrics_view, readiness
+
+urlpatterns = [
+    # Prometheus metrics and readiness probe
+    path('metrics', metrics_view, name='metrics'),
+    path('ready', readiness, name='readiness'),
+    
+    # API endpoints
+    path('api/auth/', include('users.urls')),  # JWT auth endpoints
+    path('api/campsites/', include('campsites.urls')),
+    path('api/bookings/', include('bookings.urls')),
+    path('api/reviews/', include('reviews.urls')),  # Add reviews URLs
+    path('api/public/campsites/', include('campsites.async_urls')),  # Async read endpoints
+]
@@ -11,6 +11,16 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+# Serve only the async public endpoints (settings.asgi) unless DJANGO_ENV
+# says otherwise; the rest of the site runs on the WSGI/gevent workers
+os.environ.setdefault('DJANGO_ENV', 'asgi')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happy_camper_project.settings')
 
 application = get_asgi_application()
+
+# Do Django's lazy first-request work now; in the gunicorn master when
+# preload_app is on, so workers inherit it
+from django.conf import settings  # noqa: E402
+if settings.WARMUP_ENABLED:
+    from happy_camper_project.warmup import warm_up
+    warm_up()
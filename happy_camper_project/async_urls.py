@@ -0,0 +1,11 @@
+"""
+URLs of the ASGI workers (settings.asgi): the async public read endpoints
+and the readiness probe. The sync API stays on the WSGI workers.
+"""
+from django.urls import path, include
+from .views import readiness
+
+urlpatterns = [
+    path('ready', readiness, name='readiness'),
+    path('api/public/campsites/', include('campsites.async_urls')),  # Async read endpoints
+]
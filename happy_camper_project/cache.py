@@ -0,0 +1,113 @@
+"""
+Shared cache helpers.
+
+Keys are namespaced and versioned: invalidate(namespace) bumps the
+namespace version so every key in it is orphaned at once without having to
+know or delete them. get_or_set() serves values with stale-while-revalidate
+semantics and single-flight recomputation, so when a hot key expires one
+worker recomputes it while everyone else keeps getting the stale copy.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .performance import record_cache
+
+# Seconds a value may be served stale past its timeout while one worker
+# recomputes it
+DEFAULT_STALE_TIMEOUT = 60
+
+# Upper bound for a recomputation; the lock expires after this so a crashed
+# worker can't block a key forever
+LOCK_TIMEOUT = 30
+
+# How long a worker that finds neither a value nor the lock waits for the
+# lock holder before computing the value itself
+WAIT_TIMEOUT = 5
+WAIT_INTERVAL = 0.05
+
+
+def _prefix():
+    return getattr(settings, 'CACHE_KEY_NAMESPACE', 'hc')
+
+
+def _version_key(namespace):
+    return f'{_prefix()}:ns:{namespace}'
+
+
+def _new_version():
+    # Microseconds since the epoch: a version key that was evicted comes back
+    # higher than any version handed out before, never as an old one
+    return time.time_ns() // 1000
+
+
+def namespace_version(namespace):
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def make_key(namespace, *parts):
+    """Build a versioned cache key such as 'hc:campsites:v3:featured:host'."""
+    version = namespace_version(namespace)
+    return ':'.join([_prefix(), namespace, f'v{version}', *(str(part) for part in parts)])
+
+
+def invalidate(namespace):
+    """Orphan every key in a namespace by bumping its version."""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), _new_version(), None)
+
+
+def get_or_set(key, compute, timeout=300, stale_timeout=DEFAULT_STALE_TIMEOUT):
+    """
+    Return the cached value for key, calling compute() to fill it.
+
+    Values are stored with a soft expiry `timeout` seconds out and kept for
+    another `stale_timeout` seconds. A read past the soft expiry returns the
+    stale value unless it wins the recompute lock, in which case it refreshes
+    the entry. On a cold miss only the lock holder computes; other callers
+    wait for its result for up to WAIT_TIMEOUT seconds.
+    """
+    entry = cache.get(key)
+    now = time.time()
+    record_cache(entry is not None)
+    if entry is not None:
+        value, fresh_until = entry
+        if now < fresh_until or not _acquire(key):
+            return value
+        return _refresh(key, compute, timeout, stale_timeout)
+
+    if _acquire(key):
+        return _refresh(key, compute, timeout, stale_timeout)
+
+    deadline = now + WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return compute()
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _acquire(key):
+    return cache.add(_lock_key(key), 1, LOCK_TIMEOUT)
+
+
+def _refresh(key, compute, timeout, stale_timeout):
+    try:
+        value = compute()
+        cache.set(key, (value, time.time() + timeout), timeout + stale_timeout)
+        return value
+    finally:
+        cache.delete(_lock_key(key))
@@ -0,0 +1,167 @@
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Share of writes that also cull; counting the rows on every write would
+# cost more than the write itself
+DEFAULT_CULL_PROBABILITY = 0.01
+
+
+class SQLiteCache(BaseCache):
+    """
+    Cache stored in a standalone SQLite file, shared by every process on the
+    host. Meant for running several local workers against one cache without
+    a Redis server; unlike FileBasedCache, add() and incr() are atomic across
+    processes, which the rate limiter and single-flight locks rely on.
+
+        CACHES = {'default': {
+            'BACKEND': 'happy_camper_project.cache_backends.SQLiteCache',
+            'LOCATION': '/tmp/happy_camper_cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_PROBABILITY': 0.01},
+        }}
+
+    About one write in 1 / CULL_PROBABILITY deletes the expired rows and,
+    if more than MAX_ENTRIES are left, the 1 / CULL_FREQUENCY of them that
+    expire soonest, so the table can briefly hold a few more than MAX_ENTRIES.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        options = params.get('OPTIONS', {})
+        self._cull_probability = float(options.get('CULL_PROBABILITY', DEFAULT_CULL_PROBABILITY))
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self._path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _expiry(self, timeout):
+        timeout = self.get_backend_timeout(timeout)
+        return None if timeout is None else time.time() + timeout
+
+    def _fetch(self, key, now):
+        row = self._connection.execute(
+            'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, now),
+        ).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache WHERE key = ? AND expires <= ?', (key, now))
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout)),
+            )
+            added = cursor.rowcount == 1
+        if added:
+            self._maybe_cull()
+        return added
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._fetch(key, time.time())
+        return default if value is None else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._connection.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout)),
+        )
+        self._maybe_cull()
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._expiry(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._fetch(key, time.time()) is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._transaction() as connection:
+            value = self._fetch(key, time.time())
+            if value is None:
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+            return value
+
+    def clear(self):
+        self._connection.execute('DELETE FROM cache')
+
+    def cull(self):
+        """
+        Delete expired rows, then the soonest to expire if more than
+        MAX_ENTRIES are left. Returns the number of rows deleted.
+        """
+        with self._transaction() as connection:
+            deleted = connection.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),)).rowcount
+            count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            if count > self._max_entries:
+                # Entries that never expire (namespace versions) go last
+                excess = count if self._cull_frequency == 0 else count // self._cull_frequency
+                deleted += connection.execute(
+                    'DELETE FROM cache WHERE key IN '
+                    '(SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                    (max(excess, count - self._max_entries),),
+                ).rowcount
+            return deleted
+
+    def _maybe_cull(self):
+        if random.random() < self._cull_probability:
+            self.cull()
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests
+        pass
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection)
+
+
+class _ImmediateTransaction:
+    """Take the SQLite write lock up front so read-modify-write is atomic."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute('ROLLBACK' if exc_type else 'COMMIT')
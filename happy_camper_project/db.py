@@ -0,0 +1,43 @@
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+
+
+def is_locked_error(error):
+    return 'database is locked' in str(error) or 'database table is locked' in str(error)
+
+
+def retry_on_locked(func=None, *, using='default', attempts=None, backoff=None):
+    """
+    Run func in a transaction and retry it a bounded number of times when
+    SQLite reports the database as locked, with jittered exponential backoff.
+
+    With OPTIONS['transaction_mode'] = 'IMMEDIATE' the transaction takes the
+    write lock when it begins, so a locked error means busy_timeout ran out
+    before anything was written and the whole function can safely run again.
+    Nested calls inside an outer atomic block are not retried: only the
+    outermost transaction can be rolled back and restarted.
+    """
+    if func is None:
+        return functools.partial(retry_on_locked, using=using, attempts=attempts, backoff=backoff)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if connections[using].in_atomic_block:
+            return func(*args, **kwargs)
+
+        tries = attempts or getattr(settings, 'DB_LOCKED_RETRY_ATTEMPTS', 3)
+        delay = backoff or getattr(settings, 'DB_LOCKED_RETRY_BACKOFF', 0.05)
+        for attempt in range(1, tries + 1):
+            try:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if attempt == tries or not is_locked_error(error):
+                    raise
+            time.sleep(delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    return wrapper
@@ -0,0 +1,101 @@
+"""
+Serving the single-page app.
+
+The SPA shell (index.html) is held in memory together with its gzip and
+brotli encodings and an ETag, and only re-read when the file on disk
+changes, checked at most every FRONTEND_INDEX_CHECK_INTERVAL seconds. The
+catch-all route therefore costs a header lookup per hit.
+
+Vite's build assets carry a content hash in their name. They are collected
+into STATIC_ROOT next to Django's own static files, compressed by
+CompressedManifestStaticFilesStorage and served by WhiteNoise with
+far-future cache headers (WHITENOISE_IMMUTABLE_FILE_TEST).
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True)
+class Shell:
+    source: tuple
+    etag: str
+    last_modified: str
+    # Content-Encoding ('' for none) -> body
+    bodies: dict
+
+    def etag_header(self, encoding):
+        """ETag of one encoding of the shell; each encoding needs its own."""
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+
+class SPAIndex:
+    """In-memory copy of the SPA shell, reloaded when the build changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shell = None
+        self._checked = None
+
+    def candidates(self):
+        # The built shell, else the development one loading the Vite dev server
+        return [
+            settings.FRONTEND_INDEX_PATH,
+            os.path.join(settings.BASE_DIR, 'templates', 'index.html'),
+        ]
+
+    def get(self):
+        interval = getattr(settings, 'FRONTEND_INDEX_CHECK_INTERVAL', 1)
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < interval:
+            return self._shell
+        with self._lock:
+            if self._checked is None or now - self._checked >= interval:
+                self._shell = self._load(self._shell)
+                self._checked = now
+        return self._shell
+
+    def _load(self, current):
+        for path in self.candidates():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            source = (path, stat.st_mtime_ns, stat.st_size)
+            if current is not None and current.source == source:
+                return current
+            with open(path, 'rb') as handle:
+                body = handle.read()
+            bodies = {'': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                bodies['br'] = brotli.compress(body)
+            return Shell(
+                source=source,
+                etag=hashlib.md5(body, usedforsecurity=False).hexdigest(),
+                last_modified=http_date(stat.st_mtime),
+                bodies=bodies,
+            )
+        return None
+
+
+index = SPAIndex()
+
+
+def choose_encoding(accept_encoding, available):
+    """Best encoding of the shell the client accepts: br, then gzip, then none."""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and re.search(rf'\b{encoding}\b(?!;\s*q=0(\.0*)?\b)', accept_encoding):
+            return encoding
+    return ''
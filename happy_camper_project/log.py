@@ -0,0 +1,212 @@
+"""
+Logging that stays off the request path.
+
+Request threads only put records on an in-memory queue (QueueHandler); a
+background OS thread per process formats them as JSON lines and writes them
+to the real handlers, including size-based rotation of the log file. A
+full queue drops records rather than blocking the request.
+
+Every record carries the ID of the request it was logged in
+(RequestIDMiddleware, RequestIDFilter), and SamplingFilter keeps only a
+share of the per-request INFO lines, sampled by request so a request's
+lines are kept or dropped together. Warnings and errors are never sampled.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import re
+import uuid
+import weakref
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from . import threads
+
+# Accepted from the proxy's X-Request-ID; anything else gets a new ID
+REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes of every LogRecord, the rest came in through `extra`
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_request_id = ContextVar('request_id', default=None)
+
+
+class RequestIDMiddleware:
+    """
+    Give each request an ID, taken from the proxy's X-Request-ID header when
+    it sends one, for log records and the X-Request-ID response header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get('X-Request-ID', '')
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        token = _request_id.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_id.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
+
+
+class RequestIDFilter(logging.Filter):
+    """Add the current request's ID; runs on the thread that logs the record."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep `rate` of the records below WARNING."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        key = _request_id.get() or f'{record.created}:{record.lineno}'
+        return zlib.crc32(key.encode()) / 2 ** 32 < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'pid': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+_queue_handlers = weakref.WeakSet()
+
+
+class QueueHandler(logging.Handler):
+    """
+    Pass records to the `targets` handlers through a bounded queue and a
+    listener thread. The listener starts with the first record, and
+    again in a forked child (a gunicorn worker), where the master's thread
+    does not exist.
+
+    The listener is a real OS thread even under gevent (see
+    happy_camper_project.threads): as a greenlet, its blocking writes and
+    rotations would stall every request of the worker. The targets are only
+    ever used from that thread.
+
+    Like logging.handlers.QueueHandler, which dictConfig only learned to
+    wire to other handlers in Python 3.12.
+    """
+
+    def __init__(self, targets=(), maxsize=10000):
+        super().__init__()
+        self.maxsize = maxsize
+        # From dictConfig the targets are 'cfg://handlers.<name>' references,
+        # which its list resolves on indexing but not on iteration. It sets
+        # up handlers in name order, so the targets must sort before this one.
+        self.targets = [targets[index] for index in range(len(targets))]
+        self.dropped = 0
+        self._after_fork()
+        _queue_handlers.add(self)
+
+    def prepare(self, record):
+        # Only what the listener thread cannot do: the message arguments
+        # and the traceback may change or go away once the request moves on
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        if not self._listening:
+            self.start()
+        # SimpleQueue has no size limit, so this one is approximate
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def start(self):
+        # Held for as long as a listener runs, so only one is started
+        if self._stopped.acquire(blocking=False):
+            threads.start_thread(self._listen, self.queue, self._stopped)
+        self._listening = True
+
+    def _listen(self, records, stopped):
+        try:
+            while (record := records.get()) is not None:
+                for handler in self.targets:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+        finally:
+            stopped.release()
+
+    def close(self, timeout=5):
+        if self._listening:
+            # Whatever is queued is written before the listener exits
+            self.queue.put(None)
+            self._stopped.acquire(timeout=timeout)
+            self._after_fork()
+        super().close()
+
+    def _after_fork(self):
+        self.queue = threads.SimpleQueue()
+        self._stopped = threads.Lock()
+        self._listening = False
+
+
+def _restart_after_fork():
+    for handler in list(_queue_handlers):
+        handler._after_fork()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+class RotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler for a file shared by several processes: a process
+    that finds the file already rotated by another one reopens it instead
+    of rotating it again.
+    """
+
+    def shouldRollover(self, record):
+        if self.stream is not None:
+            try:
+                current = os.stat(self.baseFilename)
+                rotated = not os.path.samestat(current, os.fstat(self.stream.fileno()))
+            except FileNotFoundError:
+                rotated = True
+            if rotated:
+                self.stream.close()
+                self.stream = self._open()
+        return super().shouldRollover(record)
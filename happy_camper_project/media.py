@@ -0,0 +1,181 @@
+"""
+Serving uploaded media (campsite images, profile pictures) when they are
+stored on local disk.
+
+serve() only checks the request and then, depending on MEDIA_SENDFILE,
+hands the file to the front proxy:
+
+- 'x-accel-redirect' (nginx): the response carries
+  X-Accel-Redirect: <MEDIA_ACCEL_REDIRECT_PREFIX><path> and nginx sends the
+  file from an internal location, e.g.
+
+      location /protected-media/ {
+          internal;
+          alias /srv/happy_camper/media/;
+      }
+
+- 'x-sendfile' (Apache mod_xsendfile, lighttpd): X-Sendfile: <absolute path>
+
+With neither, the file is streamed by Django with Range and conditional GET
+support. FileResponse goes through the server's wsgi.file_wrapper, so under
+gunicorn the body is sent with sendfile() from the requested offset.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """File object limited to `length` bytes from its current position."""
+
+    def __init__(self, handle, length):
+        self._handle = handle
+        self._end = handle.tell() + length
+        self._remaining = length
+        self.name = handle.name
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._handle.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # gevent's sendfile() fallback seeks back to where it started and
+        # reads from there, so the limit is kept as an end offset
+        position = self._handle.seek(offset, whence)
+        self._remaining = max(self._end - position, 0)
+        return position
+
+    def tell(self):
+        return self._handle.tell()
+
+    def fileno(self):
+        # Lets gunicorn sendfile() from the current offset; the length comes
+        # from Content-Length
+        return self._handle.fileno()
+
+    def close(self):
+        self._handle.close()
+
+
+@require_safe
+def serve(request, path):
+    if path.split('/', 1)[0] not in settings.MEDIA_PUBLIC_DIRS:
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    backend = getattr(settings, 'MEDIA_SENDFILE', '')
+    if backend == 'x-accel-redirect':
+        # nginx handles missing files, ranges and conditional requests
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        return response
+    if backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+        return response
+    return _serve_file(request, full_path, content_type, encoding)
+
+
+def _serve_file(request, full_path, content_type, encoding):
+    try:
+        handle = open(full_path, 'rb')
+    except (FileNotFoundError, IsADirectoryError):
+        raise Http404
+    file_stat = os.fstat(handle.fileno())
+    if not stat.S_ISREG(file_stat.st_mode):
+        handle.close()
+        raise Http404
+
+    size = file_stat.st_size
+    etag = f'"{file_stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = http_date(file_stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': last_modified,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}',
+    }
+
+    if _not_modified(request, etag, file_stat.st_mtime):
+        handle.close()
+        return HttpResponseNotModified(headers=headers)
+
+    byte_range = _requested_range(request, etag, last_modified, size)
+    if byte_range == 'unsatisfiable':
+        handle.close()
+        return HttpResponse(status=416, headers={'Content-Range': f'bytes */{size}'})
+
+    if byte_range is None:
+        length, status = size, 200
+    else:
+        start, end = byte_range
+        length, status = end - start + 1, 206
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        handle.seek(start)
+
+    response = FileResponse(RangeFile(handle, length), status=status, content_type=content_type, headers=headers)
+    response['Content-Length'] = length
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        # Weak comparison, as for any GET or HEAD
+        tags = parse_etags(if_none_match)
+        return tags == ['*'] or any(tag.removeprefix('W/') == etag for tag in tags)
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and int(mtime) <= since
+
+
+def _requested_range(request, etag, last_modified, size):
+    """
+    (start, end) of a satisfiable single byte range, 'unsatisfiable', or
+    None to send the whole file (no Range header, several ranges, or an
+    If-Range that no longer matches).
+    """
+    header = request.headers.get('Range')
+    if not header:
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (etag, last_modified):
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length or not size:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return 'unsatisfiable'
+    return start, min(int(last), size - 1) if last else size - 1
@@ -0,0 +1,257 @@
+"""
+In-process metrics registry exported in the Prometheus text format.
+
+Each process keeps its counters and histograms in memory. When
+METRICS_MULTIPROCESS_DIR is set (one directory shared by all gunicorn
+workers, emptied when the master starts), every process also writes its
+samples to <dir>/<pid>-<start time>.json from a background thread every
+METRICS_FLUSH_INTERVAL seconds and on exit. When a worker exits the master
+folds its file into <dir>/archive.json (mark_process_dead), so the
+directory doesn't grow with every restart and counters never go backwards.
+The exporter sums the archive and the files of the live processes.
+"""
+import atexit
+import json
+import math
+import os
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from . import threads
+
+# Samples of the processes that have exited, in METRICS_MULTIPROCESS_DIR
+ARCHIVE_FILE = 'archive.json'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# name -> (type, help, histogram buckets)
+FAMILIES = {
+    'http_requests_total': ('counter', 'HTTP requests by view, method and status code.', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency by view.', LATENCY_BUCKETS),
+    'http_request_db_queries': ('histogram', 'Database queries per HTTP request by view.', QUERY_BUCKETS),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in database queries by view.', None),
+    'cache_requests_total': ('counter', 'Cache lookups by result (hit or miss).', None),
+    'booking_conflicts_total': ('counter', 'Booking writes rejected because the dates were full.', None),
+    'rate_limit_rejections_total': ('counter', 'Requests rejected by the rate limiter by policy.', None),
+}
+
+
+class Registry:
+    def __init__(self):
+        # Shared with the flusher thread, which is a real OS thread
+        self._lock = threads.Lock()
+        self._samples = defaultdict(float)
+        self._dirty = False
+        self._flusher_pid = None
+        self._filename = None
+        self._filename_pid = None
+
+    def inc(self, name, labels=None, amount=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._samples[key] += amount
+            self._dirty = True
+        self._ensure_flusher()
+
+    def observe(self, name, value, labels=None):
+        buckets = FAMILIES[name][2]
+        labels = _label_key(labels)
+        with self._lock:
+            for bound in buckets:
+                if value <= bound:
+                    self._samples[(f'{name}_bucket', labels + (('le', _format_value(bound)),))] += 1
+            self._samples[(f'{name}_bucket', labels + (('le', '+Inf'),))] += 1
+            self._samples[(f'{name}_sum', labels)] += value
+            self._samples[(f'{name}_count', labels)] += 1
+            self._dirty = True
+        self._ensure_flusher()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._samples)
+
+    def _ensure_flusher(self):
+        # One flusher per process; threads don't survive a fork, so a worker
+        # forked from a preloaded master starts its own
+        if self._flusher_pid == os.getpid() or not getattr(settings, 'METRICS_MULTIPROCESS_DIR', None):
+            return
+        self._flusher_pid = os.getpid()
+        # Off the event loop under gevent: file writes would stall requests
+        threads.start_thread(self._flush_periodically)
+
+    def _flush_periodically(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+        while True:
+            threads.sleep(interval)
+            if self._dirty:
+                self.flush()
+
+    @property
+    def filename(self):
+        """This process's file; a new process reusing a PID gets another one."""
+        if self._filename_pid != os.getpid():
+            self._filename_pid = os.getpid()
+            self._filename = f'{os.getpid()}-{time.time_ns()}.json'
+        return self._filename
+
+    def flush(self):
+        # Nothing was recorded in a process that never loaded the settings
+        if not settings.configured:
+            return
+        directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+        if not directory:
+            return
+        with self._lock:
+            self._dirty = False
+            samples = [[name, list(labels), value] for (name, labels), value in self._samples.items()]
+        _write_json(os.path.join(directory, self.filename), samples)
+
+    def collect(self):
+        """Samples of this process plus, in multiprocess mode, every other process."""
+        directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+        if not directory:
+            return defaultdict(float, self.snapshot())
+        for _ in range(3):
+            try:
+                return self._collect(directory)
+            except FileNotFoundError:
+                # A file was folded into the archive meanwhile; read it again
+                continue
+        return self._collect(directory, missing_ok=True)
+
+    def _collect(self, directory, missing_ok=False):
+        totals = defaultdict(float, self.snapshot())
+        # The directory before the archive: a file missing from the archive
+        # read afterwards is still listed, or found gone when read
+        filenames = os.listdir(directory)
+        archive = _read_archive(directory)
+        _add_samples(totals, archive['samples'])
+        skip = {ARCHIVE_FILE, self.filename, *archive['merged']}
+        for filename in filenames:
+            if not filename.endswith('.json') or filename in skip:
+                continue
+            try:
+                _add_samples(totals, _read_json(os.path.join(directory, filename)))
+            except FileNotFoundError:
+                if not missing_ok:
+                    raise
+            except ValueError:
+                continue
+        return totals
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def inc(name, labels=None, amount=1):
+    registry.inc(name, labels, amount)
+
+
+def observe(name, value, labels=None):
+    registry.observe(name, value, labels)
+
+
+def export():
+    """Render all metrics in the Prometheus text exposition format."""
+    samples = registry.collect()
+    lines = []
+    for family, (kind, help_text, _) in FAMILIES.items():
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        names = (family,) if kind == 'counter' else (f'{family}_bucket', f'{family}_sum', f'{family}_count')
+        family_samples = [(key, value) for key, value in samples.items() if key[0] in names]
+        for (name, labels), value in sorted(family_samples, key=_sort_key):
+            lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def mark_process_dead(pid, directory):
+    """
+    Fold the samples of an exited process into the archive and delete its
+    file. Run by the gunicorn master (child_exit) once the worker is gone.
+    """
+    archive = _read_archive(directory)
+    filenames = [
+        filename for filename in os.listdir(directory)
+        if filename.startswith(f'{pid}-') and filename.endswith('.json')
+    ]
+    totals = defaultdict(float)
+    _add_samples(totals, archive['samples'])
+    for filename in filenames:
+        if filename in archive['merged']:
+            # Folded in before, but not deleted
+            continue
+        try:
+            _add_samples(totals, _read_json(os.path.join(directory, filename)))
+        except (OSError, ValueError):
+            continue
+    # Files already deleted need not be remembered any more
+    merged = [
+        filename for filename in archive['merged']
+        if os.path.exists(os.path.join(directory, filename))
+    ]
+    _write_json(os.path.join(directory, ARCHIVE_FILE), {
+        'merged': sorted(set(merged) | set(filenames)),
+        'samples': [[name, list(labels), value] for (name, labels), value in totals.items()],
+    })
+    # Only once the archive has them, so the exporter never misses them
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            pass
+
+
+def _read_json(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def _write_json(path, data):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(data, handle)
+    os.replace(temporary, path)
+
+
+def _read_archive(directory):
+    try:
+        return _read_json(os.path.join(directory, ARCHIVE_FILE))
+    except (FileNotFoundError, ValueError):
+        return {'merged': [], 'samples': []}
+
+
+def _add_samples(totals, samples):
+    for name, labels, value in samples:
+        totals[(name, tuple(tuple(pair) for pair in labels))] += value
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _sort_key(item):
+    (name, labels), _ = item
+    plain = tuple(pair for pair in labels if pair[0] != 'le')
+    bound = dict(labels).get('le')
+    return (plain, name, math.inf if bound in (None, '+Inf') else float(bound))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _format_value(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,54 +1,271 @@
-from django.core.cache import cache
-from django.http import HttpResponseTooManyRequests
+import logging
+import math
 import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+
+from . import performance
+from .metrics import registry
+
+performance_logger = logging.getLogger('happy_camper.performance')
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Parse a rate such as '100/hour' or '10/m' into (calls, period seconds)."""
+    calls, period = rate.split('/')
+    return int(calls), RATE_PERIODS[period.strip()[0].lower()]
+
+
+def get_client_ip(request, trusted_proxies=0):
+    """
+    Return the client address. X-Forwarded-For is only trusted for the
+    number of reverse proxies we run: each one appends the address it
+    received the request from, so the client is the Nth entry from the right
+    and anything further left may have been forged by the client.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    if not trusted_proxies:
+        return remote_addr
+    forwarded = [
+        address.strip()
+        for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+        if address.strip()
+    ]
+    if not forwarded:
+        return remote_addr
+    return forwarded[-min(trusted_proxies, len(forwarded))]
+
 
 class CustomRateLimitMiddleware:
+    """
+    Sliding-window-counter rate limiter. Each policy keeps one integer
+    counter per client per fixed window in the cache; the request rate is
+    estimated from the current window plus the previous window weighted by
+    how much of it still overlaps the sliding window. That costs a handful
+    of cache round-trips on small integers per request, whatever the limit.
+
+    Policies come from settings.RATE_LIMITS (first matching policy wins):
+
+        RATE_LIMITS = {
+            'login': {'path': '/api/auth/token/', 'methods': ['POST'], 'rate': '10/m', 'scope': 'ip'},
+            'api': {'path': '/api/', 'rate': '1000/h', 'scope': 'user'},
+        }
+
+    A 'user' scope limits authenticated users by id (session or a valid JWT
+    access token) and falls back to the client IP for anonymous requests.
+    """
+
     def __init__(self, get_response):
+        if not getattr(settings, 'RATE_LIMIT_ENABLED', False):
+            raise MiddlewareNotUsed
         self.get_response = get_response
-        # Default rate limits (can be overridden in settings)
-        self.rate_limits = {
-            'POST': {'calls': 100, 'period': 3600},  # 100 POST requests per hour
-            'GET': {'calls': 1000, 'period': 3600},  # 1000 GET requests per hour
-        }
+        self.trusted_proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+        self.exempt_ips = set(getattr(settings, 'RATE_LIMIT_EXEMPT_IPS', []))
+        self.exempt_paths = tuple(getattr(settings, 'RATE_LIMIT_EXEMPT_PATHS', ['/admin/']))
+        self.policies = []
+        for name, policy in getattr(settings, 'RATE_LIMITS', {}).items():
+            calls, period = parse_rate(policy['rate'])
+            methods = {method.upper() for method in policy.get('methods', [])}
+            self.policies.append(
+                (name, policy.get('path', '/'), methods, calls, period, policy.get('scope', 'ip'))
+            )
 
     def __call__(self, request):
-        if not self._should_rate_limit(request):
+        if request.path.startswith(self.exempt_paths):
             return self.get_response(request)
 
-        key = self._get_cache_key(request)
-        now = time.time()
-        
-        # Get the request history for this IP
-        request_history = cache.get(key, [])
-        
-        # Clean old requests from history
-        method_limits = self.rate_limits.get(request.method, self.rate_limits['GET'])
-        request_history = [ts for ts in request_history 
-                         if now - ts < method_limits['period']]
-
-        if len(request_history) >= method_limits['calls']:
-            return HttpResponseTooManyRequests(
-                "Rate limit exceeded. Please try again later.",
-                content_type="text/plain"
-            )
+        policy = self._get_policy(request)
+        if policy is None:
+            return self.get_response(request)
+
+        ip = get_client_ip(request, self.trusted_proxies)
+        if ip in self.exempt_ips:
+            return self.get_response(request)
+
+        name, _, _, calls, period, scope = policy
+        user_id = self._get_user_id(request) if scope == 'user' else None
+        ident = f'user:{user_id}' if user_id is not None else f'ip:{ip}'
 
-        # Add current request timestamp
-        request_history.append(now)
-        cache.set(key, request_history, method_limits['period'])
+        retry_after = self._hit(f'rate_limit:{name}:{ident}', calls, period)
+        if retry_after:
+            response = JsonResponse(
+                {'detail': 'Rate limit exceeded. Please try again later.'},
+                status=429,
+            )
+            response['Retry-After'] = str(retry_after)
+            registry.inc('rate_limit_rejections_total', {'policy': name})
+            return response
 
         return self.get_response(request)
 
-    def _should_rate_limit(self, request):
-        """Determine if the request should be rate limited."""
-        # Don't rate limit admin or internal IPs
-        if request.path.startswith('/admin/'):
-            return False
-        if request.META.get('REMOTE_ADDR') in ['127.0.0.1', 'localhost']:
-            return False
-        return True
-
-    def _get_cache_key(self, request):
-        """Generate a cache key based on IP and method."""
-        ip = request.META.get('HTTP_X_FORWARDED_FOR', 
-                            request.META.get('REMOTE_ADDR'))
-        return f"rate_limit:{ip}:{request.method}"
+    def _get_policy(self, request):
+        for policy in self.policies:
+            _, path, methods, _, _, _ = policy
+            if request.path.startswith(path) and (not methods or request.method in methods):
+                return policy
+        return None
+
+    def _get_user_id(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.pk
+
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not header.startswith('Bearer '):
+            return None
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        try:
+            # Signature and expiry checks only; no database access
+            return AccessToken(header[7:].strip())[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+
+    def _hit(self, key, calls, period):
+        """
+        Count a request against key. Returns 0 when it is allowed, otherwise
+        the number of seconds until the next request would be allowed.
+        """
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f'{key}:{window}'
+        previous_key = f'{key}:{window - 1}'
+
+        cache.add(current_key, 0, period * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # The counter expired between add() and incr()
+            cache.set(current_key, 1, period * 2)
+            current = 1
+        previous = cache.get(previous_key, 0)
+
+        weight = (period - elapsed) / period
+        if previous * weight + current <= calls:
+            return 0
+
+        # Rejected requests don't use up the allowance
+        cache.decr(current_key)
+        current -= 1
+        return self._retry_after(previous, current, calls, period, elapsed)
+
+    def _retry_after(self, previous, current, calls, period, elapsed):
+        # Requests to shed before the estimate leaves room for one more
+        excess = previous * (period - elapsed) / period + current - (calls - 1)
+        remaining = period - elapsed
+        if previous and excess <= previous * remaining / period:
+            wait = excess * period / previous
+        else:
+            # Wait for the next window, where this window's count decays instead
+            wait = remaining + (period * (1 - (calls - 1) / current) if current else 0)
+        return max(math.ceil(wait), 1)
+
+
+def view_name(view_func, method):
+    """
+    Name a resolved view for logs and metrics: 'CampsiteViewSet.list' for
+    DRF viewsets, the class name for other class-based views and the
+    function name otherwise.
+    """
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is None:
+        return getattr(view_func, '__name__', type(view_func).__name__)
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    return f'{cls.__name__}.{action}' if action else cls.__name__
+
+
+class PerformanceMiddleware:
+    """
+    Record wall time, query count, DB time, serializer time and cache
+    hits/misses for each request. They are returned in a Server-Timing
+    header (when SERVER_TIMING_ENABLED) and logged as one structured line
+    on the happy_camper.performance logger. Requests slower than
+    SLOW_REQUEST_THRESHOLD_MS are logged as warnings with their SQL,
+    repeated statements first, which is how N+1 queries show up.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_ENABLED', True)
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+
+    def __call__(self, request):
+        metrics, token = performance.start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(performance.query_timer))
+                response = self.get_response(request)
+        finally:
+            performance.finish_request(token)
+
+        elapsed = metrics.elapsed
+        if self.server_timing:
+            timings = [response['Server-Timing']] if response.has_header('Server-Timing') else []
+            response['Server-Timing'] = ', '.join(timings + [
+                f'total;dur={elapsed * 1000:.1f}',
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+                f'serializer;dur={metrics.serializer_time * 1000:.1f}',
+                f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+            ])
+        self._log(request, response, metrics, elapsed)
+        self._record(request, response, metrics, elapsed)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = performance.current_metrics()
+        if metrics is not None:
+            metrics.view = view_name(view_func, request.method)
+
+    def _record(self, request, response, request_metrics, elapsed):
+        view = request_metrics.view or 'unmatched'
+        registry.inc('http_requests_total', {
+            'view': view, 'method': request.method, 'status': response.status_code,
+        })
+        registry.observe('http_request_duration_seconds', elapsed, {'view': view})
+        registry.observe('http_request_db_queries', request_metrics.queries, {'view': view})
+        registry.inc('db_query_duration_seconds_total', {'view': view}, request_metrics.db_time)
+
+    def _log(self, request, response, metrics, elapsed):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': metrics.view,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'serializer_ms': round(metrics.serializer_time * 1000, 1),
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        }
+        message = ' '.join(f'{key}={value}' for key, value in fields.items())
+        if elapsed < self.slow_threshold:
+            performance_logger.info(message, extra={'performance': fields})
+            return
+
+        repeated = Counter(sql for sql, _ in metrics.captured)
+        statements = sorted(
+            metrics.captured, key=lambda query: (-repeated[query[0]], -query[1])
+        )
+        seen = set()
+        lines = []
+        for sql, duration in statements:
+            if sql not in seen:
+                seen.add(sql)
+                lines.append(f'  [{repeated[sql]}x, {duration * 1000:.1f}ms] {sql}')
+        performance_logger.warning(
+            'slow request %s\n%s', message, '\n'.join(lines),
+            extra={'performance': fields, 'sql': [sql for sql, _ in metrics.captured]},
+        )
@@ -0,0 +1,116 @@
+"""
+Per-request performance accounting.
+
+PerformanceMiddleware (happy_camper_project.middleware) starts a
+RequestMetrics for every request; code running inside the request adds to
+it through the helpers below without needing access to the request.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from rest_framework import serializers
+
+from .metrics import registry
+
+# Statements kept per request for the slow-request log
+MAX_CAPTURED_QUERIES = 200
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    captured: list = field(default_factory=list)
+    view: str = ''
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if len(self.captured) < MAX_CAPTURED_QUERIES:
+            self.captured.append((sql, duration))
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def finish_request(token):
+    _current.reset(token)
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_cache(hit):
+    """Count a cache lookup against the current request and in the metrics."""
+    registry.inc('cache_requests_total', {'result': 'hit' if hit else 'miss'})
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def query_timer(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook timing every query of the request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - started)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        started = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            _add_serializer_time(time.perf_counter() - started)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin adding the time spent building .data (including any
+    queries it triggers) to the current request's serializer timing.
+    """
+
+    @property
+    def data(self):
+        started = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            _add_serializer_time(time.perf_counter() - started)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is serializers.ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
+
+
+def _add_serializer_time(duration):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.serializer_time += duration
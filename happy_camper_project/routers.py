@@ -0,0 +1,156 @@
+"""
+Primary/replica database routing.
+
+Writes always go to 'default'. Reads go to the 'replica' alias only where a
+view has opted in (ReplicaReadMixin for DRF views, the read_from_replica
+decorator for function views) and only until the request writes something:
+from then on the request reads from the primary, and
+ReplicaStickinessMiddleware keeps the client on the primary for
+REPLICA_STICKY_SECONDS so it reads its own writes despite replication lag.
+Without a 'replica' entry in DATABASES everything uses 'default'.
+"""
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+PRIMARY = 'default'
+
+# Cookie holding the time until which a client reads from the primary
+STICKY_COOKIE = 'db_primary_until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class RoutingState:
+    read_replica: bool = False
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        state = _state.get()
+        if (
+            state is None
+            or not state.read_replica
+            or state.pinned
+            or not replica_configured()
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, never migrated on its own
+        return db == PRIMARY
+
+
+class _ReplicaReads:
+    """Context manager letting reads in the current request use the replica."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    def __enter__(self):
+        self.token = None
+        state = _state.get()
+        if state is None:
+            state = RoutingState()
+            self.token = _state.set(state)
+        self.state = state
+        self.previous = state.read_replica
+        state.read_replica = self.enabled
+        return state
+
+    def __exit__(self, *exc_info):
+        self.state.read_replica = self.previous
+        if self.token is not None:
+            _state.reset(self.token)
+
+
+def replica_reads(enabled=True):
+    return _ReplicaReads(enabled)
+
+
+def read_from_replica(view):
+    """Decorator for function views (sync or async) whose safe-method reads may use the replica."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with replica_reads(request.method in SAFE_METHODS):
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request.method in SAFE_METHODS):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """DRF view mixin sending reads of safe-method requests to the replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request.method in SAFE_METHODS):
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Track database writes per request and pin clients that just wrote to
+    the primary for REPLICA_STICKY_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        state = RoutingState(pinned=pinned_until > time.time())
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote and replica_configured():
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
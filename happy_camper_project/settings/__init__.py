@@ -0,0 +1,18 @@
+"""
+Settings package. manage.py points DJANGO_SETTINGS_MODULE at a concrete
+module (e.g. happy_camper_project.settings.development); servers and
+scripts that point it at the package itself get the module named by
+DJANGO_ENV (development, production, api, the API-only profile, or asgi,
+the profile of the ASGI workers).
+"""
+import os
+
+if os.environ.get('DJANGO_SETTINGS_MODULE') == __name__:
+    if os.environ.get('DJANGO_ENV', 'development') == 'production':
+        from .production import *  # noqa: F401,F403
+    elif os.environ.get('DJANGO_ENV') == 'api':
+        from .api import *  # noqa: F401,F403
+    elif os.environ.get('DJANGO_ENV') == 'asgi':
+        from .asgi import *  # noqa: F401,F403
+    else:
+        from .development import *  # noqa: F401,F403
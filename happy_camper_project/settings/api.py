@@ -0,0 +1,55 @@
+"""
+API-only profile for workers that serve nothing but JWT-authenticated API
+traffic, /metrics and /ready (route /api/ to them at the proxy):
+
+    DJANGO_ENV=api gunicorn -c gunicorn_config.py happy_camper_project.wsgi:application
+
+It builds on the production settings and drops the admin, sessions,
+messages, static files, social accounts and the browsable API, which the
+API never uses, so django.setup() and every request do less. allauth's
+account app stays: its backend lets users obtain tokens with their email.
+"""
+from .production import *  # noqa: F401,F403
+
+API_DROPPED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'allauth.socialaccount',
+]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_DROPPED_APPS]
+
+# No cookies: JWT authentication, no sessions, CSRF or framing concerns for
+# JSON, and no static files
+API_DROPPED_MIDDLEWARE = [
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in API_DROPPED_MIDDLEWARE]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.contrib.messages.context_processors.messages'
+        ],
+    },
+}]
+
+ROOT_URLCONF = 'happy_camper_project.api_urls'
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
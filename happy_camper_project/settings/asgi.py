@@ -0,0 +1,16 @@
+"""
+Profile of the ASGI workers, which serve only the async public read
+endpoints under /api/public/ (and /ready for their probe):
+
+    DJANGO_ENV=asgi GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+        gunicorn -c gunicorn_config.py happy_camper_project.asgi:application
+
+Route /api/public/ to them at the proxy and everything else to the
+WSGI/gevent workers. Under ASGI every sync view runs through
+sync_to_async(thread_sensitive=True), one at a time per worker, so the
+sync API must not be served from here. It builds on the API-only profile,
+which already leaves out sessions and the rest of the cookie middleware.
+"""
+from .api import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'happy_camper_project.async_urls'
@@ -29,16 +29,21 @@ INSTALLED_APPS = [
     'campsites',
     'bookings',
     'reviews',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'happy_camper_project.log.RequestIDMiddleware',
+    'happy_camper_project.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  
+    'happy_camper_project.routers.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'happy_camper_project.middleware.CustomRateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',  
@@ -67,15 +72,89 @@ WSGI_APPLICATION = 'happy_camper_project.wsgi.application'
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Built SPA (cd frontend && npm run build). Its content-hashed assets are
+# collected as static/assets/ and served by WhiteNoise; index.html is kept in
+# memory by happy_camper_project.frontend
+FRONTEND_DIST_DIR = os.path.join(BASE_DIR, 'frontend', 'dist')
+FRONTEND_INDEX_PATH = os.path.join(FRONTEND_DIST_DIR, 'index.html')
+FRONTEND_INDEX_CHECK_INTERVAL = 1
+FRONTEND_STATICFILES_DIRS = [
+    ('assets', os.path.join(FRONTEND_DIST_DIR, 'assets')),
+] if os.path.isdir(os.path.join(FRONTEND_DIST_DIR, 'assets')) else []
+
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
-]
+] + FRONTEND_STATICFILES_DIRS
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Cache forever: files hashed by the manifest storage (name.<12 hex>.ext)
+# and Vite's hashed build assets (assets/name.<8 chars>.ext)
+WHITENOISE_IMMUTABLE_FILE_TEST = (
+    rf'^{STATIC_URL}(.+\.[0-9a-f]{{12}}\.\w+|assets/.+\.[A-Za-z0-9_-]{{8}}\.\w+(\.map)?)$'
+)
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Local media is served by happy_camper_project.media. MEDIA_SENDFILE hands
+# the file to the front proxy: 'x-accel-redirect' (nginx, internal location
+# MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT) or 'x-sendfile'
+# (Apache/lighttpd); empty streams it from Django
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Upload directories (upload_to) anyone may download from
+MEDIA_PUBLIC_DIRS = ['campsite_images', 'profile_pictures']
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# SQLite connection setup, run by Django for every new connection. WAL lets
+# readers run alongside the single writer, and IMMEDIATE transactions take
+# the write lock up front so busy_timeout applies instead of a deferred
+# transaction failing with "database is locked" when it starts writing.
+SQLITE_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA busy_timeout=5000;'
+        'PRAGMA cache_size=-20000;'
+        'PRAGMA mmap_size=134217728;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+}
+
+# Retries of booking/review writes that still find the database locked
+# (see happy_camper_project.db.retry_on_locked)
+DB_LOCKED_RETRY_ATTEMPTS = 3
+DB_LOCKED_RETRY_BACKOFF = 0.05
+
+# Database routing. Views that opt in read from DATABASES['replica'] when one
+# is configured (DATABASE_REPLICA_PATH); clients that just wrote keep reading
+# from the primary for REPLICA_STICKY_SECONDS.
+DATABASE_ROUTERS = ['happy_camper_project.routers.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+# Request instrumentation (happy_camper_project.middleware.PerformanceMiddleware)
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True') == 'True'
+# Requests slower than this are logged with their SQL
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500))
+
+# Metrics (/metrics). Set METRICS_DIR to a directory shared by all gunicorn
+# workers so the endpoint reports totals across processes.
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = 1
+# With METRICS_TOKEN set, scrapes must send it as a Bearer token; otherwise
+# only METRICS_ALLOWED_IPS may scrape, which behind a reverse proxy needs
+# RATE_LIMIT_TRUSTED_PROXIES to see the client address (or block /metrics
+# at the proxy)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Warm-up when the WSGI/ASGI application loads (happy_camper_project.warmup)
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'True') == 'True'
+# Host names to prefill the featured campsites cache for
+WARMUP_HOSTS = [host for host in os.environ.get('WARMUP_HOSTS', '').split(',') if host]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -92,6 +171,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASHER picks the preferred hasher ("pbkdf2" or
+# "argon2", which needs argon2-cffi); the others only verify existing hashes,
+# which are upgraded on the next successful login. Changing
+# PASSWORD_HASH_ITERATIONS rehashes PBKDF2 passwords the same way; unset, the
+# count of the installed Django version applies.
+PASSWORD_HASH_ITERATIONS = int(os.environ['PASSWORD_HASH_ITERATIONS']) if os.environ.get('PASSWORD_HASH_ITERATIONS') else None
+PASSWORD_HASHERS = [
+    'users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'users.hashers.OffloadedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.environ.get('PASSWORD_HASHER', 'pbkdf2') == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -107,7 +202,7 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -134,6 +229,62 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Cache. Each gunicorn worker gets its own memory with "locmem", so use a
+# shared backend wherever more than one worker runs: "redis" in production,
+# "sqlite" (one file shared by local processes) or "file" for local testing.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'happy-camper',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+    'sqlite': {
+        'BACKEND': 'happy_camper_project.cache_backends.SQLiteCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache.sqlite3')),
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+}
+CACHES = {'default': CACHE_BACKENDS[CACHE_BACKEND]}
+# Prefix for keys built by happy_camper_project.cache
+CACHE_KEY_NAMESPACE = 'hc'
+# Seconds the featured campsites response is served before recomputing; new
+# ratings and ranking scores show up in it after at most this long
+FEATURED_CACHE_TIMEOUT = int(os.environ.get('FEATURED_CACHE_TIMEOUT', 300))
+# Seconds the staff dashboard figures are reused
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 60))
+
+# Seconds a "not blacklisted" refresh token answer may be cached. Blacklisting
+# a token overwrites the answer, but other workers only see that through a
+# shared cache, so it is off by default with "locmem".
+TOKEN_BLACKLIST_NEGATIVE_CACHE_TIMEOUT = int(os.environ.get(
+    'TOKEN_BLACKLIST_NEGATIVE_CACHE_TIMEOUT', 0 if CACHE_BACKEND == 'locmem' else 300
+))
+
+# Seconds an authenticated user is cached by CachedJWTAuthentication. With
+# "locmem" a user's changes reach other workers only after this long.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Rate limiting (happy_camper_project.middleware.CustomRateLimitMiddleware).
+# The first policy whose path prefix and methods match a request applies.
+RATE_LIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLE', 'False') == 'True'
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 0))
+RATE_LIMIT_EXEMPT_IPS = [ip for ip in os.environ.get('RATELIMIT_EXEMPT_IPS', '').split(',') if ip]
+RATE_LIMIT_EXEMPT_PATHS = ['/admin/', '/static/']
+RATE_LIMITS = {
+    'login': {'path': '/api/auth/token/', 'methods': ['POST'], 'rate': '20/minute', 'scope': 'ip'},
+    'register': {'path': '/api/auth/register/', 'methods': ['POST'], 'rate': '10/hour', 'scope': 'ip'},
+    'api-write': {'path': '/api/', 'methods': ['POST', 'PUT', 'PATCH', 'DELETE'], 'rate': '100/hour', 'scope': 'user'},
+    'api-read': {'path': '/api/', 'methods': ['GET', 'HEAD'], 'rate': '1000/hour', 'scope': 'user'},
+}
+
 # Authentication backends
 AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend',
@@ -149,3 +300,22 @@ ACCOUNT_USERNAME_REQUIRED = False
 ACCOUNT_AUTHENTICATION_METHOD = 'email'
 ACCOUNT_EMAIL_VERIFICATION = 'mandatory'
 ACCOUNT_UNIQUE_EMAIL = True
+
+# Campsite rankings
+RANKING_PRIOR_WEIGHT = 10  # Number of "virtual" reviews at the site-wide mean
+TRENDING_HALF_LIFE_DAYS = 7
+
+# Background jobs (jobs app), run by "manage.py run_jobs". With JOBS_EAGER
+# enqueued jobs run inline instead, for tests and setups without a worker.
+JOBS_EAGER = os.environ.get('JOBS_EAGER', 'False') == 'True'
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1))
+JOBS_RETRY_BACKOFF = 10  # Seconds before the first retry, doubled for each further one
+JOBS_KEEP_DONE_DAYS = 7
+
+# Email is spooled in the database by the queued backend and sent in
+# batches by the send_queued_email job through EMAIL_QUEUE_BACKEND
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = os.environ.get('EMAIL_QUEUE_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_QUEUE_BATCH_SIZE = 100
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_LEASE = 120  # Seconds a batch is reserved for the drain sending it
@@ -13,20 +13,34 @@ SECRET_KEY = env('DJANGO_SECRET_KEY', default='django-insecure-development-key-c
 DEBUG = True
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+WARMUP_HOSTS = WARMUP_HOSTS or ['localhost:8000', '127.0.0.1:8000']
 
 # Add debug toolbar
 INSTALLED_APPS += ['debug_toolbar']
 MIDDLEWARE = ['debug_toolbar.middleware.DebugToolbarMiddleware'] + MIDDLEWARE
 INTERNAL_IPS = ['127.0.0.1']
 
+# Run background jobs inline unless a run_jobs worker is started
+JOBS_EAGER = env.bool('JOBS_EAGER', default=True)
+
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
     }
 }
 
+# Local stand-in for a read replica: a second SQLite file refreshed with
+# scripts/sync_sqlite_replica.py
+if os.environ.get('DATABASE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # CORS Settings for development
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -55,8 +69,10 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
-# Email Backend for development
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Email is printed to the console; EMAIL_QUEUE_BACKEND can point at the
+# file backend (with EMAIL_FILE_PATH) to keep the messages instead
+EMAIL_QUEUE_BACKEND = env('EMAIL_QUEUE_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
 
 # Disable HTTPS requirements in development
 SECURE_SSL_REDIRECT = False
@@ -68,7 +84,7 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
-]
+] + FRONTEND_STATICFILES_DIRS
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -76,7 +92,7 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Rest Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
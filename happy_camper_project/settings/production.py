@@ -21,6 +21,7 @@ SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
 DEBUG = False
 
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '').split(',')
+WARMUP_HOSTS = WARMUP_HOSTS or [host for host in ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')]
 
 # Application definition
 INSTALLED_APPS = [
@@ -46,16 +47,21 @@ INSTALLED_APPS = [
     'campsites',
     'bookings',
     'reviews',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'happy_camper_project.log.RequestIDMiddleware',
+    'happy_camper_project.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'happy_camper_project.routers.ReplicaStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'happy_camper_project.middleware.CustomRateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -80,7 +86,7 @@ CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
 # Rest Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -100,11 +106,26 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        # Keep connections open across requests; health checks replace
+        # connections that went bad while idle
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+if os.getenv('DATABASE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DATABASE_REPLICA_PATH'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Requests only spool messages (jobs.mail); the run_jobs worker delivers them
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = os.getenv('EMAIL_QUEUE_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '30'))
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
@@ -138,21 +159,57 @@ else:
     # Enable WhiteNoise for static files
     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
-# Logging Configuration
+# Logging: JSON lines written by a background OS thread per process
+# (happy_camper_project.log), so a slow disk never holds up a request. Only
+# LOG_SAMPLE_RATE of the per-request INFO lines are kept; slow requests are
+# warnings and always logged.
+LOG_FILE = os.getenv('LOG_FILE', str(BASE_DIR / 'production.log'))
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'happy_camper_project.log.RequestIDFilter',
+        },
+        'sample': {
+            '()': 'happy_camper_project.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+        },
+    },
+    'formatters': {
+        'json': {
+            '()': 'happy_camper_project.log.JSONFormatter',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
+            'formatter': 'json',
         },
         'file': {
-            'class': 'logging.FileHandler',
-            'filename': 'production.log',
+            'class': 'happy_camper_project.log.RotatingFileHandler',
+            'filename': LOG_FILE,
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'formatter': 'json',
+        },
+        'queue': {
+            'class': 'happy_camper_project.log.QueueHandler',
+            'targets': ['cfg://handlers.console', 'cfg://handlers.file'],
+            'filters': ['request_id'],
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
+    'loggers': {
+        'happy_camper.performance': {
+            'filters': ['sample'],
+        },
+    },
 }
@@ -0,0 +1,81 @@
+"""
+Where a process spends its start-up time, per installed app.
+
+Meant to run in a fresh interpreter, which the profile_startup command
+does:
+
+    DJANGO_SETTINGS_MODULE=happy_camper_project.settings.api python -m happy_camper_project.startup_profile --wsgi
+
+It prints one JSON object: the time to import Django and load the
+settings, then for every app the time to import it (its package and
+AppConfig), its models and its ready(), then the URLconf and, with --wsgi,
+loading the WSGI application including the warm-up.
+"""
+import json
+import sys
+import time
+
+
+def profile(load_wsgi=False):
+    started = time.perf_counter()
+    phases = {}
+    apps = {}
+
+    import django
+    from django.apps import AppConfig
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    phases['settings'] = time.perf_counter() - started
+
+    original_create = AppConfig.create.__func__
+    original_import_models = AppConfig.import_models
+
+    def create(cls, entry):
+        step_started = time.perf_counter()
+        app_config = original_create(cls, entry)
+        apps[app_config.label] = {
+            'name': app_config.name,
+            'import': time.perf_counter() - step_started,
+            'models': 0.0,
+            'ready': 0.0,
+        }
+        original_ready = app_config.ready
+
+        def ready():
+            ready_started = time.perf_counter()
+            original_ready()
+            apps[app_config.label]['ready'] = time.perf_counter() - ready_started
+
+        app_config.ready = ready
+        return app_config
+
+    def import_models(self):
+        step_started = time.perf_counter()
+        original_import_models(self)
+        apps[self.label]['models'] = time.perf_counter() - step_started
+
+    AppConfig.create = classmethod(create)
+    AppConfig.import_models = import_models
+
+    step_started = time.perf_counter()
+    django.setup()
+    phases['setup'] = time.perf_counter() - step_started
+
+    step_started = time.perf_counter()
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    phases['urls'] = time.perf_counter() - step_started
+
+    if load_wsgi:
+        from django.utils.module_loading import import_string
+        step_started = time.perf_counter()
+        import_string(settings.WSGI_APPLICATION)
+        phases['wsgi'] = time.perf_counter() - step_started
+
+    phases['total'] = time.perf_counter() - started
+    return {'settings_module': settings.SETTINGS_MODULE, 'phases': phases, 'apps': apps}
+
+
+if __name__ == '__main__':
+    report = profile(load_wsgi='--wsgi' in sys.argv[1:])
+    sys.stdout.write(json.dumps(report) + '\n')
@@ -0,0 +1,559 @@
+import gzip
+import importlib
+import json
+import logging
+import logging.config
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from campsites.models import Campsite
+from . import cache as namespaced_cache
+from . import log, media, metrics, routers, warmup
+from .cache_backends import SQLiteCache
+from .db import retry_on_locked
+from .frontend import SPAIndex, choose_encoding
+from .middleware import CustomRateLimitMiddleware, PerformanceMiddleware, view_name
+from .performance import record_cache
+from .views import frontend
+
+RATE_LIMITS = {'login': {'path': '/api/auth/token/', 'methods': ['POST'], 'rate': '10/m', 'scope': 'ip'}}
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=RATE_LIMITS, RATE_LIMIT_EXEMPT_IPS=[])
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.middleware = CustomRateLimitMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory()
+        # The start of a one minute window
+        self.now = 6000 * 60.0
+
+    def post(self, at, ip='10.0.0.1'):
+        with mock.patch('happy_camper_project.middleware.time.time', return_value=self.now + at):
+            return self.middleware(self.factory.post('/api/auth/token/', REMOTE_ADDR=ip))
+
+    def test_limit_applies_per_client(self):
+        statuses = [self.post(at=1).status_code for _ in range(11)]
+        self.assertEqual(statuses, [200] * 10 + [429])
+        self.assertEqual(self.post(at=1, ip='10.0.0.2').status_code, 200)
+
+    def test_unmatched_requests_are_not_counted(self):
+        for _ in range(20):
+            self.middleware(self.factory.get('/api/auth/token/', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(self.post(at=1).status_code, 200)
+
+    def test_previous_window_counts_by_overlap(self):
+        for _ in range(10):
+            self.post(at=30)
+        # Half of the previous window still overlaps: room for 5 more
+        statuses = [self.post(at=90).status_code for _ in range(6)]
+        self.assertEqual(statuses, [200] * 5 + [429])
+
+    def test_retry_after_is_when_a_request_is_allowed_again(self):
+        for _ in range(10):
+            self.post(at=50)
+        response = self.post(at=50)
+        self.assertEqual(response.status_code, 429)
+        retry_after = int(response['Retry-After'])
+
+        self.assertEqual(self.post(at=50 + retry_after - 1).status_code, 429)
+        self.assertEqual(self.post(at=50 + retry_after).status_code, 200)
+
+    def test_rejected_requests_do_not_use_up_the_allowance(self):
+        for _ in range(30):
+            self.post(at=1)
+        # Only the 10 allowed requests weigh on the next window
+        self.assertEqual(self.post(at=60 + 1 + 6).status_code, 200)
+
+
+class NamespacedCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_invalidate_orphans_existing_keys(self):
+        key = namespaced_cache.make_key('things', 'list')
+        cache.set(key, 'old')
+        namespaced_cache.invalidate('things')
+        self.assertNotEqual(namespaced_cache.make_key('things', 'list'), key)
+
+    def test_evicted_version_never_reuses_an_old_key(self):
+        namespaced_cache.make_key('things', 'list')
+        namespaced_cache.invalidate('things')
+        key = namespaced_cache.make_key('things', 'list')
+        cache.set(key, 'old')
+        cache.delete('hc:ns:things')
+        self.assertNotEqual(namespaced_cache.make_key('things', 'list'), key)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def make_cache(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return SQLiteCache(os.path.join(directory.name, 'cache.sqlite3'), {'OPTIONS': options})
+
+    def rows(self, backend):
+        return backend._connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def test_add_and_incr_are_atomic_counters(self):
+        backend = self.make_cache()
+        self.assertTrue(backend.add('hits', 0))
+        self.assertFalse(backend.add('hits', 5))
+        self.assertEqual(backend.incr('hits'), 1)
+        with self.assertRaises(ValueError):
+            backend.incr('missing')
+
+    def test_writes_cull_down_to_max_entries(self):
+        backend = self.make_cache(MAX_ENTRIES=10, CULL_PROBABILITY=1)
+        backend.set('version', 1, None)
+        for n in range(30):
+            backend.set(f'key{n}', n, 60 + n)
+        self.assertLessEqual(self.rows(backend), 10)
+        # The newest entries and those that never expire are kept
+        self.assertEqual(backend.get('key29'), 29)
+        self.assertEqual(backend.get('version'), 1)
+
+    def test_cull_drops_expired_rows(self):
+        backend = self.make_cache(CULL_PROBABILITY=0)
+        backend.set('stale', 1, 60)
+        backend.set('fresh', 2, 60)
+        backend._connection.execute("UPDATE cache SET expires = 0 WHERE key LIKE '%stale'")
+        self.assertEqual(backend.cull(), 1)
+        self.assertEqual(self.rows(backend), 1)
+
+
+@override_settings(ROOT_URLCONF='happy_camper_project.async_urls')
+class AsyncURLconfTests(TestCase):
+    async def test_serves_only_the_async_endpoints(self):
+        self.assertEqual((await self.async_client.get('/api/public/campsites/')).status_code, 200)
+        self.assertEqual((await self.async_client.get('/api/campsites/')).status_code, 404)
+
+
+class RetryOnLockedTests(TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch('happy_camper_project.db.time.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+        # No jitter
+        patcher = mock.patch('happy_camper_project.db.random.uniform', return_value=1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def failing(self, failures, message='database is locked'):
+        def func():
+            self.calls += 1
+            if self.calls <= failures:
+                raise OperationalError(message)
+            return self.calls
+        return retry_on_locked(func, attempts=3, backoff=0.1)
+
+    def test_retries_until_the_write_goes_through(self):
+        self.assertEqual(self.failing(2)(), 3)
+        # Exponential backoff between attempts
+        self.assertEqual([call.args[0] for call in self.sleep.call_args_list], [0.1, 0.2])
+
+    def test_gives_up_after_the_last_attempt(self):
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            self.failing(3)()
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_other_errors_are_not_retried(self):
+        with self.assertRaisesMessage(OperationalError, 'no such table'):
+            self.failing(1, message='no such table: campsites_campsite')()
+        self.assertEqual(self.calls, 1)
+        self.sleep.assert_not_called()
+
+
+@mock.patch('happy_camper_project.routers.replica_configured', return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read(self):
+        return self.router.db_for_read(Campsite)
+
+    def serve(self, view, cookie=None):
+        request = self.factory.get('/')
+        if cookie is not None:
+            request.COOKIES[routers.STICKY_COOKIE] = str(cookie)
+        return routers.ReplicaStickinessMiddleware(view)(request)
+
+    def test_only_opted_in_reads_use_the_replica(self, replica_configured):
+        self.assertEqual(self.read(), routers.PRIMARY)
+        with routers.replica_reads():
+            self.assertEqual(self.read(), routers.REPLICA)
+        with routers.replica_reads(enabled=False):
+            self.assertEqual(self.read(), routers.PRIMARY)
+
+    def test_reads_after_a_write_use_the_primary(self, replica_configured):
+        def view(request):
+            with routers.replica_reads():
+                reads = [self.read()]
+                self.router.db_for_write(Campsite)
+                reads.append(self.read())
+            return HttpResponse(','.join(reads))
+
+        response = self.serve(view)
+        self.assertEqual(response.content.decode(), 'replica,default')
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_sticky_cookie_pins_the_client_to_the_primary(self, replica_configured):
+        def view(request):
+            with routers.replica_reads():
+                return HttpResponse(self.read())
+
+        self.assertEqual(self.serve(view, cookie=time.time() + 5).content.decode(), routers.PRIMARY)
+        self.assertEqual(self.serve(view, cookie=time.time() - 1).content.decode(), routers.REPLICA)
+        self.assertNotIn(routers.STICKY_COOKIE, self.serve(view).cookies)
+
+    def test_unsafe_methods_read_from_the_primary(self, replica_configured):
+        view = routers.read_from_replica(lambda request: HttpResponse(self.read()))
+        self.assertEqual(view(self.factory.get('/')).content.decode(), routers.REPLICA)
+        self.assertEqual(view(self.factory.post('/')).content.decode(), routers.PRIMARY)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        Campsite.objects.count()
+        Campsite.objects.exists()
+        Campsite.objects.exists()
+        record_cache(True)
+        record_cache(False)
+        return HttpResponse()
+
+    def test_server_timing_counts_queries_and_cache_lookups(self):
+        response = PerformanceMiddleware(self.view)(self.factory.get('/'))
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('cache;desc="1 hits, 1 misses"', timing)
+
+    def test_api_requests_are_timed_and_logged_with_their_view(self):
+        with self.assertLogs('happy_camper.performance', 'INFO') as logs:
+            response = self.client.get('/api/campsites/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('view=CampsiteViewSet.list', logs.records[-1].getMessage())
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_server_timing_can_be_turned_off(self):
+        response = PerformanceMiddleware(self.view)(self.factory.get('/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_view_name(self):
+        from campsites.views import CampsiteViewSet
+
+        self.assertEqual(view_name(CampsiteViewSet.as_view({'get': 'list'}), 'GET'), 'CampsiteViewSet.list')
+        self.assertEqual(view_name(self.view, 'GET'), 'view')
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_requests_log_repeated_sql_first(self):
+        with self.assertLogs('happy_camper.performance', 'WARNING') as logs:
+            PerformanceMiddleware(self.view)(self.factory.get('/'))
+        lines = logs.records[0].getMessage().splitlines()
+        self.assertTrue(lines[0].startswith('slow request method=GET path=/'))
+        self.assertIn('[2x', lines[1])
+        self.assertIn('[1x', lines[2])
+        self.assertIn('COUNT', lines[2])
+
+
+class MetricsViewTests(SimpleTestCase):
+    def scrape(self, **meta):
+        return self.client.get('/metrics', **meta).status_code
+
+    @override_settings(METRICS_TOKEN='', RATE_LIMIT_TRUSTED_PROXIES=0)
+    def test_open_to_local_clients_only(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR='127.0.0.1'), 200)
+        self.assertEqual(self.scrape(REMOTE_ADDR='203.0.113.9'), 403)
+        # Through a proxy nobody told us about, everyone looks local
+        self.assertEqual(self.scrape(REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.9'), 403)
+
+    @override_settings(METRICS_TOKEN='', RATE_LIMIT_TRUSTED_PROXIES=1)
+    def test_client_address_behind_a_trusted_proxy(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.9'), 403)
+        self.assertEqual(self.scrape(REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='127.0.0.1'), 200)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.scrape(REMOTE_ADDR='127.0.0.1'), 403)
+        self.assertEqual(self.scrape(REMOTE_ADDR='203.0.113.9', HTTP_AUTHORIZATION='Bearer secret'), 200)
+
+
+@override_settings(METRICS_TOKEN='secret', WARMUP_ENABLED=False)
+class ReadinessTests(SimpleTestCase):
+    databases = ['default']
+
+    def test_details_are_for_internal_callers_only(self):
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ready'})
+
+        response = self.client.get('/ready', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.json()['database'], 'ok')
+        self.assertEqual(response.json()['pid'], os.getpid())
+
+    @override_settings(WARMUP_ENABLED=True)
+    def test_not_ready_before_warm_up(self):
+        with mock.patch.dict(warmup.state, status='cold'):
+            response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'status': 'not ready'})
+
+
+class MetricsArchiveTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.enterContext(override_settings(METRICS_MULTIPROCESS_DIR=self.directory))
+
+    def write_worker(self, filename, requests):
+        metrics._write_json(
+            os.path.join(self.directory, filename), [['http_requests_total', [['status', '200']], requests]]
+        )
+
+    def total(self):
+        return metrics.Registry().collect()[('http_requests_total', (('status', '200'),))]
+
+    def test_exited_workers_are_kept_in_the_archive(self):
+        self.write_worker('101-1.json', 5)
+        self.write_worker('102-1.json', 7)
+        metrics.mark_process_dead(101, self.directory)
+        self.assertEqual(self.total(), 12)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, '101-1.json')))
+
+        # The PID is reused by a new worker, which writes a file of its own
+        self.write_worker('101-2.json', 1)
+        self.assertEqual(self.total(), 13)
+        metrics.mark_process_dead(101, self.directory)
+        metrics.mark_process_dead(102, self.directory)
+        self.assertEqual(self.total(), 13)
+        self.assertEqual(sorted(os.listdir(self.directory)), [metrics.ARCHIVE_FILE])
+
+    def test_a_file_folded_in_but_not_deleted_counts_once(self):
+        self.write_worker('101-1.json', 5)
+        metrics.mark_process_dead(101, self.directory)
+        self.write_worker('101-1.json', 5)
+        self.assertEqual(self.total(), 5)
+        metrics.mark_process_dead(101, self.directory)
+        self.assertEqual(self.total(), 5)
+
+
+class FrontendShellTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'index.html')
+        # No development shell to fall back to either
+        self.enterContext(override_settings(
+            BASE_DIR=directory.name, FRONTEND_INDEX_PATH=self.path, FRONTEND_INDEX_CHECK_INTERVAL=0,
+        ))
+        self.factory = RequestFactory()
+
+    def build(self, body):
+        with open(self.path, 'w') as handle:
+            handle.write(body)
+
+    def get(self, **headers):
+        return frontend(self.factory.get('/campsites/1', **headers))
+
+    def test_shell_is_kept_until_the_build_changes(self):
+        index = SPAIndex()
+        self.build('<html>one</html>')
+        shell = index.get()
+        self.assertIs(index.get(), shell)
+        self.assertEqual(gzip.decompress(shell.bodies['gzip']), b'<html>one</html>')
+
+        self.build('<html>two!</html>')
+        self.assertNotEqual(index.get().etag, shell.etag)
+
+    def test_choose_encoding(self):
+        available = {'': b'', 'gzip': b'', 'br': b''}
+        self.assertEqual(choose_encoding('gzip, deflate, br', available), 'br')
+        self.assertEqual(choose_encoding('gzip, br;q=0', available), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0.5', {'': b'', 'gzip': b''}), '')
+        self.assertEqual(choose_encoding('gzip;q=0.0', available), '')
+        self.assertEqual(choose_encoding('', available), '')
+
+    def test_serves_the_shell_compressed_with_an_etag(self):
+        self.build('<html>app</html>')
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(gzip.decompress(response.content), b'<html>app</html>')
+        self.assertTrue(response['ETag'].endswith('-gzip"'))
+
+    def test_not_modified_for_any_encoding_of_the_current_shell(self):
+        self.build('<html>app</html>')
+        etag = self.get()['ETag']
+        gzip_etag = self.get(HTTP_ACCEPT_ENCODING='gzip')['ETag']
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.get(HTTP_IF_NONE_MATCH=f'"other", W/{gzip_etag}', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], gzip_etag)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='*').status_code, 304)
+
+        # Neither a changed shell nor a tag that merely contains the ETag match
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=f'"x{etag[1:-1]}"').status_code, 200)
+        self.build('<html>new</html>')
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_not_built(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 501)
+        self.assertIn(b'npm run build', response.content)
+
+
+@override_settings(MEDIA_SENDFILE='')
+class MediaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=directory.name))
+        os.mkdir(os.path.join(directory.name, 'campsite_images'))
+        self.path = os.path.join(directory.name, 'campsite_images', 'lake.jpg')
+        with open(self.path, 'wb') as handle:
+            handle.write(b'0123456789')
+
+    def get(self, **headers):
+        return self.client.get('/media/campsite_images/lake.jpg', headers=headers)
+
+    def test_range_is_served_as_partial_content(self):
+        response = self.get(Range='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(self.get(Range='bytes=-3').getvalue(), b'789')
+        self.assertEqual(self.get(Range='bytes=10-').status_code, 416)
+
+    def test_range_file_reads_again_after_seeking_back(self):
+        with open(self.path, 'rb') as handle:
+            handle.seek(2)
+            body = media.RangeFile(handle, 4)
+            start = body.tell()
+            self.assertEqual(body.read(), b'2345')
+            self.assertEqual(body.read(), b'')
+            body.seek(start)
+            self.assertEqual(body.read(3), b'234')
+            body.seek(start + 1)
+            self.assertEqual(body.read(), b'345')
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(If_None_Match=etag).status_code, 304)
+        self.assertEqual(self.get(If_None_Match=f'"other", W/{etag}').status_code, 304)
+        self.assertEqual(self.get(If_None_Match='*').status_code, 304)
+        self.assertEqual(self.get(If_None_Match='"other"').status_code, 200)
+
+
+class SettingsProfileTests(SimpleTestCase):
+    def load(self, name):
+        return importlib.import_module(f'happy_camper_project.settings.{name}')
+
+    def test_every_profile_imports(self):
+        for name in ('development', 'production', 'api', 'asgi'):
+            with self.subTest(profile=name):
+                self.assertIn('campsites', self.load(name).INSTALLED_APPS)
+
+    def test_api_profile_drops_the_site_apps(self):
+        api = self.load('api')
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.staticfiles'):
+            self.assertIn(app, self.load('production').INSTALLED_APPS)
+            self.assertNotIn(app, api.INSTALLED_APPS)
+        self.assertNotIn('django.contrib.sessions.middleware.SessionMiddleware', api.MIDDLEWARE)
+
+        # No admin and no SPA shell, only the API
+        self.assertEqual(resolve('/api/campsites/', urlconf=api.ROOT_URLCONF).url_name, 'campsite-list')
+        for path in ('/', '/campsites/1', '/admin/'):
+            with self.assertRaises(Resolver404):
+                resolve(path, urlconf=api.ROOT_URLCONF)
+
+    def test_profile_startup(self):
+        stdout = StringIO()
+        call_command(
+            'profile_startup', modules=['happy_camper_project.settings.development'], repeat=1, json=True,
+            stdout=stdout,
+        )
+        [report] = json.loads(stdout.getvalue())
+        self.assertEqual(report['settings_module'], 'happy_camper_project.settings.development')
+        self.assertIn('campsites', report['apps'])
+        self.assertGreater(report['wall'], 0)
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class LogQueueHandlerTests(SimpleTestCase):
+    def make_handler(self, target, **options):
+        return log.QueueHandler([target], **options)
+
+    def record(self, level, msg, *args):
+        return logging.LogRecord('tests', level, __file__, 1, msg, args, None)
+
+    def test_records_are_written_by_the_listener(self):
+        target = CollectingHandler(logging.WARNING)
+        handler = self.make_handler(target)
+        handler.handle(self.record(logging.WARNING, 'Slow request: %s', '/api/campsites/'))
+        handler.handle(self.record(logging.INFO, 'Skipped by the target'))
+        handler.close()
+        self.assertEqual([record.msg for record in target.records], ['Slow request: /api/campsites/'])
+        self.assertIsNone(target.records[0].args)
+
+    def test_dict_config_wires_the_targets(self):
+        logging.config.dictConfig({
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {
+                'collect': {'()': CollectingHandler},
+                'queue': {
+                    'class': 'happy_camper_project.log.QueueHandler',
+                    'targets': ['cfg://handlers.collect'],
+                },
+            },
+            'loggers': {'tests.queue': {'handlers': ['queue'], 'propagate': False}},
+        })
+        logger = logging.getLogger('tests.queue')
+        self.addCleanup(logger.handlers.clear)
+        [handler] = logger.handlers
+        [target] = handler.targets
+        self.assertIsInstance(target, CollectingHandler)
+
+        logger.warning('Queued')
+        handler.close()
+        self.assertEqual([record.msg for record in target.records], ['Queued'])
+
+    def test_full_queue_drops_records(self):
+        target = CollectingHandler()
+        handler = self.make_handler(target, maxsize=1)
+        # Nothing leaves the queue until the listener is started
+        handler._listening = True
+        handler.handle(self.record(logging.INFO, 'Kept'))
+        handler.handle(self.record(logging.INFO, 'Dropped'))
+        self.assertEqual(handler.dropped, 1)
+        handler._listening = False
+        handler.start()
+        handler.close()
+        self.assertEqual([record.msg for record in target.records], ['Kept'])
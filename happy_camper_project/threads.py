@@ -0,0 +1,45 @@
+"""
+Background threads that stay real OS threads under gevent.
+
+A gunicorn gevent worker monkey-patches threading and time, so a
+threading.Thread is a greenlet on the worker's event loop and a blocking
+write or sleep in it stalls every request the worker is serving. The
+helpers below fall back to the unpatched originals, so background work
+such as writing logs or flushing metrics runs beside the event loop
+instead. Without gevent they are the plain standard library.
+
+Only share unpatched primitives (Lock(), SimpleQueue()) between such a
+thread and the request greenlets.
+"""
+import _thread
+import queue
+import time
+
+
+def _original(module, name, default):
+    try:
+        from gevent import monkey
+    except ImportError:
+        return default
+    # The saved original if gevent patched it, the current object otherwise
+    return monkey.get_original(module, name)
+
+
+def start_thread(target, *args):
+    """Run target(*args) on a new daemon OS thread; returns its id."""
+    return _original('_thread', 'start_new_thread', _thread.start_new_thread)(target, args)
+
+
+def sleep(seconds):
+    """Block the calling OS thread, not just its greenlet."""
+    _original('time', 'sleep', time.sleep)(seconds)
+
+
+def Lock():
+    """A lock that blocks OS threads, safe to share with a start_thread() thread."""
+    return _original('_thread', 'allocate_lock', _thread.allocate_lock)()
+
+
+def SimpleQueue():
+    """An unbounded FIFO queue whose get() blocks the calling OS thread."""
+    return _original('queue', 'SimpleQueue', queue.SimpleQueue)()
@@ -17,24 +17,27 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenRefreshView
-from django.views.generic import TemplateView
+from . import media
+from .api_urls import urlpatterns as api_urlpatterns
+from .views import frontend
 
 urlpatterns = [
     # Admin URLs
+    path('admin/dashboard/', include('campsites.admin_urls')),
     path('admin/', admin.site.urls),
     
-    # API endpoints
-    path('api/auth/', include('users.urls')),  # JWT auth endpoints
-    path('api/campsites/', include('campsites.urls')),
-    path('api/bookings/', include('bookings.urls')),
-    path('api/reviews/', include('reviews.urls')),  # Add reviews URLs
+    # Metrics, readiness probe and API endpoints
+    *api_urlpatterns,
     
     # Frontend catch-all
-    path('', TemplateView.as_view(template_name='index.html'), name='index'),
-    path('<path:path>', TemplateView.as_view(template_name='index.html'), name='index-paths'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('', frontend, name='index'),
+    path('<path:path>', frontend, name='index-paths'),
+]
+
+# Uploaded media, unless it lives on S3 (MEDIA_URL is then absolute)
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns.insert(0, path(f'{settings.MEDIA_URL.lstrip("/")}<path:path>', media.serve, name='media'))
 
 # Add debug toolbar URLs in development
 if settings.DEBUG:
@@ -1,11 +1,15 @@
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
 from django.middleware.csrf import get_token
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_safe
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.shortcuts import render
 from django.conf import settings
 import os
-from django.views.generic import TemplateView
+from django.db import connection
+from django.utils.crypto import constant_time_compare
+from django.utils.http import parse_etags
+from . import metrics, warmup
+from .frontend import choose_encoding, index as frontend_index
+from .middleware import get_client_ip
 
 @require_GET
 @ensure_csrf_cookie
@@ -16,14 +20,16 @@ def get_csrf_token(request):
     """
     return JsonResponse({'csrfToken': get_token(request)})
 
+@require_safe
 def frontend(request, path=''):
     """
-    Serve the frontend application.
+    Serve the SPA shell for every client-side route from memory, in the
+    best encoding the client accepts. It must be revalidated on every load
+    (it names the current hashed assets), so it is sent with an ETag and
+    "no-cache" and repeat visits get a 304.
     """
-    try:
-        with open(os.path.join(settings.BASE_DIR, 'frontend', 'build', 'index.html')) as f:
-            return HttpResponse(f.read())
-    except FileNotFoundError:
+    shell = frontend_index.get()
+    if shell is None:
         return HttpResponse(
             """
             Frontend not built yet. Please run:
@@ -32,7 +38,72 @@ def frontend(request, path=''):
             status=501,
         )
 
-class FrontendView(TemplateView):
-    template_name = "index.html"
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), shell.bodies)
+    headers = {
+        'ETag': shell.etag_header(encoding),
+        'Last-Modified': shell.last_modified,
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+    }
+    # Weak comparison, as for any GET or HEAD, against every encoding of the
+    # current shell
+    tags = parse_etags(request.headers.get('If-None-Match', ''))
+    current = {shell.etag_header(name) for name in shell.bodies}
+    if tags == ['*'] or any(tag.removeprefix('W/') in current for tag in tags):
+        return HttpResponseNotModified(headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return HttpResponse(shell.bodies[encoding], content_type='text/html; charset=utf-8', headers=headers)
+
+def is_internal(request):
+    """
+    Whether request comes from the monitoring side: it carries
+    "Authorization: Bearer <METRICS_TOKEN>" when that is set, or otherwise
+    comes from METRICS_ALLOWED_IPS, judged by the client address behind
+    RATE_LIMIT_TRUSTED_PROXIES proxies. A request forwarded by a proxy that
+    isn't counted there is refused, since every request would then seem to
+    come from the proxy's own address.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        return constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    trusted_proxies = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+    if 'HTTP_X_FORWARDED_FOR' in request.META and not trusted_proxies:
+        return False
+    return get_client_ip(request, trusted_proxies) in settings.METRICS_ALLOWED_IPS
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, for internal callers only (see is_internal).
+    """
+    if not is_internal(request):
+        return HttpResponse(status=403)
+    return HttpResponse(metrics.export(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@require_GET
+def readiness(request):
+    """
+    Readiness probe: 200 once this process has finished its warm-up and can
+    reach the database, 503 otherwise.
 
-frontend_view = FrontendView.as_view()
+    Warm-up runs while the WSGI/ASGI module is imported, before the server
+    accepts connections, so a served probe finds it either finished or
+    never started (an application loaded without wsgi.py/asgi.py); it
+    never sees it in progress.
+
+    Everyone gets the status; internal callers (see is_internal) also get
+    the process, database error and warm-up report.
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        database = 'ok'
+    except Exception as error:
+        database = str(error)
+    warmed_up = warmup.state['status'] == 'ready' or not settings.WARMUP_ENABLED
+    ready = warmed_up and database == 'ok'
+    body = {'status': 'ready' if ready else 'not ready'}
+    if is_internal(request):
+        body.update(pid=os.getpid(), database=database, warmup=warmup.state)
+    return JsonResponse(body, status=200 if ready else 503)
@@ -0,0 +1,132 @@
+"""
+Process warm-up run when the WSGI/ASGI application is loaded.
+
+Django builds a lot lazily on first use: model metadata, the URL resolver,
+translation catalogs, serializer field mappings and so on. warm_up() does
+that work before the first request, together with filling the shared
+cache for the busiest pages. With gunicorn's preload_app it runs once in
+the master, and the forked workers share the result copy-on-write.
+
+The outcome is kept in `state` and reported by the readiness endpoint. It
+runs synchronously while wsgi.py or asgi.py is imported, so no request is
+served before it has finished.
+"""
+import importlib
+import inspect
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+state = {
+    'status': 'cold',
+    'pid': None,
+    'duration': None,
+    'steps': {},
+    'errors': {},
+}
+
+
+def warm_up():
+    """Run every warm-up step, recording its duration or error."""
+    state.update(status='warming', pid=os.getpid(), steps={}, errors={})
+    started = time.perf_counter()
+    for name, step in STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as error:
+            # A cold cache is no reason to keep the process out of rotation
+            logger.warning('Warm-up step %s failed: %s', name, error)
+            state['errors'][name] = str(error)
+        state['steps'][name] = round(time.perf_counter() - step_started, 4)
+
+    # Forked workers must not share the connections opened here
+    connections.close_all()
+    state.update(status='ready', duration=round(time.perf_counter() - started, 4))
+    logger.info('Warm-up finished in %.3fs', state['duration'])
+
+
+def _models():
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta.related_objects
+
+
+def _urls():
+    from django.urls import get_resolver, resolve
+
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolve('/api/campsites/')
+
+
+def _translations():
+    from django.utils import translation
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('This field is required.')
+
+
+def _serializers():
+    from rest_framework import serializers
+
+    for app_config in apps.get_app_configs():
+        if not app_config.path.startswith(str(settings.BASE_DIR)):
+            continue
+        try:
+            module = importlib.import_module(f'{app_config.name}.serializers')
+        except ModuleNotFoundError:
+            continue
+        for obj in vars(module).values():
+            if (
+                inspect.isclass(obj)
+                and issubclass(obj, serializers.BaseSerializer)
+                and obj.__module__ == module.__name__
+            ):
+                try:
+                    obj().fields
+                except Exception:
+                    # Serializers needing context or arguments are skipped
+                    pass
+
+
+def _frontend():
+    from .frontend import index
+
+    index.get()
+
+
+def _cache():
+    """Fill the featured campsites cache for each public host name."""
+    from django.test import RequestFactory
+    from campsites.views import CampsiteViewSet
+
+    view = CampsiteViewSet.as_view({'get': 'featured'})
+    factory = RequestFactory()
+    # Image URLs in the cached response are absolute, so the request must
+    # look like a real one behind the proxy
+    extra = {}
+    if settings.SECURE_PROXY_SSL_HEADER:
+        header, value = settings.SECURE_PROXY_SSL_HEADER
+        extra[header] = value
+    for host in settings.WARMUP_HOSTS:
+        request = factory.get(
+            '/api/campsites/featured/', secure=settings.SECURE_SSL_REDIRECT, HTTP_HOST=host, **extra
+        )
+        view(request)
+
+
+STEPS = [
+    ('models', _models),
+    ('urls', _urls),
+    ('translations', _translations),
+    ('serializers', _serializers),
+    ('frontend', _frontend),
+    ('cache', _cache),
+]
@@ -17,3 +17,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happy_camper_project.settings')
 
 # Initialize WSGI application
 application = get_wsgi_application()
+
+# Do Django's lazy first-request work now; in the gunicorn master when
+# preload_app is on, so workers inherit it
+from django.conf import settings  # noqa: E402
+if settings.WARMUP_ENABLED:
+    from happy_camper_project.warmup import warm_up
+    warm_up()
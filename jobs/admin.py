@@ -0,0 +1,37 @@
+from django.contrib import admin
+from django.utils import timezone
+from . import queue
+from .mail import DRAIN_KEY
+from .models import Job, QueuedEmail
+from .tasks import send_queued_email
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'idempotency_key', 'last_error')
+    readonly_fields = ('created_at', 'finished_at', 'locked_until', 'locked_by', 'last_error')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected failed jobs now')
+    def retry_now(self, request, queryset):
+        updated = queryset.filter(status='failed').update(
+            status='queued', run_at=timezone.now(), attempts=0, locked_until=None, locked_by=''
+        )
+        self.message_user(request, f'{updated} jobs queued again.')
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'status', 'attempts', 'send_after', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('from_email', 'recipients', 'attempts', 'last_error', 'created_at', 'locked_until', 'locked_by')
+    exclude = ('message',)
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected failed emails now')
+    def retry_now(self, request, queryset):
+        updated = queryset.filter(status='failed').update(status='queued', send_after=timezone.now(), attempts=0)
+        if updated:
+            queue.enqueue(send_queued_email, key=DRAIN_KEY)
+        self.message_user(request, f'{updated} emails queued again.')
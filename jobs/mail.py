@@ -0,0 +1,148 @@
+"""
+Email delivery off the request path.
+
+QueuedEmailBackend, the EMAIL_BACKEND, only stores each message and queues
+the send_queued_email job, so sending mail from a view (allauth's
+verification emails, for instance) costs an INSERT instead of an SMTP
+handshake. The job sends everything due in batches over one connection of
+EMAIL_QUEUE_BACKEND, the backend that really delivers: SMTP in
+production, the console or file backend locally.
+"""
+import logging
+import uuid
+from contextlib import suppress
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Q
+from django.utils import timezone
+
+from happy_camper_project.db import retry_on_locked
+from . import queue
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+DRAIN_KEY = 'send_queued_email'
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Spool messages in the database for the send_queued_email job."""
+
+    def send_messages(self, email_messages):
+        from .tasks import send_queued_email
+
+        spooled = [
+            QueuedEmail(
+                from_email=message.from_email,
+                recipients=message.recipients(),
+                message=message.message().as_bytes(linesep='\r\n'),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        if not spooled:
+            return 0
+        QueuedEmail.objects.bulk_create(spooled)
+        queue.enqueue(send_queued_email, key=DRAIN_KEY)
+        return len(spooled)
+
+
+class RawMessage:
+    """Stand-in for a MIME message that was already rendered."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        return self.data if linesep == '\r\n' else self.data.replace(b'\r\n', linesep.encode())
+
+    def as_string(self, unixfrom=False, linesep='\n'):
+        return self.as_bytes(linesep=linesep).decode('utf-8', 'replace')
+
+    def get_charset(self):
+        return None
+
+
+class SpooledMessage(EmailMessage):
+    """A spooled email handed back to a regular email backend."""
+
+    def __init__(self, email):
+        super().__init__(from_email=email.from_email, to=email.recipients)
+        self.spooled = email
+
+    def recipients(self):
+        return self.spooled.recipients
+
+    def message(self):
+        return RawMessage(bytes(self.spooled.message))
+
+
+@retry_on_locked
+def claim(batch_size, lease):
+    """Lease up to batch_size due emails to this drain and return them."""
+    now = timezone.now()
+    due = Q(status='queued', send_after__lte=now) | Q(status='sending', locked_until__lt=now)
+    token = uuid.uuid4().hex
+    pks = QueuedEmail.objects.filter(due).order_by('send_after', 'pk').values_list('pk', flat=True)[:batch_size]
+    QueuedEmail.objects.filter(due, pk__in=list(pks)).update(
+        status='sending', locked_by=token, locked_until=now + timedelta(seconds=lease)
+    )
+    return list(QueuedEmail.objects.filter(locked_by=token, status='sending').order_by('pk'))
+
+
+def drain(batch_size=None):
+    """
+    Send every due email over one connection of EMAIL_QUEUE_BACKEND. A
+    message that fails is retried with backoff up to EMAIL_QUEUE_MAX_ATTEMPTS
+    times. Returns (sent, failed, next_attempt) where next_attempt is when
+    the earliest message waiting for a retry is due, or None.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    max_attempts = settings.EMAIL_QUEUE_MAX_ATTEMPTS
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    try:
+        while True:
+            emails = claim(batch_size, lease=settings.EMAIL_QUEUE_LEASE)
+            if not emails:
+                break
+            for email in emails:
+                try:
+                    # Opens the connection for the first message and after
+                    # an error, otherwise a no-op
+                    connection.open()
+                    connection.send_messages([SpooledMessage(email)])
+                except Exception as error:
+                    failed += 1
+                    _record_failure(email, error, max_attempts)
+                    # The connection may be unusable after an error
+                    with suppress(Exception):
+                        connection.close()
+                else:
+                    sent += 1
+                    QueuedEmail.objects.filter(pk=email.pk, locked_by=email.locked_by).delete()
+    finally:
+        connection.close()
+
+    next_attempt = (
+        QueuedEmail.objects.filter(status='queued')
+        .order_by('send_after')
+        .values_list('send_after', flat=True)
+        .first()
+    )
+    return sent, failed, next_attempt
+
+
+def _record_failure(email, error, max_attempts):
+    attempts = email.attempts + 1
+    fields = {'attempts': attempts, 'last_error': repr(error), 'locked_until': None, 'locked_by': ''}
+    if attempts >= max_attempts:
+        logger.error('Giving up on %s after %s attempts: %r', email, attempts, error)
+        fields['status'] = 'failed'
+    else:
+        logger.warning('Sending %s failed, will retry: %r', email, error)
+        fields.update(status='queued', send_after=timezone.now() + timedelta(seconds=queue.retry_delay(attempts)))
+    QueuedEmail.objects.filter(pk=email.pk, locked_by=email.locked_by).update(**fields)
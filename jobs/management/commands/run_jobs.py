@@ -0,0 +1,89 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from jobs import queue
+
+# Seconds between two prunes of finished jobs by one worker
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs until stopped (SIGTERM/SIGINT finish the current job first)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes to start')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0: no limit)')
+        parser.add_argument(
+            '--sleep', type=float, default=None,
+            help='Seconds to wait when the queue is empty (default: JOBS_POLL_INTERVAL)'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        if options['workers'] > 1:
+            self._supervise(options)
+        else:
+            self._work(options)
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _supervise(self, options):
+        """Run each worker as its own process, forwarding stop signals."""
+        command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'run_jobs']
+        for option in ('max_jobs', 'sleep'):
+            if options[option] is not None:
+                command += [f'--{option.replace("_", "-")}', str(options[option])]
+        if options['burst']:
+            command.append('--burst')
+
+        workers = [subprocess.Popen(command) for _ in range(options['workers'])]
+        self.stdout.write(f'Started {len(workers)} job workers')
+        while any(worker.poll() is None for worker in workers):
+            if self.stopping:
+                for worker in workers:
+                    if worker.poll() is None:
+                        worker.terminate()
+                for worker in workers:
+                    worker.wait()
+                break
+            time.sleep(0.5)
+
+    def _work(self, options):
+        worker = queue.worker_id()
+        interval = options['sleep'] if options['sleep'] is not None else settings.JOBS_POLL_INTERVAL
+        processed = failed = 0
+        pruned = 0
+        self.stdout.write(f'Job worker {worker} started')
+        queue.schedule_periodic()
+
+        while not self.stopping:
+            close_old_connections()
+            job = queue.claim(worker)
+            if job is None:
+                if options['burst']:
+                    break
+                if time.monotonic() - pruned > PRUNE_INTERVAL:
+                    queue.prune()
+                    pruned = time.monotonic()
+                time.sleep(interval)
+                continue
+
+            if not queue.perform(job, worker):
+                failed += 1
+            processed += 1
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Job worker {worker} stopped after {processed} jobs ({failed} failed)'
+        ))
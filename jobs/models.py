@@ -0,0 +1,87 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of deferred work, run by the run_jobs worker. Workers claim a job
+    by moving it to "running" with a lease (locked_until); a job whose lease
+    runs out, because its worker died or hung, is claimed again.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    priority = models.SmallIntegerField(default=0)  # Higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    # At most one queued job per key; enqueueing it again returns that job
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True)
+    
+    # Scheduling and leasing
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    timeout = models.PositiveIntegerField(default=300)  # Lease length in seconds
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['idempotency_key'], condition=Q(status='queued'), name='unique_queued_job_key'
+            ),
+        ]
+        indexes = [
+            # Claiming: queued jobs that are due, and running jobs whose lease expired
+            models.Index(fields=['status', '-priority', 'run_at'], name='job_due_idx'),
+            models.Index(fields=['status', 'locked_until'], name='job_lease_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class QueuedEmail(models.Model):
+    """
+    An outgoing email spooled by jobs.mail.QueuedEmailBackend, kept as the
+    wire-format message. Deleted once sent; failed ones stay for inspection.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('failed', 'Failed'),
+    ]
+    
+    from_email = models.CharField(max_length=320)
+    recipients = models.JSONField(default=list)
+    message = models.BinaryField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    
+    # Delivery attempts
+    send_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'send_after'], name='queued_email_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Email to {', '.join(self.recipients)} ({self.status})"
@@ -0,0 +1,232 @@
+"""
+Database-backed job queue: no broker, so it runs wherever the database
+does, including single-box deployments and tests.
+
+Jobs are plain functions registered with @job in an app's tasks.py:
+
+    @job(priority=5, max_attempts=3)
+    def update_rating_scores(campsite_ids):
+        ...
+
+    enqueue(update_rating_scores, campsite_ids=[7], key='rating:7')
+
+A job declared with every=<seconds> is periodic: run_jobs queues its first
+run when it starts and every run queues the next one.
+
+The job row is written in the caller's transaction, so it is only picked
+up once that commits and is dropped with it on rollback. Keyword arguments
+are stored as JSON. With JOBS_EAGER the function runs immediately instead,
+which is what tests and a development server without a worker want.
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from happy_camper_project.db import retry_on_locked
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between two attempts of a failing job
+MAX_RETRY_DELAY = 60 * 60
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: object
+    priority: int
+    max_attempts: int
+    timeout: int
+    every: int = None
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+
+registry = {}
+
+
+def job(func=None, *, name=None, priority=0, max_attempts=5, timeout=300, every=None):
+    """
+    Register a function as a job. timeout is the lease in seconds; every
+    makes it run periodically, every seconds after the previous run ended.
+    """
+    if func is None:
+        return lambda func: job(
+            func, name=name, priority=priority, max_attempts=max_attempts, timeout=timeout, every=every
+        )
+    task = Task(
+        name=name or f'{func.__module__}.{func.__qualname__}',
+        func=func,
+        priority=priority,
+        max_attempts=max_attempts,
+        timeout=timeout,
+        every=every,
+    )
+    registry[task.name] = task
+    return task
+
+
+def enqueue(task, *, key=None, priority=None, delay=0, **kwargs):
+    """
+    Queue a run of task (a @job or its name) with kwargs, delay seconds from
+    now. If a job with the same idempotency key is still queued, that job is
+    returned instead and moved forward if this one is due earlier.
+    """
+    if isinstance(task, str):
+        task = registry[task]
+    if getattr(settings, 'JOBS_EAGER', False):
+        task(**kwargs)
+        return None
+
+    fields = {
+        'name': task.name,
+        'kwargs': kwargs,
+        'priority': task.priority if priority is None else priority,
+        'run_at': timezone.now() + timedelta(seconds=delay),
+        'max_attempts': task.max_attempts,
+        'timeout': task.timeout,
+        'idempotency_key': key,
+    }
+    if key is None:
+        return Job.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:
+        existing = Job.objects.filter(idempotency_key=key, status='queued').first()
+        if existing is None:
+            # Claimed by a worker in the meantime
+            return Job.objects.create(**fields)
+        if fields['run_at'] < existing.run_at:
+            Job.objects.filter(pk=existing.pk, status='queued').update(run_at=fields['run_at'])
+        return existing
+
+
+def periodic_key(task):
+    return f'periodic:{task.name}'
+
+
+def schedule_periodic():
+    """
+    Queue a run of every periodic job that has none queued or running, due
+    once its interval has passed since the last run ended. Returns the
+    number of jobs queued.
+    """
+    scheduled = 0
+    for task in registry.values():
+        if not task.every:
+            continue
+        runs = Job.objects.filter(name=task.name)
+        if runs.filter(status__in=['queued', 'running']).exists():
+            continue
+        last = runs.exclude(finished_at=None).order_by('-finished_at').values_list('finished_at', flat=True).first()
+        delay = (last + timedelta(seconds=task.every) - timezone.now()).total_seconds() if last else 0
+        enqueue(task, key=periodic_key(task), delay=max(delay, 0))
+        scheduled += 1
+    return scheduled
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _claimable(now):
+    return Q(status='queued', run_at__lte=now) | Q(status='running', locked_until__lt=now)
+
+
+@retry_on_locked
+def claim(worker, candidates=10):
+    """
+    Lease the most urgent due job to worker and return it, or None. Each
+    candidate is taken with a conditional UPDATE, so concurrent workers never
+    run the same job.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(_claimable(now)).order_by('-priority', 'run_at').values_list('pk', 'timeout')
+    for pk, timeout in due[:candidates]:
+        claimed = Job.objects.filter(_claimable(now), pk=pk).update(
+            status='running',
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=timeout),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def perform(job, worker):
+    """Run a claimed job and record the outcome; returns True on success."""
+    task = registry.get(job.name)
+    if job.attempts > job.max_attempts:
+        # Its last attempt outlived the lease
+        _finish(job, worker, status='failed', last_error=job.last_error or 'Lease expired')
+        _schedule_next(task)
+        return False
+    try:
+        if task is None:
+            raise LookupError(f'No job registered as {job.name}')
+        task(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s failed after %s attempts:\n%s', job, job.attempts, error)
+            _finish(job, worker, status='failed', last_error=error)
+            _schedule_next(task)
+        else:
+            delay = retry_delay(job.attempts)
+            logger.warning('Job %s failed, retrying in %.0fs:\n%s', job, delay, error)
+            _finish(
+                job, worker, status='queued', last_error=error,
+                run_at=timezone.now() + timedelta(seconds=delay), finished_at=None,
+            )
+        return False
+    _finish(job, worker, status='done', last_error='')
+    _schedule_next(task)
+    return True
+
+
+def _schedule_next(task):
+    if task is not None and task.every:
+        enqueue(task, key=periodic_key(task), delay=task.every)
+
+
+def retry_delay(attempts):
+    """Jittered exponential backoff after the given number of attempts."""
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF', 10)
+    return min(base * 2 ** (attempts - 1), MAX_RETRY_DELAY) * random.uniform(0.5, 1.5)
+
+
+@retry_on_locked
+def _finish(job, worker, **fields):
+    fields.setdefault('finished_at', timezone.now())
+    # Only while the lease is ours: a job that outlived it belongs to
+    # whichever worker claimed it next
+    owned = Job.objects.filter(pk=job.pk, status='running', locked_by=worker)
+    try:
+        with transaction.atomic():
+            owned.update(locked_until=None, **fields)
+    except IntegrityError:
+        # Retrying would duplicate a job queued again with the same key since
+        owned.update(locked_until=None, status='done', last_error='Superseded by a newer queued job')
+
+
+@retry_on_locked
+def prune(days=None):
+    """Delete jobs that finished successfully more than days ago."""
+    days = getattr(settings, 'JOBS_KEEP_DONE_DAYS', 7) if days is None else days
+    deleted, _ = Job.objects.filter(
+        status='done', finished_at__lt=timezone.now() - timedelta(days=days)
+    ).delete()
+    return deleted
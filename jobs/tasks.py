@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .mail import DRAIN_KEY, drain
+from .queue import enqueue, job
+
+
+@job(priority=10)
+def send_queued_email():
+    sent, failed, next_attempt = drain()
+    # Run eagerly, a retry would be sent at once and fail again, over and
+    # over; the messages left go out with the next one spooled instead
+    if next_attempt is not None and not settings.JOBS_EAGER:
+        # Come back when the earliest retry is due
+        delay = max((next_attempt - timezone.now()).total_seconds(), 0)
+        enqueue(send_queued_email, key=DRAIN_KEY, delay=delay)
@@ -0,0 +1,190 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .mail import drain
+from .models import Job, QueuedEmail
+
+WORKER = 'test:1'
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP server unreachable')
+
+
+@override_settings(JOBS_EAGER=False)
+class PeriodicJobTests(TestCase):
+    def setUp(self):
+        self.runs = []
+        self.task = queue.job(lambda: self.runs.append(1), name='tests.periodic', every=3600)
+        self.addCleanup(queue.registry.pop, self.task.name)
+
+    def periodic_jobs(self):
+        return Job.objects.filter(name=self.task.name)
+
+    def test_first_run_is_due_at_once_and_scheduled_once(self):
+        queue.schedule_periodic()
+        queue.schedule_periodic()
+        job = self.periodic_jobs().get()
+        self.assertLessEqual(job.run_at, timezone.now())
+
+    def test_each_run_queues_the_next(self):
+        queue.schedule_periodic()
+        # Runs every periodic job due, this one among them
+        while (job := queue.claim(WORKER)) is not None:
+            queue.perform(job, WORKER)
+        self.assertEqual(self.runs, [1])
+
+        upcoming = self.periodic_jobs().get(status='queued')
+        self.assertGreater(upcoming.run_at, timezone.now() + timedelta(minutes=59))
+        # Nothing more to do until then, even for a freshly started worker
+        queue.schedule_periodic()
+        self.assertEqual(self.periodic_jobs().filter(status='queued').count(), 1)
+        self.assertIsNone(queue.claim(WORKER))
+
+
+
+@override_settings(JOBS_EAGER=False)
+class QueueTests(TestCase):
+    def setUp(self):
+        self.runs = []
+        self.task = queue.job(lambda **kwargs: self.runs.append(kwargs), name='tests.record', timeout=60)
+        self.failing = queue.job(self.fail, name='tests.failing', max_attempts=2)
+        for task in (self.task, self.failing):
+            self.addCleanup(queue.registry.pop, task.name)
+
+    def fail(self):
+        raise ConnectionError('Service unavailable')
+
+    def test_a_job_is_leased_to_one_worker(self):
+        queued = queue.enqueue(self.task, campsite_id=7)
+        job = queue.claim(WORKER)
+        self.assertEqual(job.pk, queued.pk)
+        self.assertEqual((job.status, job.locked_by, job.attempts), ('running', WORKER, 1))
+        self.assertIsNone(queue.claim('test:2'))
+
+        self.assertTrue(queue.perform(job, WORKER))
+        self.assertEqual(self.runs, [{'campsite_id': 7}])
+        self.assertEqual(Job.objects.get(pk=job.pk).status, 'done')
+
+    def test_jobs_are_claimed_by_priority_once_due(self):
+        later = queue.enqueue(self.task, delay=60)
+        low = queue.enqueue(self.task)
+        high = queue.enqueue(self.task, priority=5)
+        self.assertEqual([queue.claim(WORKER).pk for _ in range(2)], [high.pk, low.pk])
+        self.assertIsNone(queue.claim(WORKER))
+        self.assertEqual(Job.objects.get(pk=later.pk).status, 'queued')
+
+    def test_failed_job_is_retried_with_backoff_then_given_up(self):
+        queued = queue.enqueue(self.failing)
+        self.assertFalse(queue.perform(queue.claim(WORKER), WORKER))
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('Service unavailable', job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIsNone(queue.claim(WORKER))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertFalse(queue.perform(queue.claim(WORKER), WORKER))
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_idempotency_key_keeps_one_queued_job(self):
+        first = queue.enqueue(self.task, key='rating:7', delay=60)
+        second = queue.enqueue(self.task, key='rating:7', delay=10)
+        self.assertEqual(second.pk, first.pk)
+        run_at = Job.objects.get(pk=first.pk).run_at
+        self.assertLess(run_at, timezone.now() + timedelta(seconds=11))
+        # A later run does not push it back
+        queue.enqueue(self.task, key='rating:7', delay=60)
+        self.assertEqual(Job.objects.get(pk=first.pk).run_at, run_at)
+
+        # Once it is running, the key is free for the next run
+        Job.objects.filter(pk=first.pk).update(run_at=timezone.now())
+        queue.claim(WORKER)
+        third = queue.enqueue(self.task, key='rating:7')
+        self.assertNotEqual(third.pk, first.pk)
+        self.assertEqual(Job.objects.filter(idempotency_key='rating:7').count(), 2)
+
+    def test_expired_lease_is_claimed_again(self):
+        queued = queue.enqueue(self.task)
+        stale = queue.claim(WORKER)
+        self.assertIsNone(queue.claim('test:2'))
+
+        Job.objects.filter(pk=queued.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        job = queue.claim('test:2')
+        self.assertEqual((job.pk, job.locked_by, job.attempts), (queued.pk, 'test:2', 2))
+        # The first worker no longer owns it and cannot record an outcome
+        queue.perform(stale, WORKER)
+        self.assertEqual(Job.objects.get(pk=queued.pk).locked_by, 'test:2')
+        self.assertTrue(queue.perform(job, 'test:2'))
+        self.assertEqual(Job.objects.get(pk=queued.pk).status, 'done')
+
+    def test_job_that_outlived_its_last_lease_fails(self):
+        queued = queue.enqueue(self.failing)
+        Job.objects.filter(pk=queued.pk).update(
+            status='running', attempts=2, locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        job = queue.claim(WORKER)
+        self.assertFalse(queue.perform(job, WORKER))
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.last_error), ('failed', 'Lease expired'))
+
+
+@override_settings(
+    JOBS_EAGER=False,
+    EMAIL_BACKEND='jobs.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+)
+class MailSpoolTests(TestCase):
+    def send(self):
+        return mail.send_mail('Confirm your email', 'Welcome!', 'noreply@example.com', ['camper@example.com'])
+
+    def test_mail_is_spooled_then_sent_by_the_job(self):
+        self.assertEqual(self.send(), 1)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(Job.objects.get().name, 'jobs.tasks.send_queued_email')
+
+        queue.perform(queue.claim(WORKER), WORKER)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].recipients(), ['camper@example.com'])
+        self.assertIn(b'Subject: Confirm your email', mail.outbox[0].message().as_bytes())
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    @override_settings(EMAIL_QUEUE_BACKEND='jobs.tests.FailingEmailBackend')
+    def test_failed_mail_is_retried_then_kept(self):
+        self.send()
+        sent, failed, next_attempt = drain()
+        self.assertEqual((sent, failed), (0, 1))
+        email = QueuedEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.send_after), ('queued', 1, next_attempt))
+        self.assertGreater(next_attempt, timezone.now())
+        self.assertEqual(drain(), (0, 0, next_attempt))
+
+        QueuedEmail.objects.update(send_after=timezone.now())
+        self.assertEqual(drain(), (0, 1, None))
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.status, 'failed')
+        self.assertIn('SMTP server unreachable', email.last_error)
+
+    @override_settings(EMAIL_QUEUE_BACKEND='jobs.tests.FailingEmailBackend')
+    def test_job_comes_back_when_the_retry_is_due(self):
+        self.send()
+        queue.perform(queue.claim(WORKER), WORKER)
+        job = Job.objects.get(status='queued')
+        due = QueuedEmail.objects.get().send_after
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertAlmostEqual(job.run_at.timestamp(), due.timestamp(), delta=1)
+
+    @override_settings(JOBS_EAGER=True, EMAIL_QUEUE_BACKEND='jobs.tests.FailingEmailBackend')
+    def test_eager_failure_leaves_the_mail_spooled(self):
+        self.assertEqual(self.send(), 1)
+        email = QueuedEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('queued', 1))
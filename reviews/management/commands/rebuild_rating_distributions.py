@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from reviews.utils import rebuild_distributions
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-campsite rating histograms from the review table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campsite', type=int, action='append', dest='campsites',
+            help='Only rebuild the given campsite id (can be repeated)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_distributions(
+            campsite_ids=options['campsites'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rating distribution rows'))
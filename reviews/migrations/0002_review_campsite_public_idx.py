@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('campsites', '0002_campsitedailystats'),
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['campsite', 'is_public', '-created_at'], name='review_campsite_public_idx'),
+        ),
+    ]
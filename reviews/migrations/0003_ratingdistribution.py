@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campsites', '0002_campsitedailystats'),
+        ('reviews', '0002_review_campsite_public_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('overall', 'Overall'), ('cleanliness', 'Cleanliness'), ('location', 'Location'), ('value', 'Value')], max_length=12)),
+                ('stars_1', models.IntegerField(default=0)),
+                ('stars_2', models.IntegerField(default=0)),
+                ('stars_3', models.IntegerField(default=0)),
+                ('stars_4', models.IntegerField(default=0)),
+                ('stars_5', models.IntegerField(default=0)),
+                ('campsite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_distributions', to='campsites.campsite')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('campsite', 'dimension'), name='unique_campsite_rating_dimension')],
+            },
+        ),
+    ]
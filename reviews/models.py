@@ -67,6 +67,13 @@ class Review(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Public review listing per campsite, newest first
+            models.Index(
+                fields=['campsite', 'is_public', '-created_at'],
+                name='review_campsite_public_idx'
+            ),
+        ]
         constraints = [
             # Ensure only one relation is set based on review_type
             models.CheckConstraint(
@@ -116,3 +123,62 @@ class Review(models.Model):
         if self.review_type == 'campsite':
             return f"{self.user.username}'s review of {self.campsite.name}"
         return f"{self.user.username}'s review of booking {self.booking.id}"
+
+class RatingDistribution(models.Model):
+    """
+    Star histogram of the public campsite reviews of one campsite for one
+    rating dimension. Kept up to date by the review signals.
+    """
+    DIMENSION_CHOICES = [
+        ('overall', 'Overall'),
+        ('cleanliness', 'Cleanliness'),
+        ('location', 'Location'),
+        ('value', 'Value'),
+    ]
+    
+    # Review field backing each dimension
+    DIMENSION_FIELDS = {
+        'overall': 'rating',
+        'cleanliness': 'cleanliness_rating',
+        'location': 'location_rating',
+        'value': 'value_rating',
+    }
+    
+    campsite = models.ForeignKey(
+        Campsite,
+        related_name='rating_distributions',
+        on_delete=models.CASCADE
+    )
+    dimension = models.CharField(max_length=12, choices=DIMENSION_CHOICES)
+    
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['campsite', 'dimension'],
+                name='unique_campsite_rating_dimension'
+            ),
+        ]
+    
+    @property
+    def counts(self):
+        return [getattr(self, f'stars_{stars}') for stars in range(1, 6)]
+    
+    @property
+    def total(self):
+        return sum(self.counts)
+    
+    @property
+    def average(self):
+        total = self.total
+        if not total:
+            return None
+        return sum(stars * count for stars, count in enumerate(self.counts, start=1)) / total
+    
+    def __str__(self):
+        return f"{self.get_dimension_display()} ratings of campsite {self.campsite_id}"
@@ -0,0 +1,11 @@
+from rest_framework.pagination import CursorPagination
+
+class ReviewCursorPagination(CursorPagination):
+    """
+    Cursor pagination for review listings. Pages are fetched with a keyset
+    condition on created_at, so deep pages cost the same as the first one.
+    """
+    ordering = '-created_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
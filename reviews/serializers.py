@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import Review
-from users.serializers import CustomUserSerializer
+from users.serializers import PublicUserSerializer
+from happy_camper_project.performance import TimedSerializerMixin
 
-class ReviewSerializer(serializers.ModelSerializer):
-    user = CustomUserSerializer(read_only=True)
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = PublicUserSerializer(read_only=True)
     average_rating = serializers.FloatField(read_only=True)
     
     class Meta:
@@ -58,6 +59,17 @@ class ReviewSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+def with_public_authors(queryset):
+    """
+    Reviews with their authors joined in, loading only the user columns
+    PublicUserSerializer shows; the rest of the user row, password hash
+    included, is left in the database.
+    """
+    return queryset.select_related('user').only(
+        *(field.name for field in Review._meta.concrete_fields),
+        *(f'user__{name}' for name in PublicUserSerializer.Meta.fields),
+    )
+
 class ReviewDetailSerializer(ReviewSerializer):
     """Detailed serializer for individual review endpoints"""
     class Meta(ReviewSerializer.Meta):
@@ -0,0 +1,41 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from campsites import rollups, tasks
+from jobs.queue import enqueue
+from .models import Review
+from .utils import record_distribution_change
+
+
+def update_rating_scores(campsite_ids):
+    # One queued recompute per campsite however many reviews arrive meanwhile
+    for campsite_id in campsite_ids:
+        if campsite_id:
+            enqueue(
+                tasks.update_rating_scores, campsite_ids=[campsite_id],
+                key=f'update_rating_scores:{campsite_id}',
+            )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, raw=False, **kwargs):
+    """Keep the stored version of the review so post_save can apply a delta."""
+    instance._previous = None
+    if not raw and instance.pk:
+        instance._previous = Review.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    rollups.record_review_change(previous, instance)
+    if record_distribution_change(previous, instance):
+        update_rating_scores({instance.campsite_id, getattr(previous, 'campsite_id', None)})
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    rollups.record_review_change(instance, None)
+    if record_distribution_change(instance, None):
+        update_rating_scores({instance.campsite_id})
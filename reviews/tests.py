@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from campsites.tests import create_campsite
+from .models import Review, RatingDistribution
+from .utils import get_distribution, rebuild_distributions
+
+
+class ReviewListingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'camper{n}', password='pass') for n in range(3)]
+        self.campsite = create_campsite()
+        for user in self.users:
+            Review.objects.create(user=user, campsite=self.campsite, rating=4, comment='Stayed here')
+
+    def assert_authors_without_passwords(self, url, queries):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(captured), queries)
+        self.assertFalse(any('password' in query['sql'] for query in captured))
+        return response.json()
+
+    def test_campsite_reviews_list_public_authors_in_constant_queries(self):
+        # The campsite check and one page of reviews joined with their authors
+        data = self.assert_authors_without_passwords(f'/api/campsites/{self.campsite.pk}/reviews/', 2)
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(set(data['results'][0]['user']), {'id', 'username', 'first_name', 'profile_picture'})
+
+        Review.objects.create(user=self.users[0], campsite=create_campsite(name='Riverside'), rating=3, comment='Ok')
+        self.assert_authors_without_passwords(f'/api/campsites/{self.campsite.pk}/reviews/', 2)
+
+    def test_reviews_of_an_unknown_campsite_are_not_found(self):
+        response = self.client.get(f'/api/campsites/{self.campsite.pk + 1}/reviews/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_review_list_loads_authors_in_the_same_query(self):
+        data = self.assert_authors_without_passwords(f'/api/reviews/reviews/?campsite={self.campsite.pk}', 1)
+        self.assertEqual([review['user']['username'] for review in data], ['camper2', 'camper1', 'camper0'])
+
+
+class RatingDistributionTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'camper{n}', password='pass') for n in range(3)]
+        self.campsite = create_campsite()
+
+    def review(self, user, rating, **fields):
+        return Review.objects.create(user=user, campsite=self.campsite, rating=rating, comment='Stayed here', **fields)
+
+    def snapshot(self):
+        return {
+            (row.pop('campsite'), row.pop('dimension')): row
+            for row in RatingDistribution.objects.values(
+                'campsite', 'dimension', 'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5'
+            )
+        }
+
+    def test_histogram_follows_review_changes(self):
+        first = self.review(self.users[0], 5, cleanliness_rating=4)
+        self.review(self.users[1], 3)
+        overall = get_distribution(self.campsite.pk)['overall']
+        self.assertEqual((overall['5'], overall['3'], overall['count']), (1, 1, 2))
+        self.assertEqual(overall['average'], 4.0)
+        self.assertEqual(get_distribution(self.campsite.pk)['cleanliness']['4'], 1)
+
+        first.rating = 4
+        first.save()
+        overall = get_distribution(self.campsite.pk)['overall']
+        self.assertEqual((overall['5'], overall['4']), (0, 1))
+
+        first.is_public = False
+        first.save()
+        self.assertEqual(get_distribution(self.campsite.pk)['overall']['count'], 1)
+
+        first.delete()
+        self.assertEqual(get_distribution(self.campsite.pk)['overall']['count'], 1)
+        self.assertEqual(get_distribution(self.campsite.pk)['cleanliness']['count'], 0)
+
+    def test_incremental_histograms_match_rebuild(self):
+        self.review(self.users[0], 5, value_rating=2)
+        self.review(self.users[1], 1, is_public=False)
+        self.review(self.users[2], 4, location_rating=5)
+        incremental = self.snapshot()
+
+        rebuild_distributions()
+        self.assertEqual(self.snapshot(), incremental)
@@ -0,0 +1,94 @@
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Count
+from campsites.rollups import increment
+from .models import Review, RatingDistribution
+
+
+def distribution_contribution(review):
+    """
+    Return what a single review adds to the rating histograms as a mapping of
+    (campsite_id, dimension) -> {stars_field: count}. Only public campsite
+    reviews are counted.
+    """
+    contribution = defaultdict(Counter)
+    if review is None or not review.campsite_id or not review.is_public:
+        return contribution
+
+    for dimension, field in RatingDistribution.DIMENSION_FIELDS.items():
+        value = getattr(review, field)
+        if value:
+            contribution[(review.campsite_id, dimension)][f'stars_{value}'] += 1
+    return contribution
+
+
+def record_distribution_change(old, new):
+    """
+    Update the rating histograms for a review that was created, changed or
+    deleted. Returns True if any histogram changed.
+    """
+    old = distribution_contribution(old)
+    new = distribution_contribution(new)
+    changed = False
+    for campsite_id, dimension in set(old) | set(new):
+        key = (campsite_id, dimension)
+        deltas = {
+            f'stars_{stars}': new.get(key, {}).get(f'stars_{stars}', 0) - old.get(key, {}).get(f'stars_{stars}', 0)
+            for stars in range(1, 6)
+        }
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if deltas:
+            increment(RatingDistribution, {'campsite_id': campsite_id, 'dimension': dimension}, deltas)
+            changed = True
+    return changed
+
+
+def serialize_distribution(distributions):
+    """
+    Turn the RatingDistribution rows of one campsite into a response dict with
+    every dimension present, e.g. {'overall': {'1': 0, ..., '5': 3, 'count': 3, 'average': 5.0}}.
+    """
+    rows = {row.dimension: row for row in distributions}
+    data = {}
+    for dimension, _ in RatingDistribution.DIMENSION_CHOICES:
+        row = rows.get(dimension) or RatingDistribution(dimension=dimension)
+        data[dimension] = {str(stars): count for stars, count in enumerate(row.counts, start=1)}
+        data[dimension]['count'] = row.total
+        data[dimension]['average'] = row.average
+    return data
+
+
+def get_distribution(campsite_id):
+    """Rating histograms of a campsite, read with a single query."""
+    return serialize_distribution(RatingDistribution.objects.filter(campsite_id=campsite_id))
+
+
+def rebuild_distributions(campsite_ids=None, batch_size=1000):
+    """
+    Recompute the rating histograms from the review table.
+    Returns the number of rows written.
+    """
+    reviews = Review.objects.filter(campsite__isnull=False, is_public=True)
+    distributions = RatingDistribution.objects.all()
+    if campsite_ids is not None:
+        reviews = reviews.filter(campsite_id__in=campsite_ids)
+        distributions = distributions.filter(campsite_id__in=campsite_ids)
+
+    rows = defaultdict(Counter)
+    for dimension, field in RatingDistribution.DIMENSION_FIELDS.items():
+        counts = reviews.filter(**{f'{field}__isnull': False}).values('campsite_id', field).annotate(
+            count=Count('id')
+        )
+        for row in counts:
+            rows[(row['campsite_id'], dimension)][f'stars_{row[field]}'] += row['count']
+
+    with transaction.atomic():
+        distributions.delete()
+        RatingDistribution.objects.bulk_create(
+            (
+                RatingDistribution(campsite_id=campsite_id, dimension=dimension, **counts)
+                for (campsite_id, dimension), counts in rows.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(rows)
@@ -4,11 +4,13 @@ from rest_framework.decorators import action
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from .models import Review
-from .serializers import ReviewSerializer, ReviewDetailSerializer
+from .serializers import ReviewSerializer, ReviewDetailSerializer, with_public_authors
 from campsites.models import Campsite
 from bookings.models import Booking
+from happy_camper_project.db import retry_on_locked
+from happy_camper_project.routers import ReplicaReadMixin
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -19,7 +21,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return ReviewSerializer
     
     def get_queryset(self):
-        queryset = Review.objects.all()
+        queryset = with_public_authors(Review.objects.all())
         
         # Filter by review type
         review_type = self.request.query_params.get('type')
@@ -85,7 +87,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_404_NOT_FOUND
                     )
             
-            review = serializer.save()
+            review = retry_on_locked(serializer.save)()
             return Response(
                 {
                     'status': 'success',
@@ -149,7 +151,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            review = serializer.save()
+            review = retry_on_locked(serializer.save)()
             return Response(
                 {
                     'status': 'success',
@@ -183,7 +185,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            instance.delete()
+            retry_on_locked(instance.delete)()
             return Response(
                 {
                     'status': 'success',
@@ -219,7 +221,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
                 )
             
             review.is_public = not review.is_public
-            review.save()
+            retry_on_locked(review.save)()
             
             return Response(
                 {
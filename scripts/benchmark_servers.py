@@ -0,0 +1,158 @@
+"""
+Compare requests/sec and latency of the WSGI/gevent and ASGI/uvicorn setups.
+
+Starts gunicorn once per setup with gunicorn_config.py, drives the same
+read endpoints with a fixed number of concurrent keep-alive connections and
+prints throughput and latency percentiles. The sync endpoints are measured
+on the gevent server and their async twins under /api/public/ on the
+uvicorn server. Use --settings to point both servers at a settings module
+that serves plain HTTP (production settings redirect to HTTPS) and leave
+rate limiting disabled.
+
+    python scripts/benchmark_servers.py --campsite 1 --duration 20 --concurrency 100 --workers 2
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUPS = {
+    'wsgi-gevent': {
+        'app': 'happy_camper_project.wsgi:application',
+        'worker_class': 'gevent',
+        'paths': [
+            '/api/campsites/',
+            '/api/campsites/featured/',
+            '/api/campsites/{campsite}/',
+            '/api/campsites/{campsite}/availability/',
+            '/api/campsites/{campsite}/reviews/',
+        ],
+    },
+    'asgi-uvicorn': {
+        'app': 'happy_camper_project.asgi:application',
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'paths': [
+            '/api/public/campsites/',
+            '/api/public/campsites/featured/',
+            '/api/public/campsites/{campsite}/',
+            '/api/public/campsites/{campsite}/availability/',
+            '/api/public/campsites/{campsite}/reviews/',
+        ],
+    },
+}
+
+
+async def fetch(reader, writer, host, path):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, paths, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    index = 0
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            status = await fetch(reader, writer, f'{host}:{port}', path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def load(host, port, paths, duration, concurrency):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        client(host, port, paths, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def wait_until_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'Server did not start: {url}')
+
+
+def run_setup(name, setup, args):
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=setup['worker_class'],
+               GUNICORN_WORKERS=str(args.workers),
+               GUNICORN_BIND=f'{args.host}:{args.port}')
+    if args.settings:
+        env['DJANGO_SETTINGS_MODULE'] = args.settings
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', setup['app']],
+        cwd=project_root, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        paths = [path.format(campsite=args.campsite) for path in setup['paths']]
+        wait_until_ready(f'http://{args.host}:{args.port}{paths[0]}')
+        # Warm up caches and connections before measuring
+        asyncio.run(load(args.host, args.port, paths, 2, args.concurrency))
+        latencies, errors = asyncio.run(
+            load(args.host, args.port, paths, args.duration, args.concurrency)
+        )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    latencies.sort()
+    print(
+        f'{name:<14} {len(latencies) / args.duration:>9.1f} req/s  '
+        f'p50 {percentile(latencies, 0.5) * 1000:>7.1f}ms  '
+        f'p99 {percentile(latencies, 0.99) * 1000:>7.1f}ms  '
+        f'errors {len(errors)}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--campsite', type=int, required=True, help='Campsite id to request')
+    parser.add_argument('--duration', type=int, default=20, help='Seconds per setup')
+    parser.add_argument('--concurrency', type=int, default=100, help='Concurrent connections')
+    parser.add_argument('--workers', type=int, default=1, help='Gunicorn workers per setup')
+    parser.add_argument('--settings', help='DJANGO_SETTINGS_MODULE for the servers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--setup', choices=SETUPS, action='append', help='Only run these setups')
+    args = parser.parse_args()
+
+    for name in args.setup or SETUPS:
+        run_setup(name, SETUPS[name], args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Mixed read/write load test for the SQLite configuration.
+
+Builds a scratch database, then runs several worker processes (standing in
+for gunicorn workers), each with a few threads issuing a mix of campsite
+list reads and booking writes. It runs once with Django's default SQLite
+settings and once with SQLITE_OPTIONS plus retry_on_locked, and prints
+throughput and "database is locked" failures for both.
+
+    python scripts/sqlite_load_test.py --processes 4 --threads 4 --duration 15 --write-ratio 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'happy_camper_project.settings.development')
+
+CAMPSITES = 20
+USERS = 50
+
+
+def setup_django(path, tuned):
+    import django
+    from django.conf import settings
+
+    database = settings.DATABASES['default']
+    database['NAME'] = path
+    database['OPTIONS'] = dict(settings.SQLITE_OPTIONS) if tuned else {}
+    django.setup()
+
+
+def prepare(path):
+    setup_django(path, tuned=True)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from campsites.models import Campsite
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        User(username=f'load-user-{i}', email=f'load-user-{i}@example.com') for i in range(USERS)
+    )
+    Campsite.objects.bulk_create(
+        Campsite(
+            owner=users[i % USERS], name=f'Load campsite {i}', description='Load test',
+            location='Nowhere', latitude=0, longitude=0, price_per_night=20,
+            total_spots=1000,
+        )
+        for i in range(CAMPSITES)
+    )
+
+
+def worker(path, tuned, threads, duration, write_ratio, results):
+    setup_django(path, tuned)
+    import threading
+    from django.db import OperationalError, connection, transaction
+    from bookings.models import Booking
+    from bookings.utils import calculate_price, check_availability
+    from campsites.models import Campsite
+    from happy_camper_project.db import retry_on_locked
+
+    campsite_ids = list(Campsite.objects.values_list('pk', flat=True))
+    user_ids = list(Campsite.objects.values_list('owner_id', flat=True))
+    connection.close()
+
+    def book():
+        campsite = Campsite.objects.get(pk=random.choice(campsite_ids))
+        check_in = date.today() + timedelta(days=random.randint(1, 300))
+        check_out = check_in + timedelta(days=random.randint(1, 5))
+        if check_availability(campsite, check_in, check_out):
+            Booking.objects.create(
+                campsite=campsite, user_id=random.choice(user_ids),
+                check_in_date=check_in, check_out_date=check_out, number_of_guests=2,
+                total_price=calculate_price(campsite, check_in, check_out), status='confirmed',
+            )
+
+    write = retry_on_locked(book) if tuned else transaction.atomic(book)
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def run():
+        local = {'reads': 0, 'writes': 0, 'locked': 0}
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            try:
+                if random.random() < write_ratio:
+                    write()
+                    local['writes'] += 1
+                else:
+                    list(
+                        Campsite.objects.select_related('owner')
+                        .prefetch_related('images', 'rating_distributions')[:20]
+                    )
+                    local['reads'] += 1
+            except OperationalError:
+                local['locked'] += 1
+        connection.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(counts)
+
+
+def run(label, path, tuned, args):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker,
+            args=(path, tuned, args.threads, args.duration, args.write_ratio, results),
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    totals = {'reads': 0, 'writes': 0, 'locked': 0}
+    for _ in processes:
+        for key, value in results.get().items():
+            totals[key] += value
+    for process in processes:
+        process.join()
+
+    print(
+        f'{label:<8} {(totals["reads"] + totals["writes"]) / args.duration:>8.1f} ops/s  '
+        f'reads {totals["reads"] / args.duration:>8.1f}/s  '
+        f'writes {totals["writes"] / args.duration:>7.1f}/s  '
+        f'locked errors {totals["locked"]}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--duration', type=int, default=15, help='Seconds per run')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    for label, tuned in (('default', False), ('tuned', True)):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'load.sqlite3')
+            # Prepare in a child process so the runs start with fresh connections
+            preparer = multiprocessing.Process(target=prepare, args=(path,))
+            preparer.start()
+            preparer.join()
+            if not tuned:
+                # WAL is persistent; switch the scratch database back for the baseline
+                import sqlite3
+                sqlite3.connect(path).execute('PRAGMA journal_mode=DELETE').close()
+            run(label, path, tuned, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Copy the primary SQLite database into the file used as the local read
+replica (DATABASE_REPLICA_PATH), optionally repeating to simulate
+replication lag.
+
+    DATABASE_REPLICA_PATH=replica.sqlite3 python scripts/sync_sqlite_replica.py --interval 5
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sync(primary, replica):
+    source = sqlite3.connect(primary)
+    target = sqlite3.connect(replica)
+    try:
+        # The backup API copies a consistent snapshot even while the
+        # primary is being written to
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Copy the primary SQLite database to the replica file')
+    parser.add_argument('--primary', default=os.path.join(project_root, 'db.sqlite3'))
+    parser.add_argument('--replica', default=os.environ.get('DATABASE_REPLICA_PATH'))
+    parser.add_argument('--interval', type=float, help='Keep syncing every N seconds')
+    args = parser.parse_args()
+    if not args.replica:
+        parser.error('pass --replica or set DATABASE_REPLICA_PATH')
+
+    while True:
+        sync(args.primary, args.replica)
+        print(f'Synced {args.primary} -> {args.replica}')
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from happy_camper_project.performance import record_cache
+
+
+def cached_user_fields():
+    """
+    Attribute names of the user columns kept in the cache: every concrete
+    field except the password hash, so a cached user serializes without
+    going back to the database.
+    """
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.name != 'password'
+    ]
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop the cached copy of a user. Every process reloads it on its next
+    request only if the cache is shared; with the per-process locmem backend
+    other workers keep their copy until AUTH_USER_CACHE_TIMEOUT.
+    """
+    cache.delete(user_cache_key(user_id))
+
+
+def user_to_cache(user):
+    """The cached form of a user: its columns, bar the password, and a digest of the hash."""
+    entry = {
+        field.attname: field.get_prep_value(field.value_from_object(user))
+        for field in get_user_model()._meta.concrete_fields
+        if field.name != 'password'
+    }
+    entry['password_digest'] = get_md5_hash_password(user.password)
+    return entry
+
+
+def user_from_cache(entry):
+    """Rebuild a user from its cached form; only the password is left deferred."""
+    fields = cached_user_fields()
+    return get_user_model().from_db(None, fields, [entry[field] for field in fields])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the user from a short-lived cache instead
+    of loading it from the database on every request. Every column but the
+    password hash is cached. Entries are dropped when the user is
+    saved or deleted and on logout, which other workers only see with a
+    shared CACHE_BACKEND; AUTH_USER_CACHE_TIMEOUT bounds staleness otherwise
+    and for changes made with queryset.update().
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        record_cache(entry is not None)
+        if entry is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user_to_cache(user), getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+            return user
+
+        # Same checks JWTAuthentication runs against a freshly loaded user
+        if api_settings.CHECK_USER_IS_ACTIVE and not entry['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != entry['password_digest']:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user_from_cache(entry)
@@ -0,0 +1,50 @@
+import base64
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.utils.crypto import pbkdf2
+
+
+def run_off_loop(func, *args):
+    """
+    Run CPU-bound work in gevent's native thread pool when the process has
+    been monkey-patched (gunicorn gevent workers), so other greenlets keep
+    being served while a password is hashed. Without gevent, call directly.
+    """
+    try:
+        from gevent import get_hub
+        from gevent.monkey import is_module_patched
+    except ImportError:
+        return func(*args)
+    if not is_module_patched('threading'):
+        return func(*args)
+    return get_hub().threadpool.apply(func, args)
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 hasher whose work factor comes from PASSWORD_HASH_ITERATIONS.
+    It keeps Django's algorithm name, so existing hashes still verify and are
+    rehashed on the next successful login whenever the iteration count changes.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+    def encode(self, password, salt, iterations=None):
+        self._check_encode_args(password, salt)
+        iterations = iterations or self.iterations
+        hash = run_off_loop(pbkdf2, password, salt, iterations, None, self.digest)
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return '%s$%d$%s$%s' % (self.algorithm, iterations, salt, hash)
+
+
+class OffloadedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2 hasher (requires argon2-cffi) that hashes off the event loop."""
+
+    def encode(self, password, salt):
+        return run_off_loop(super().encode, password, salt)
+
+    def verify(self, password, encoded):
+        return run_off_loop(super().verify, password, encoded)
@@ -0,0 +1,96 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from users.serializers import CustomTokenObtainPairSerializer
+
+User = get_user_model()
+
+BENCHMARK_USERNAME = 'benchmark-login-user'
+BENCHMARK_PASSWORD = 'benchmark-login-pass-123'
+
+
+class Command(BaseCommand):
+    help = 'Measure logins/sec with the configured password hasher under concurrent logins'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=100, help='Total number of logins')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent logins in flight')
+        parser.add_argument(
+            '--tokens',
+            action='store_true',
+            help='Issue a JWT pair per login like the token endpoint (default: authenticate only)',
+        )
+        parser.add_argument(
+            '--gevent',
+            action='store_true',
+            help='Run the logins as greenlets in a monkey-patched process, like a gunicorn gevent worker '
+                 '(default: OS threads)',
+        )
+
+    def handle(self, *args, **options):
+        if options['gevent']:
+            try:
+                from gevent import monkey
+            except ImportError:
+                raise CommandError('--gevent needs gevent installed')
+            # Late, but before any thread or connection this benchmark uses
+            monkey.patch_all()
+        hasher = get_hasher()
+        user, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={'email': f'{BENCHMARK_USERNAME}@example.com'},
+        )
+        user.set_password(BENCHMARK_PASSWORD)
+        user.save(update_fields=['password'])
+
+        login = self._issue_tokens if options['tokens'] else self._authenticate
+        try:
+            # Warm up so the first login doesn't pay for imports or a rehash
+            login()
+            started = time.perf_counter()
+            timings = self._run(login, options['logins'], options['concurrency'], options['gevent'])
+            elapsed = time.perf_counter() - started
+        finally:
+            User.objects.filter(pk=user.pk).delete()
+
+        timings.sort()
+        p95 = timings[min(int(len(timings) * 0.95), len(timings) - 1)]
+        self.stdout.write(f'Hasher: {hasher.algorithm} ({type(hasher).__name__})')
+        if hasattr(hasher, 'iterations'):
+            self.stdout.write(f'Iterations: {hasher.iterations}')
+        self.stdout.write(
+            f'Logins: {len(timings)} at concurrency {options["concurrency"]} '
+            f'({"greenlets" if options["gevent"] else "threads"})'
+        )
+        self.stdout.write(
+            f'Latency: mean {statistics.mean(timings) * 1000:.1f}ms, '
+            f'p50 {statistics.median(timings) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms'
+        )
+        self.stdout.write(self.style.SUCCESS(f'{len(timings) / elapsed:.1f} logins/sec'))
+
+    def _run(self, login, logins, concurrency, greenlets):
+        if greenlets:
+            from gevent.pool import Pool
+
+            return list(Pool(concurrency).imap(lambda _: self._timed(login), range(logins)))
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(lambda _: self._timed(login), range(logins)))
+
+    def _timed(self, login):
+        started = time.perf_counter()
+        login()
+        return time.perf_counter() - started
+
+    def _authenticate(self):
+        if authenticate(username=BENCHMARK_USERNAME, password=BENCHMARK_PASSWORD) is None:
+            raise RuntimeError('Benchmark login failed')
+
+    def _issue_tokens(self):
+        serializer = CustomTokenObtainPairSerializer(
+            data={'username': BENCHMARK_USERNAME, 'password': BENCHMARK_PASSWORD}
+        )
+        serializer.is_valid(raise_exception=True)
@@ -1,12 +1,14 @@
 from rest_framework import serializers
 from .models import CustomUser
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom token serializer that adds extra user info to the token response"""
+    token_class = CachedBlacklistRefreshToken
     
     @classmethod
     def get_token(cls, user):
@@ -32,6 +34,17 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh serializer that checks the blacklist through the cache"""
+    token_class = CachedBlacklistRefreshToken
+
+class PublicUserSerializer(serializers.ModelSerializer):
+    """Compact public representation of a user, e.g. as a review author"""
+    class Meta:
+        model = CustomUser
+        fields = ('id', 'username', 'first_name', 'profile_picture')
+        read_only_fields = fields
+
 class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
@@ -0,0 +1,7 @@
+from jobs.queue import job
+from .tokens import prune_expired_tokens
+
+
+@job(every=24 * 60 * 60)
+def prune_tokens():
+    prune_expired_tokens()
@@ -1,3 +1,104 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication, user_cache_key
+from .hashers import ConfigurablePBKDF2PasswordHasher
+from .tokens import CachedBlacklistRefreshToken, is_blacklisted, prune_expired_tokens
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'camper', email='camper@example.com', password='pass', user_type='owner'
+        )
+        cache.delete(user_cache_key(self.user.pk))
+        self.token = AccessToken.for_user(self.user)
+        self.authentication = CachedJWTAuthentication()
+
+    def test_cached_entry_leaves_out_the_password(self):
+        self.authentication.get_user(self.token)
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertEqual(entry['id'], self.user.pk)
+        self.assertEqual(entry['user_type'], 'owner')
+        self.assertNotIn('password', entry)
+        self.assertNotIn(self.user.password, entry.values())
+
+    def test_cached_user_needs_no_query(self):
+        self.authentication.get_user(self.token)
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.token)
+            self.assertEqual((user.pk, user.is_staff, user.user_type), (self.user.pk, False, 'owner'))
+            self.assertEqual(user.email, 'camper@example.com')
+        self.assertEqual(user.get_deferred_fields(), {'password'})
+
+    def test_saving_the_user_drops_the_cached_entry(self):
+        self.authentication.get_user(self.token)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_updating_a_cached_user_keeps_the_password(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        self.client.get('/api/auth/profile/', **headers)
+        response = self.client.patch(
+            '/api/auth/profile/', {'phone_number': '555'}, content_type='application/json', **headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.phone_number, '555')
+        self.assertTrue(self.user.check_password('pass'))
+
+    def test_profile_is_served_from_a_cached_user(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        self.client.get('/api/auth/profile/', **headers)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], 'camper@example.com')
+
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('camper', password='pass')
+
+    @override_settings(TOKEN_BLACKLIST_NEGATIVE_CACHE_TIMEOUT=300)
+    def test_blacklisting_overrides_a_cached_negative_answer(self):
+        token = CachedBlacklistRefreshToken.for_user(self.user)
+        jti, exp = token['jti'], token['exp']
+        self.assertFalse(is_blacklisted(jti, exp))
+        with self.assertNumQueries(0):
+            self.assertFalse(is_blacklisted(jti, exp))
+
+        token.blacklist()
+        self.assertTrue(is_blacklisted(jti, exp))
+
+    def test_prune_deletes_only_expired_tokens(self):
+        expired = CachedBlacklistRefreshToken.for_user(self.user)
+        current = CachedBlacklistRefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(prune_expired_tokens(batch_size=1), 1)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [current['jti']])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class PasswordHasherTests(TestCase):
+    def test_iterations_default_to_djangos(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=None):
+            self.assertEqual(ConfigurablePBKDF2PasswordHasher().iterations, PBKDF2PasswordHasher.iterations)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_changed_iterations_rehash_on_login(self):
+        hasher = ConfigurablePBKDF2PasswordHasher()
+        encoded = hasher.encode('secret', hasher.salt(), iterations=500)
+        self.assertTrue(hasher.verify('secret', encoded))
+        self.assertTrue(hasher.must_update(encoded))
+        self.assertFalse(hasher.must_update(hasher.encode('secret', hasher.salt())))
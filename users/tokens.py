@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from happy_camper_project.performance import record_cache
+
+
+def blacklist_cache_key(jti):
+    return f'auth:blacklisted:{jti}'
+
+
+def _seconds_until(exp):
+    if exp is None:
+        return None
+    return max(int(exp - timezone.now().timestamp()), 1)
+
+
+def remember_blacklisted(jti, exp=None):
+    """Cache a blacklisted JTI until the token would have expired anyway."""
+    cache.set(blacklist_cache_key(jti), True, _seconds_until(exp))
+
+
+def is_blacklisted(jti, exp=None):
+    """
+    Check whether a refresh token JTI is blacklisted. Positive answers are
+    cached until the token expires. Negative answers are cached for
+    TOKEN_BLACKLIST_NEGATIVE_CACHE_TIMEOUT seconds: blacklisting a token
+    overwrites them, which only reaches every worker through a shared cache,
+    so it defaults to 0 with the per-process locmem backend.
+    """
+    key = blacklist_cache_key(jti)
+    cached = cache.get(key)
+    record_cache(cached is not None)
+    if cached is not None:
+        return cached
+
+    blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    if blacklisted:
+        remember_blacklisted(jti, exp)
+    else:
+        timeout = getattr(settings, 'TOKEN_BLACKLIST_NEGATIVE_CACHE_TIMEOUT', 0)
+        if timeout:
+            cache.set(key, False, timeout)
+    return blacklisted
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist lookups go through the cache first."""
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload.get('exp')):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        remember_blacklisted(self.payload[api_settings.JTI_CLAIM], self.payload.get('exp'))
+        return result
+
+
+def prune_expired_tokens(batch_size=1000):
+    """
+    Delete expired outstanding tokens (and their blacklist entries) in
+    id-ordered chunks so each delete holds locks briefly. Old tokens have the
+    lowest ids, so every chunk is found near the start of the table.
+    Returns the number of outstanding tokens deleted.
+    """
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -5,10 +5,11 @@ from django.http import JsonResponse
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
-from .serializers import CustomUserSerializer, CustomTokenObtainPairSerializer
+from .serializers import CustomUserSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
+from .authentication import invalidate_cached_user
+from .tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
@@ -16,6 +17,10 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """Custom token view that uses our serializer class"""
     serializer_class = CustomTokenObtainPairSerializer
 
+class CustomTokenRefreshView(TokenRefreshView):
+    """Token refresh view with a cache-fronted blacklist check"""
+    serializer_class = CustomTokenRefreshSerializer
+
 class RegisterView(APIView):
     """View for registering new users"""
     permission_classes = [permissions.AllowAny]
@@ -24,7 +29,7 @@ class RegisterView(APIView):
         serializer = CustomUserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = CachedBlacklistRefreshToken.for_user(user)
             
             response_data = {
                 'user': serializer.data,
@@ -48,7 +53,7 @@ class LogoutView(APIView):
             
             # Blacklist refresh token
             try:
-                refresh = RefreshToken(refresh_token)
+                refresh = CachedBlacklistRefreshToken(refresh_token)
                 refresh.blacklist()
             except Exception as e:
                 return Response(
@@ -62,12 +67,14 @@ class LogoutView(APIView):
                 access_token = auth_header.split(' ')[1]
                 try:
                     # Create a RefreshToken from the access token to blacklist it
-                    token = RefreshToken(access_token)
+                    token = CachedBlacklistRefreshToken(access_token)
                     token.blacklist()
                 except Exception:
                     # If access token blacklisting fails, it's not critical
                     pass
             
+            invalidate_cached_user(request.user.pk)
+            
             return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
         except Exception as e:
             return Response(